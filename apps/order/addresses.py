@@ -0,0 +1,130 @@
+import re
+
+from django.conf import settings
+
+
+class AddressNormalizer:
+    """AddressNormalizer class is used for bringing addresses to the canonical key which is used by caches.
+
+    The address is split into the street, the house number and the city. Abbreviations of street
+    types are replaced by full names, the most common type 'вулиця' is omitted, the apartment is
+    omitted too, so all apartments of the building have the same key. Names of cities are brought to
+    CITIES of ADDRESS_NORMALIZATION setting by CITY_ALIASES, words after the house number which are
+    not one of CITIES are kept as the name of an unknown city. If the address contains no city,
+    DEFAULT_CITY is used.
+    """
+    street_types = {
+        'вул': 'вулиця', 'вулиця': 'вулиця', 'ул': 'вулиця', 'улица': 'вулиця',
+        'просп': 'проспект', 'пр-т': 'проспект', 'проспект': 'проспект',
+        'пл': 'площа', 'площа': 'площа',
+        'пров': 'провулок', 'провулок': 'провулок',
+        'бульв': 'бульвар', 'б-р': 'бульвар', 'бульвар': 'бульвар',
+    }
+    default_street_type = 'вулиця'
+    city_markers = ('м', 'місто', 'г', 'город')
+    building_markers = ('буд', 'будинок', 'д', 'дом')
+    apartment_markers = ('кв', 'квартира', 'оф', 'офіс', "під'їзд", 'пов', 'поверх')
+    house_number_pattern = re.compile(r'^\d+[а-яієїґ]?(/\d+[а-яієїґ]?)?$')
+
+    @staticmethod
+    def normalize(address):
+        """Brings the address to the canonical key in which the same addresses written differently are equal.
+
+        :param address: the address
+        :type address: str
+
+        :return: the key in the form 'street house, city', for example 'шараневича 28, львів'
+        :rtype: str
+        """
+        components = AddressNormalizer.split(address)
+
+        if components['house']:
+            return f"{components['street']} {components['house']}, {components['city']}".strip()
+        return f"{components['street']}, {components['city']}".strip(', ')
+
+    @staticmethod
+    def clean(address):
+        """Brings the address to lowercase with single spaces keeping all its words.
+
+        :param address: the address
+        :type address: str
+
+        :return: the cleaned address
+        :rtype: str
+        """
+        return ' '.join(address.lower().split())
+
+    @staticmethod
+    def join_letter(match):
+        """Joins the letter to the preceding house number. The letter which is separated from the number by
+        a space is not joined if it has a dot or is a marker of the city or of the building, for example
+        '28 м. Львів' or '28 д 5', the letter written together with the number is always joined, for example
+        '100г' or '7-м'.
+
+        :param match: the match of the house number, the separator, the letter and the dot after it
+        :type match: re.Match
+
+        :return: the house number with the letter or separated from the letter
+        :rtype: str
+        """
+        number, separator, letter, dot = match.groups()
+        is_marker = letter in AddressNormalizer.city_markers or letter in AddressNormalizer.building_markers
+
+        if separator not in ('', '-') and (dot or is_marker):
+            return f'{number} {letter}{dot}'
+        return f'{number}{letter}{dot}'
+
+    @staticmethod
+    def split(address):
+        """Splits the address into the street, the house number and the city.
+
+        :param address: the address
+        :type address: str
+
+        :return: the street with its type if the type is not 'вулиця', the house number and the city
+        :rtype: dict
+        """
+        address = re.sub(r"[’ʼ`]", "'", address.lower())
+        address = re.sub(r'(\d+)(\s*-?\s*)([а-яієїґ])(?![а-яієїґ\'])(\.?)', AddressNormalizer.join_letter, address)
+        address = re.sub(r'\s*/\s*', '/', address)
+        words = re.sub(r'[.,;:()"]', ' ', address).split()
+        cities = settings.ADDRESS_NORMALIZATION['CITIES']
+        city_aliases = settings.ADDRESS_NORMALIZATION['CITY_ALIASES']
+
+        street_type = AddressNormalizer.default_street_type
+        street_words = list()
+        house = ''
+        city = ''
+        unknown_city_words = list()
+        skip_next_word = False
+
+        for word in words:
+            word = city_aliases.get(word, word)
+
+            if skip_next_word:
+                skip_next_word = False
+            elif word in AddressNormalizer.apartment_markers:
+                skip_next_word = True
+            elif word in AddressNormalizer.city_markers or word in AddressNormalizer.building_markers:
+                continue
+            elif word in cities and not city:
+                city = word
+            elif word in AddressNormalizer.street_types:
+                street_type = AddressNormalizer.street_types[word]
+            elif AddressNormalizer.house_number_pattern.match(word) and street_words and not house:
+                house = word
+            elif not house or not street_words:
+                street_words.append(word)
+            elif not re.search(r'\d', word):
+                unknown_city_words.append(word)
+
+        if street_type != AddressNormalizer.default_street_type:
+            street_words.insert(0, street_type)
+
+        components = {
+            'street': ' '.join(street_words),
+            'house': house,
+            'city': city or ' '.join(unknown_city_words) or settings.ADDRESS_NORMALIZATION['DEFAULT_CITY'],
+        }
+
+        return components
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class OrderConfig(AppConfig):
     name = 'apps.order'
+
+    def ready(self):
+        from . import signals  # noqa: F401
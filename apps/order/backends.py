@@ -0,0 +1,185 @@
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .addresses import AddressNormalizer
+from .models import GeocodedAddressModel
+from .services import GeocodingAPI, MapsAPIUse
+
+
+class RoutingBackend:
+    """RoutingBackend class describes the interface of providers of address validation and durations.
+
+    Results of backends which have the use_cache attribute are cached by GeocodingCache and
+    DurationCache classes.
+
+    :param options: options of the backend which override default_options attribute of the class
+    :type options: dict
+    """
+    use_cache = True
+    default_options = dict()
+
+    def __init__(self, options=None):
+        self.options = {**self.default_options, **(options or dict())}
+
+    def validate_address(self, address):
+        """Validates the address and returns its coordinates.
+
+        :param address: the address which is validated
+        :type address: str
+
+        :return: latitude and longitude of the address
+        :rtype: dict
+        :raises ValueError: if the address is not valid
+        """
+        raise NotImplementedError
+
+    def get_durations(self, origins, destinations, mode):
+        """Returns durations from every origin to every destination.
+
+        :param origins: list of addresses where paths start
+        :type origins: list
+        :param destinations: list of addresses where paths end
+        :type destinations: list
+        :param mode: the method of movement
+        :type mode: str
+
+        :return: matrix of durations in seconds with a row for every origin and a column for every destination
+        :rtype: numpy.ndarray
+        """
+        raise NotImplementedError
+
+
+class GoogleRoutingBackend(RoutingBackend):
+    """GoogleRoutingBackend class validates addresses with Geocoding API and requests durations
+    from Distance Matrix API.
+
+    Requests are signed by API_KEY option. One request to Distance Matrix API contains at most
+    MAX_ELEMENTS pairs of addresses and tiles of the matrix are requested by MAX_WORKERS threads.
+    Failed requests are repeated up to RETRIES times, all requests of one validation or of one
+    matrix end before REQUEST_TIMEOUT seconds.
+    """
+    default_options = {
+        'API_KEY': None,
+        'MAX_ELEMENTS': 100,
+        'MAX_WORKERS': 4,
+        'REQUEST_TIMEOUT': 20.0,
+        'RETRIES': 2,
+    }
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.geocoding_api = GeocodingAPI(self.options['API_KEY'], request_timeout=self.options['REQUEST_TIMEOUT'],
+                                          retries=self.options['RETRIES'])
+        self.maps_api = MapsAPIUse(self.options['API_KEY'], max_elements=self.options['MAX_ELEMENTS'],
+                                   max_workers=self.options['MAX_WORKERS'],
+                                   request_timeout=self.options['REQUEST_TIMEOUT'], retries=self.options['RETRIES'])
+
+    def validate_address(self, address):
+        return self.geocoding_api.validate_addresses(address)
+
+    def get_durations(self, origins, destinations, mode):
+        return self.maps_api.get_durations(origins, destinations, mode)
+
+
+class LocalRoutingBackend(RoutingBackend):
+    """LocalRoutingBackend class works without the network using coordinates of addresses which
+    have been validated before.
+
+    Addresses are valid if their coordinates are stored in the table of GeocodedAddressModel.
+    Durations are calculated from haversine distances between coordinates which are multiplied
+    by DETOUR_FACTOR option to approximate the length of roads, the speed depends on the mode of
+    movement and on the local hour according to SPEED_PROFILES option. Every profile contains the
+    default speed and speeds for separate hours in kilometers per hour.
+    """
+    use_cache = False
+    earth_radius = 6371.0
+    default_options = {
+        'DETOUR_FACTOR': 1.3,
+        'SPEED_PROFILES': {
+            'driving': {'DEFAULT': 30, 'HOURS': {8: 20, 9: 20, 17: 18, 18: 18, 19: 22}},
+            'bicycling': {'DEFAULT': 15, 'HOURS': dict()},
+            'walking': {'DEFAULT': 5, 'HOURS': dict()},
+        },
+    }
+
+    def validate_address(self, address):
+        coordinates = self.get_coordinates([address])
+
+        if np.isnan(coordinates).any():
+            raise ValueError('Given delivery address is not valid.')
+
+        return {'latitude': float(coordinates[0][0]), 'longitude': float(coordinates[0][1])}
+
+    def get_durations(self, origins, destinations, mode):
+        coordinates = self.get_coordinates(list(origins) + list(destinations))
+
+        if np.isnan(coordinates).any():
+            raise ValueError('Coordinates of some addresses are unknown.')
+
+        distances = self.haversine_distances(coordinates[:len(origins)], coordinates[len(origins):])
+
+        return np.round(distances * self.options['DETOUR_FACTOR'] / self.speed(mode) * 3600)
+
+    def get_coordinates(self, addresses):
+        """Returns stored coordinates of valid addresses.
+
+        :param addresses: list of addresses
+        :type addresses: list
+
+        :return: matrix with latitude and longitude of every address, coordinates of unknown addresses are nan
+        :rtype: numpy.ndarray
+        """
+        keys = [AddressNormalizer.normalize(address) for address in addresses]
+        geocoded_addresses = GeocodedAddressModel.objects.filter(normalized_address__in=keys, is_valid=True,
+                                                                 latitude__isnull=False, longitude__isnull=False)
+        known_coordinates = {normalized_address: (latitude, longitude) for normalized_address, latitude, longitude
+                             in geocoded_addresses.values_list('normalized_address', 'latitude', 'longitude')}
+
+        return np.array([known_coordinates.get(key, (np.nan, np.nan)) for key in keys], dtype=float).reshape(-1, 2)
+
+    def speed(self, mode):
+        """Returns the speed of the mode of movement at the current local hour.
+
+        :param mode: the method of movement
+        :type mode: str
+
+        :return: the speed in kilometers per hour
+        :rtype: float
+        """
+        profile = self.options['SPEED_PROFILES'][mode]
+
+        return profile['HOURS'].get(timezone.localtime().hour, profile['DEFAULT'])
+
+    @staticmethod
+    def haversine_distances(origins, destinations):
+        """Calculates great-circle distances from every origin to every destination.
+
+        :param origins: matrix with latitude and longitude of every origin in degrees
+        :type origins: numpy.ndarray
+        :param destinations: matrix with latitude and longitude of every destination in degrees
+        :type destinations: numpy.ndarray
+
+        :return: matrix of distances in kilometers
+        :rtype: numpy.ndarray
+        """
+        origin_latitudes, origin_longitudes = np.radians(origins).T[:, :, np.newaxis]
+        destination_latitudes, destination_longitudes = np.radians(destinations).T[:, np.newaxis, :]
+
+        haversine = (np.sin((destination_latitudes - origin_latitudes) / 2) ** 2 +
+                     np.cos(origin_latitudes) * np.cos(destination_latitudes) *
+                     np.sin((destination_longitudes - origin_longitudes) / 2) ** 2)
+
+        return 2 * LocalRoutingBackend.earth_radius * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+
+
+def get_routing_backend():
+    """Creates the routing backend selected by BACKEND of ROUTING_BACKEND setting and configured by its OPTIONS.
+
+    :return: the routing backend
+    :rtype: RoutingBackend
+    """
+    backend_class = import_string(settings.ROUTING_BACKEND['BACKEND'])
+
+    return backend_class(settings.ROUTING_BACKEND.get('OPTIONS'))
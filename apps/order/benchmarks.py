@@ -0,0 +1,293 @@
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from .services import Solver, ParallelSolver, HeldKarpSolver, HeuristicSolver
+
+
+class MatrixGenerator:
+    """MatrixGenerator class is used for generating reproducible duration matrices.
+
+    Durations are measured in seconds like durations returned by MapsAPIUse class. Every matrix
+    depends only on its kind, size and seed, so the same matrices are generated on every run.
+    """
+    kinds = ('random', 'clustered', 'traffic')
+    city_size = 15000
+    speed = 8
+
+    @staticmethod
+    def generate(kind, size, seed):
+        """Generates the duration matrix of the given kind.
+
+        :param kind: the kind of the matrix, one of 'random', 'clustered' and 'traffic'
+        :type kind: str
+        :param size: the number of addresses
+        :type size: int
+        :param seed: the seed of the random generator
+        :type seed: int
+
+        :return: the duration matrix with infinite values on the diagonal
+        :rtype: numpy.ndarray
+        """
+        if kind not in MatrixGenerator.kinds:
+            raise ValueError(f"Matrix kind must be one of: {', '.join(MatrixGenerator.kinds)}.")
+
+        random_generator = np.random.default_rng([seed, size, MatrixGenerator.kinds.index(kind)])
+        value_matrix = getattr(MatrixGenerator, f'{kind}_matrix')(size, random_generator)
+        np.fill_diagonal(value_matrix, np.Infinity)
+
+        return value_matrix
+
+    @staticmethod
+    def random_matrix(size, random_generator):
+        """Generates the matrix of independent uniformly distributed durations.
+
+        :param size: the number of addresses
+        :type size: int
+        :param random_generator: the random generator
+        :type random_generator: numpy.random.Generator
+
+        :return: the duration matrix
+        :rtype: numpy.ndarray
+        """
+        return random_generator.integers(60, 1800, (size, size)).astype(float)
+
+    @staticmethod
+    def clustered_matrix(size, random_generator):
+        """Generates the symmetric matrix of durations between addresses grouped in districts.
+
+        :param size: the number of addresses
+        :type size: int
+        :param random_generator: the random generator
+        :type random_generator: numpy.random.Generator
+
+        :return: the duration matrix
+        :rtype: numpy.ndarray
+        """
+        number_of_districts = max(size // 5, 2)
+        districts = random_generator.uniform(0, MatrixGenerator.city_size, (number_of_districts, 2))
+        points = districts[random_generator.integers(0, number_of_districts, size)]
+        points += random_generator.normal(0, MatrixGenerator.city_size / 30, (size, 2))
+
+        distances = np.linalg.norm(points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=2)
+
+        return np.round(distances / MatrixGenerator.speed + 60)
+
+    @staticmethod
+    def traffic_matrix(size, random_generator):
+        """Generates the asymmetric matrix of durations in the rush hour.
+
+        Roads which lead to the city centre are slower than roads which lead out of the centre
+        and every road has its own random delay.
+
+        :param size: the number of addresses
+        :type size: int
+        :param random_generator: the random generator
+        :type random_generator: numpy.random.Generator
+
+        :return: the duration matrix
+        :rtype: numpy.ndarray
+        """
+        value_matrix = MatrixGenerator.clustered_matrix(size, random_generator)
+        centre_distances = random_generator.uniform(0, 1, size)
+        congestion = 1 + 0.5 * np.clip(centre_distances[:, np.newaxis] - centre_distances[np.newaxis, :], 0, None)
+        delays = random_generator.lognormal(0, 0.25, (size, size))
+
+        return np.round(value_matrix * congestion * delays)
+
+
+class RouteSolverBenchmark:
+    """RouteSolverBenchmark class is used for comparing route solvers on generated matrices.
+
+    Every solver is executed on every generated matrix which size suits the solver. Held-Karp
+    algorithm is executed only for sizes which are not higher than held_karp_max_size because its
+    memory grows exponentially. The parallel branch and bound method is executed only for sizes
+    between parallel_min_size and parallel_max_size to compare it with the serial one. Peak memory
+    is measured with tracemalloc in the current process, so memory of worker processes of the
+    parallel method is not included.
+
+    :param sizes: the numbers of addresses of generated matrices
+    :type sizes: list
+    :param seeds: the seeds of generated matrices of every kind and size
+    :type seeds: list
+    :param kinds: the kinds of generated matrices, defaults to all kinds of MatrixGenerator class
+    :type kinds: list
+    :param time_limit: the number of seconds after which branch and bound methods stop
+    :type time_limit: float
+    :param workers: the number of processes of the parallel branch and bound method
+    :type workers: int
+    """
+    held_karp_max_size = 16
+    parallel_min_size = 15
+    parallel_max_size = 20
+    heuristic_time_budget = 0.5
+
+    def __init__(self, sizes=(5, 10, 15, 20, 25), seeds=(0, 1, 2), kinds=None, time_limit=2.0, workers=None):
+        self.sizes = list(sizes)
+        self.seeds = list(seeds)
+        self.kinds = list(kinds or MatrixGenerator.kinds)
+        self.time_limit = time_limit
+        self.workers = workers or os.cpu_count()
+        self.results = list()
+
+    def solvers(self, size):
+        """Returns names of solvers which are executed for matrices of the given size.
+
+        :param size: the number of addresses
+        :type size: int
+
+        :return: names of solvers
+        :rtype: list
+        """
+        solvers = list()
+
+        if size <= self.held_karp_max_size:
+            solvers.append('held_karp')
+
+        solvers.extend(f'branch_and_bound_{bound}' for bound in Solver.bounds)
+
+        if self.parallel_min_size <= size <= self.parallel_max_size:
+            solvers.append('parallel_branch_and_bound')
+
+        solvers.append('local_search')
+
+        return solvers
+
+    def solve(self, solver_name, value_matrix):
+        """Resolves the route with the solver of the given name.
+
+        :param solver_name: the name of the solver returned by solvers method
+        :type solver_name: str
+        :param value_matrix: the duration matrix
+        :type value_matrix: numpy.ndarray
+
+        :return: the result of the solver and its statistics, None if the solver does not collect statistics
+        :rtype: tuple
+        """
+        if solver_name == 'held_karp':
+            return HeldKarpSolver(value_matrix).dynamic_programming_method(), None
+        if solver_name == 'local_search':
+            return HeuristicSolver(value_matrix, time_budget=self.heuristic_time_budget).local_search_method(), None
+        if solver_name == 'parallel_branch_and_bound':
+            solver = ParallelSolver(value_matrix, workers=self.workers, time_limit=self.time_limit)
+            return solver.parallel_branch_and_bound_method(), solver.stats
+
+        solver = Solver(value_matrix, time_limit=self.time_limit, bound=solver_name[len('branch_and_bound_'):])
+        return solver.branch_and_bound_method(), solver.stats
+
+    def measure(self, solver_name, value_matrix):
+        """Executes the solver and measures its time and peak memory.
+
+        :param solver_name: the name of the solver returned by solvers method
+        :type solver_name: str
+        :param value_matrix: the duration matrix
+        :type value_matrix: numpy.ndarray
+
+        :return: the result of the solver, its statistics, the number of seconds and the peak memory in bytes
+        :rtype: tuple
+        """
+        tracemalloc.start()
+        start_time = time.perf_counter()
+
+        try:
+            final_result, stats = self.solve(solver_name, value_matrix.copy())
+            elapsed_time = time.perf_counter() - start_time
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return final_result, stats, elapsed_time, peak_memory
+
+    def run(self):
+        """Executes all solvers on all generated matrices.
+
+        :return: the list of results, one result for every solver and every matrix
+        :rtype: list
+        """
+        self.results = list()
+
+        for kind in self.kinds:
+            for size in self.sizes:
+                for seed in self.seeds:
+                    value_matrix = MatrixGenerator.generate(kind, size, seed)
+
+                    for solver_name in self.solvers(size):
+                        final_result, stats, elapsed_time, peak_memory = self.measure(solver_name, value_matrix)
+                        self.results.append({
+                            'kind': kind,
+                            'size': size,
+                            'seed': seed,
+                            'solver': solver_name,
+                            'time': round(elapsed_time, 6),
+                            'peak_memory': peak_memory,
+                            'tour_duration': final_result['tour_duration'],
+                            'gap': final_result.get('gap', 0.0 if solver_name == 'held_karp' else None),
+                            'nodes_created': stats.nodes_created if stats else None,
+                        })
+
+        return self.results
+
+    def parallel_comparison(self):
+        """Compares the serial and the parallel branch and bound methods on the same matrices.
+
+        :return: for every matrix which has been resolved by both methods the time of both methods
+        and the speedup of the parallel method
+        :rtype: list
+        """
+        serial_times = {(result['kind'], result['size'], result['seed']): result['time']
+                        for result in self.results if result['solver'] == 'branch_and_bound_reduction'}
+        comparison = list()
+
+        for result in self.results:
+            key = (result['kind'], result['size'], result['seed'])
+
+            if result['solver'] == 'parallel_branch_and_bound' and key in serial_times:
+                comparison.append({
+                    'kind': result['kind'],
+                    'size': result['size'],
+                    'seed': result['seed'],
+                    'serial_time': serial_times[key],
+                    'parallel_time': result['time'],
+                    'speedup': round(serial_times[key] / result['time'], 3) if result['time'] else None,
+                })
+
+        return comparison
+
+    def write_results(self, path):
+        """Writes results and the description of the environment to JSON file.
+
+        :param path: the path of the file
+        :type path: str
+
+        :return: the written data
+        :rtype: dict
+        """
+        data = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'workers': self.workers,
+            },
+            'parameters': {
+                'sizes': self.sizes,
+                'seeds': self.seeds,
+                'kinds': self.kinds,
+                'time_limit': self.time_limit,
+                'heuristic_time_budget': self.heuristic_time_budget,
+            },
+            'results': self.results,
+            'parallel_comparison': self.parallel_comparison(),
+        }
+
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=2)
+
+        return data
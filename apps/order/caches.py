@@ -0,0 +1,658 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+
+from .addresses import AddressNormalizer
+from .backends import get_routing_backend
+from .models import GeocodedAddressModel, AddressDurationModel
+
+
+class GeocodingCache:
+    """GeocodingCache class is used for caching results of address validation.
+
+    Results are cached in two tiers: the LRU dictionary in the memory of the process and
+    the table of the database which is shared by all processes. Valid and invalid addresses
+    are cached for POSITIVE_TTL and NEGATIVE_TTL seconds of GEOCODING_CACHE setting, the number
+    of addresses in the memory is limited by MEMORY_SIZE option. Valid addresses are cached by
+    the normalized address, so all apartments of the building share the result, invalid ones are
+    cached by the whole cleaned address, so one wrong apartment or typo does not invalidate
+    the building. Errors of the request to the routing backend are not cached. Backends which
+    do not use the network are not cached.
+    """
+    entries = OrderedDict()
+    counters = {'memory_hits': 0, 'database_hits': 0, 'misses': 0}
+    lock = threading.Lock()
+
+    @staticmethod
+    def validate_address(address):
+        """Validates the address and returns its coordinates using cached results if they have not expired.
+
+        :param address: the address which is validated
+        :type address: str
+
+        :return: latitude and longitude of the address
+        :rtype: dict
+        :raises ValueError: if the address is not valid
+        """
+        backend = get_routing_backend()
+
+        if not backend.use_cache:
+            return backend.validate_address(address)
+
+        normalized_address = AddressNormalizer.normalize(address)
+        cleaned_address = AddressNormalizer.clean(address)
+        entry = GeocodingCache.get(normalized_address)
+
+        if entry is not None and not entry['is_valid'] and normalized_address != cleaned_address:
+            entry = None
+
+        if entry is None and normalized_address != cleaned_address:
+            entry = GeocodingCache.get(cleaned_address)
+
+        if entry is None:
+            GeocodingCache.count('misses')
+            validation = GeocodingCache.request_validation(backend, address)
+            entry = GeocodingCache.save(normalized_address if validation['is_valid'] else cleaned_address, validation)
+
+        if not entry['is_valid']:
+            raise ValueError('Given delivery address is not valid.')
+
+        return {'latitude': entry['latitude'], 'longitude': entry['longitude']}
+
+    @staticmethod
+    def get(key):
+        """Returns the result of validation from the memory of the process or from the database.
+
+        :param key: the normalized or the cleaned address
+        :type key: str
+
+        :return: the result of validation, None if it is absent or has expired
+        :rtype: dict
+        """
+        entry = GeocodingCache.get_from_memory(key)
+
+        if entry is None:
+            entry = GeocodingCache.get_from_database(key)
+
+        return entry
+
+    @staticmethod
+    def request_validation(backend, address):
+        """Validates the address with the routing backend.
+
+        :param backend: the routing backend
+        :type backend: RoutingBackend
+        :param address: the address
+        :type address: str
+
+        :return: the result of validation and coordinates of the address
+        :rtype: dict
+        """
+        try:
+            coordinates = backend.validate_address(address)
+        except ValueError:
+            return {'is_valid': False, 'latitude': None, 'longitude': None}
+
+        return {'is_valid': True, **coordinates}
+
+    @staticmethod
+    def expiration_time(is_valid, validation_time):
+        """Returns the moment when the result of validation expires.
+
+        :param is_valid: the result of validation
+        :type is_valid: bool
+        :param validation_time: the moment of validation
+        :type validation_time: datetime.datetime
+
+        :return: the moment of expiration
+        :rtype: datetime.datetime
+        """
+        ttl = settings.GEOCODING_CACHE['POSITIVE_TTL'] if is_valid else settings.GEOCODING_CACHE['NEGATIVE_TTL']
+
+        return validation_time + timedelta(seconds=ttl)
+
+    @staticmethod
+    def get_from_memory(normalized_address):
+        """Returns the result of validation from the memory of the process.
+
+        :param normalized_address: the normalized address
+        :type normalized_address: str
+
+        :return: the result of validation, None if it is absent or has expired
+        :rtype: dict
+        """
+        with GeocodingCache.lock:
+            entry = GeocodingCache.entries.get(normalized_address)
+
+            if entry is None:
+                return None
+            if entry['expiration_time'] <= timezone.now():
+                del GeocodingCache.entries[normalized_address]
+                return None
+
+            GeocodingCache.entries.move_to_end(normalized_address)
+            GeocodingCache.counters['memory_hits'] += 1
+
+        return entry
+
+    @staticmethod
+    def put_to_memory(normalized_address, entry):
+        """Saves the result of validation to the memory of the process and removes the least recently used one
+        if the number of addresses exceeds MEMORY_SIZE option.
+
+        :param normalized_address: the normalized address
+        :type normalized_address: str
+        :param entry: the result of validation
+        :type entry: dict
+
+        :return: None
+        """
+        with GeocodingCache.lock:
+            GeocodingCache.entries[normalized_address] = entry
+            GeocodingCache.entries.move_to_end(normalized_address)
+
+            while len(GeocodingCache.entries) > settings.GEOCODING_CACHE['MEMORY_SIZE']:
+                GeocodingCache.entries.popitem(last=False)
+
+    @staticmethod
+    def get_from_database(normalized_address):
+        """Returns the result of validation from the database and saves it to the memory of the process.
+
+        :param normalized_address: the normalized address
+        :type normalized_address: str
+
+        :return: the result of validation, None if it is absent or has expired
+        :rtype: dict
+        """
+        geocoded_address = GeocodedAddressModel.objects.filter(normalized_address=normalized_address).first()
+
+        if geocoded_address is None:
+            return None
+
+        expiration_time = GeocodingCache.expiration_time(geocoded_address.is_valid, geocoded_address.validation_time)
+
+        if expiration_time <= timezone.now():
+            return None
+
+        entry = {'is_valid': geocoded_address.is_valid, 'latitude': geocoded_address.latitude,
+                 'longitude': geocoded_address.longitude, 'expiration_time': expiration_time}
+        GeocodingCache.put_to_memory(normalized_address, entry)
+        GeocodingCache.count('database_hits')
+
+        return entry
+
+    @staticmethod
+    def save(normalized_address, validation):
+        """Saves the result of validation to the database and to the memory of the process.
+
+        :param normalized_address: the normalized address
+        :type normalized_address: str
+        :param validation: the result of validation returned by request_validation method
+        :type validation: dict
+
+        :return: the saved result of validation
+        :rtype: dict
+        """
+        validation_time = timezone.now()
+        GeocodedAddressModel.objects.update_or_create(normalized_address=normalized_address,
+                                                      defaults={**validation, 'validation_time': validation_time})
+
+        entry = {**validation, 'expiration_time': GeocodingCache.expiration_time(validation['is_valid'],
+                                                                                  validation_time)}
+        GeocodingCache.put_to_memory(normalized_address, entry)
+
+        return entry
+
+    @staticmethod
+    def count(counter):
+        """Increments the counter of cache hits or misses.
+
+        :param counter: the name of the counter
+        :type counter: str
+
+        :return: None
+        """
+        with GeocodingCache.lock:
+            GeocodingCache.counters[counter] += 1
+
+    @staticmethod
+    def statistics():
+        """Returns counters of cache hits and misses and the number of addresses in the memory.
+
+        :return: counters of the cache
+        :rtype: dict
+        """
+        with GeocodingCache.lock:
+            return {**GeocodingCache.counters, 'memory_size': len(GeocodingCache.entries)}
+
+    @staticmethod
+    def clear():
+        """Clears the memory of the process and counters. The database is not cleared.
+
+        :return: None
+        """
+        with GeocodingCache.lock:
+            GeocodingCache.entries.clear()
+
+            for counter in GeocodingCache.counters:
+                GeocodingCache.counters[counter] = 0
+
+
+class DurationCache:
+    """DurationCache class is used for caching durations of paths between addresses.
+
+    Every duration is stored in the database with the origin, the destination, the mode of movement
+    and the bucket of the time of day when it has been fetched. Buckets are BUCKET_MINUTES minutes
+    long and durations older than MAX_AGE seconds of DURATION_CACHE setting are not used and are
+    removed when new durations are saved. Only durations which are absent in the cache are requested
+    from the routing backend. Backends which do not use the network are not cached.
+    """
+    counters = {'hits': 0, 'misses': 0}
+    lock = threading.Lock()
+
+    @staticmethod
+    def get_value_matrix_between_addresses(addresses, mode, known_matrix=None):
+        """Returns the value matrix between given addresses assembled from cached and requested durations.
+
+        If durations between all addresses but the last one are known, only durations from the last
+        address and to it are looked up.
+
+        :param addresses: list of addresses for calculating value matrix between them
+        :type addresses: list
+        :param mode: the method of movement
+        :type mode: str
+        :param known_matrix: matrix of durations between all addresses but the last one, defaults to None
+        :type known_matrix: numpy.ndarray
+
+        :return: matrix of durations which describe time to from one address to another`s
+        :rtype: dict
+        """
+        backend = get_routing_backend()
+        duration_matrix = np.full((len(addresses), len(addresses)), np.Infinity)
+
+        if known_matrix is not None:
+            duration_matrix[:-1, :-1] = known_matrix
+
+        if not backend.use_cache:
+            if known_matrix is None:
+                duration_matrix = backend.get_durations(addresses, addresses, mode)
+            else:
+                duration_matrix[-1, :] = backend.get_durations(addresses[-1:], addresses, mode)[0]
+                duration_matrix[:-1, -1] = np.asarray(backend.get_durations(addresses[:-1], addresses[-1:], mode))[:, 0]
+
+            np.fill_diagonal(duration_matrix, np.Infinity)
+            return {'duration_matrix': duration_matrix}
+
+        keys = [AddressNormalizer.normalize(address) for address in addresses]
+        time_bucket = DurationCache.time_bucket(timezone.localtime())
+        durations = DurationCache.get_from_database(keys, mode, time_bucket,
+                                                    address_key=keys[-1] if known_matrix is not None else None)
+
+        missing_destinations = dict()
+        number_of_hits = 0
+
+        for i in range(len(addresses)):
+            for j in range(len(addresses)):
+                if i == j or known_matrix is not None and max(i, j) < len(addresses) - 1:
+                    continue
+                if keys[i] == keys[j]:
+                    duration_matrix[i][j] = 0
+                elif (keys[i], keys[j]) in durations:
+                    duration_matrix[i][j] = durations[(keys[i], keys[j])]
+                    number_of_hits += 1
+                else:
+                    missing_destinations.setdefault(i, list()).append(j)
+
+        DurationCache.count('hits', number_of_hits)
+        DurationCache.count('misses', sum(len(destinations) for destinations in missing_destinations.values()))
+
+        if missing_destinations:
+            fetched_durations = DurationCache.fetch(backend, addresses, mode, missing_destinations)
+
+            for (i, j), duration in fetched_durations.items():
+                duration_matrix[i][j] = duration
+
+            DurationCache.save(fetched_durations, keys, mode, time_bucket)
+
+        result = {'duration_matrix': duration_matrix}
+
+        return result
+
+    @staticmethod
+    def time_bucket(moment):
+        """Returns the number of the bucket of the time of day.
+
+        :param moment: the moment in local time
+        :type moment: datetime.datetime
+
+        :return: the number of the bucket
+        :rtype: int
+        """
+        return (moment.hour * 60 + moment.minute) // settings.DURATION_CACHE['BUCKET_MINUTES']
+
+    @staticmethod
+    def get_from_database(keys, mode, time_bucket, address_key=None):
+        """Returns cached durations between given addresses which have not expired.
+
+        :param keys: normalized addresses
+        :type keys: list
+        :param mode: the method of movement
+        :type mode: str
+        :param time_bucket: the number of the bucket of the time of day
+        :type time_bucket: int
+        :param address_key: the normalized address, if it is set, only durations from it and to it are returned
+        :type address_key: str
+
+        :return: durations by pairs of the normalized origin and destination
+        :rtype: dict
+        """
+        oldest_fetch_time = timezone.now() - timedelta(seconds=settings.DURATION_CACHE['MAX_AGE'])
+        address_durations = AddressDurationModel.objects.filter(origin__in=keys, destination__in=keys, mode=mode,
+                                                                time_bucket=time_bucket,
+                                                                fetch_time__gt=oldest_fetch_time)
+
+        if address_key is not None:
+            address_durations = address_durations.filter(Q(origin=address_key) | Q(destination=address_key))
+        durations = dict()
+
+        for origin, destination, duration in address_durations.values_list('origin', 'destination', 'duration'):
+            durations[(origin, destination)] = duration if duration is not None else np.Infinity
+
+        return durations
+
+    @staticmethod
+    def fetch(backend, addresses, mode, missing_destinations):
+        """Requests missing durations from the routing backend.
+
+        If at least a half of cells of the rectangle of all origins and destinations which miss durations
+        is missing, the whole rectangle is requested at once. Otherwise origins which miss the same
+        destinations are requested together, so a new address of the route costs one request for its row
+        and one request for its column.
+
+        :param backend: the routing backend
+        :type backend: RoutingBackend
+        :param addresses: list of addresses
+        :type addresses: list
+        :param mode: the method of movement
+        :type mode: str
+        :param missing_destinations: indexes of missing destinations by the index of the origin
+        :type missing_destinations: dict
+
+        :return: fetched durations by pairs of indexes of the origin and the destination
+        :rtype: dict
+        """
+        number_of_cells = sum(len(destinations) for destinations in missing_destinations.values())
+        all_origins = sorted(missing_destinations)
+        all_destinations = sorted(set().union(*missing_destinations.values()))
+        groups = dict()
+
+        if len(all_origins) * len(all_destinations) <= 2 * number_of_cells:
+            groups[tuple(all_destinations)] = all_origins
+        else:
+            for i, destinations in missing_destinations.items():
+                groups.setdefault(tuple(destinations), list()).append(i)
+
+        fetched_durations = dict()
+
+        for destinations, origins in groups.items():
+            durations = backend.get_durations([addresses[i] for i in origins], [addresses[j] for j in destinations],
+                                              mode)
+
+            for row, i in enumerate(origins):
+                for column, j in enumerate(destinations):
+                    if j in missing_destinations[i]:
+                        fetched_durations[(i, j)] = float(durations[row][column])
+
+        return fetched_durations
+
+    @staticmethod
+    def save(fetched_durations, keys, mode, time_bucket):
+        """Removes expired durations and saves fetched durations to the database.
+
+        :param fetched_durations: durations by pairs of indexes of the origin and the destination
+        :type fetched_durations: dict
+        :param keys: normalized addresses
+        :type keys: list
+        :param mode: the method of movement
+        :type mode: str
+        :param time_bucket: the number of the bucket of the time of day
+        :type time_bucket: int
+
+        :return: None
+        """
+        DurationCache.evict()
+
+        fetch_time = timezone.now()
+        address_durations = dict()
+
+        for (i, j), duration in fetched_durations.items():
+            address_durations[(keys[i], keys[j])] = AddressDurationModel(
+                origin=keys[i], destination=keys[j], mode=mode, time_bucket=time_bucket,
+                duration=duration if np.isfinite(duration) else None, fetch_time=fetch_time)
+
+        AddressDurationModel.objects.bulk_create(address_durations.values(), ignore_conflicts=True)
+
+    @staticmethod
+    def evict():
+        """Removes durations which are older than MAX_AGE option.
+
+        :return: the number of removed durations
+        :rtype: int
+        """
+        oldest_fetch_time = timezone.now() - timedelta(seconds=settings.DURATION_CACHE['MAX_AGE'])
+
+        return AddressDurationModel.objects.filter(fetch_time__lte=oldest_fetch_time).delete()[0]
+
+    @staticmethod
+    def count(counter, number):
+        """Increases the counter of cached or requested durations.
+
+        :param counter: the name of the counter
+        :type counter: str
+        :param number: the number of durations
+        :type number: int
+
+        :return: None
+        """
+        with DurationCache.lock:
+            DurationCache.counters[counter] += number
+
+    @staticmethod
+    def statistics():
+        """Returns counters of cached and requested durations.
+
+        :return: counters of the cache
+        :rtype: dict
+        """
+        with DurationCache.lock:
+            return dict(DurationCache.counters)
+
+    @staticmethod
+    def clear():
+        """Clears counters. The database is not cleared.
+
+        :return: None
+        """
+        with DurationCache.lock:
+            for counter in DurationCache.counters:
+                DurationCache.counters[counter] = 0
+
+
+class RouteCache:
+    """RouteCache class is used for caching routes of couriers.
+
+    The route is stored under the key of the courier in the Django cache selected by ALIAS of ROUTE_CACHE
+    setting for TIMEOUT seconds together with the fingerprint of the set of canonical addresses, the mode
+    of building the route, the method of movement and the bucket of the time of day of DurationCache class.
+    The route is used only while the fingerprint is the same, so the new order or the new time bucket make
+    the route outdated. Routes of couriers are dropped when orders assigned to them change the courier or
+    the status. The state of the route which is needed for updating it incrementally is stored under
+    the separate key and is not dropped.
+    """
+    counters = {'hits': 0, 'misses': 0}
+    lock = threading.Lock()
+
+    @staticmethod
+    def get_cache():
+        """Returns the Django cache which stores routes.
+
+        :return: the cache
+        :rtype: django.core.cache.backends.base.BaseCache
+        """
+        return caches[settings.ROUTE_CACHE['ALIAS']]
+
+    @staticmethod
+    def key(courier_id, kind='route'):
+        """Returns the key of the route of the courier.
+
+        :param courier_id: the id of the courier
+        :type courier_id: int
+        :param kind: 'route' for the route or 'route_state' for the state of the route
+        :type kind: str
+
+        :return: the key of the cache
+        :rtype: str
+        """
+        return f'order:{kind}:{courier_id}'
+
+    @staticmethod
+    def context(mode, travel_mode):
+        """Returns the parameters of building the route at the current time.
+
+        :param mode: the mode of building the route
+        :type mode: str
+        :param travel_mode: the method of movement
+        :type travel_mode: str
+
+        :return: the mode, the method of movement and the bucket of the time of day
+        :rtype: list
+        """
+        return [mode, travel_mode, DurationCache.time_bucket(timezone.localtime())]
+
+    @staticmethod
+    def fingerprint(address_keys, mode, travel_mode):
+        """Returns the fingerprint of the input of the route which is built at the current time.
+
+        :param address_keys: canonical addresses of the route
+        :type address_keys: collections.abc.Iterable
+        :param mode: the mode of building the route
+        :type mode: str
+        :param travel_mode: the method of movement
+        :type travel_mode: str
+
+        :return: the hexadecimal SHA-256 digest
+        :rtype: str
+        """
+        route_input = [sorted(address_keys), *RouteCache.context(mode, travel_mode)]
+
+        return hashlib.sha256(json.dumps(route_input, ensure_ascii=False).encode()).hexdigest()
+
+    @staticmethod
+    def get(courier_id, fingerprint):
+        """Returns the cached route of the courier if it has been built for the same input.
+
+        :param courier_id: the id of the courier
+        :type courier_id: int
+        :param fingerprint: the fingerprint of the input of the route
+        :type fingerprint: str
+
+        :return: the route, None if the route is not cached or is outdated
+        :rtype: dict
+        """
+        entry = RouteCache.get_cache().get(RouteCache.key(courier_id))
+
+        if entry is None or entry['fingerprint'] != fingerprint:
+            RouteCache.count('misses')
+            return None
+
+        RouteCache.count('hits')
+
+        return entry['route']
+
+    @staticmethod
+    def set(courier_id, fingerprint, route, state=None):
+        """Caches the route of the courier and the state of the route.
+
+        :param courier_id: the id of the courier
+        :type courier_id: int
+        :param fingerprint: the fingerprint of the input of the route
+        :type fingerprint: str
+        :param route: the route
+        :type route: dict
+        :param state: the state of the route, defaults to None if it is not changed
+        :type state: dict
+
+        :return: None
+        """
+        entries = {RouteCache.key(courier_id): {'fingerprint': fingerprint, 'route': route}}
+
+        if state is not None:
+            entries[RouteCache.key(courier_id, 'route_state')] = state
+
+        RouteCache.get_cache().set_many(entries, settings.ROUTE_CACHE['TIMEOUT'])
+
+    @staticmethod
+    def get_state(courier_id):
+        """Returns the cached state of the route of the courier.
+
+        :param courier_id: the id of the courier
+        :type courier_id: int
+
+        :return: the state of the route, None if it is not cached
+        :rtype: dict
+        """
+        return RouteCache.get_cache().get(RouteCache.key(courier_id, 'route_state'))
+
+    @staticmethod
+    def invalidate(*courier_ids):
+        """Drops cached routes of couriers.
+
+        :param courier_ids: ids of couriers, None values are skipped
+        :type courier_ids: int
+
+        :return: None
+        """
+        keys = [RouteCache.key(courier_id) for courier_id in set(courier_ids) if courier_id is not None]
+
+        if keys:
+            RouteCache.get_cache().delete_many(keys)
+
+    @staticmethod
+    def count(counter):
+        """Increments the counter of cached or built routes.
+
+        :param counter: the name of the counter
+        :type counter: str
+
+        :return: None
+        """
+        with RouteCache.lock:
+            RouteCache.counters[counter] += 1
+
+    @staticmethod
+    def statistics():
+        """Returns counters of cached and built routes.
+
+        :return: counters of the cache
+        :rtype: dict
+        """
+        with RouteCache.lock:
+            return dict(RouteCache.counters)
+
+    @staticmethod
+    def clear():
+        """Clears counters. Cached routes are not cleared.
+
+        :return: None
+        """
+        with RouteCache.lock:
+            for counter in RouteCache.counters:
+                RouteCache.counters[counter] = 0
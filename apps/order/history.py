@@ -0,0 +1,232 @@
+import math
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .addresses import AddressNormalizer
+from .backends import LocalRoutingBackend
+from .models import OrderModel, GeocodedAddressModel, DeliveryPaceModel
+
+
+class DeliveryDurationEstimator:
+    """DeliveryDurationEstimator class is used for estimating durations from the history of deliveries.
+
+    Every delivered order gives the pace of the courier: the number of seconds of delivery_duration
+    per kilometer of the straight line from DEPOT_ADDRESS of DELIVERY_HISTORY setting to the delivery
+    address. Paces are grouped by the cell of the map which is CELL_SIZE degrees wide and by the hour
+    of the week when the delivery has started, the median of every group is stored in the table of
+    DeliveryPaceModel by the fit method. The table is loaded to the memory of the process and reloaded
+    every RELOAD_INTERVAL seconds. If the group has less than MIN_SAMPLES paces, the pace of the whole
+    cell, then of the hour of the week, then of all deliveries is used.
+    """
+    table = None
+    load_time = None
+    lock = threading.Lock()
+
+    @staticmethod
+    def fit():
+        """Calculates paces of deliveries from delivered orders and replaces the stored table of paces.
+
+        :return: the number of delivered orders, the number of orders which are used and the number of groups
+        :rtype: dict
+        :raises ValueError: if coordinates of the depot are unknown
+        """
+        options = settings.DELIVERY_HISTORY
+        depot_coordinates = DeliveryDurationEstimator.get_coordinates(
+            [AddressNormalizer.normalize(options['DEPOT_ADDRESS'])])
+
+        if not depot_coordinates:
+            raise ValueError('Coordinates of the depot are unknown, its address must be validated first.')
+
+        depot = np.array(list(depot_coordinates.values()), dtype=float)
+        orders = list(OrderModel.objects.filter(status='delivered').values_list(
+            'delivery_address_key', 'delivery_start_time', 'delivery_duration'))
+        coordinates = DeliveryDurationEstimator.get_coordinates({order[0] for order in orders})
+        paces = defaultdict(list)
+        samples = 0
+
+        for delivery_address_key, delivery_start_time, delivery_duration in orders:
+            seconds = delivery_duration.hour * 3600 + delivery_duration.minute * 60 + delivery_duration.second
+
+            if delivery_address_key not in coordinates or not seconds:
+                continue
+
+            latitude, longitude = coordinates[delivery_address_key]
+            distance = LocalRoutingBackend.haversine_distances(depot, np.array([[latitude, longitude]]))[0][0]
+
+            if distance < options['MIN_DISTANCE']:
+                continue
+
+            group = (*DeliveryDurationEstimator.cell(latitude, longitude),
+                     DeliveryDurationEstimator.hour_of_week(delivery_start_time))
+            paces[group].append(seconds / distance)
+            samples += 1
+
+        fit_time = timezone.now()
+        delivery_paces = [DeliveryPaceModel(cell_latitude=cell_latitude, cell_longitude=cell_longitude,
+                                            hour_of_week=hour_of_week, pace=float(np.median(group_paces)),
+                                            samples=len(group_paces), fit_time=fit_time)
+                          for (cell_latitude, cell_longitude, hour_of_week), group_paces in paces.items()]
+
+        with transaction.atomic():
+            DeliveryPaceModel.objects.all().delete()
+            DeliveryPaceModel.objects.bulk_create(delivery_paces)
+
+        DeliveryDurationEstimator.clear()
+
+        return {'orders': len(orders), 'samples': samples, 'groups': len(delivery_paces)}
+
+    @staticmethod
+    def get_coordinates(keys):
+        """Returns stored coordinates of valid addresses.
+
+        :param keys: normalized addresses
+        :type keys: collections.abc.Iterable
+
+        :return: latitude and longitude by the normalized address, unknown addresses are omitted
+        :rtype: dict
+        """
+        geocoded_addresses = GeocodedAddressModel.objects.filter(normalized_address__in=keys, is_valid=True,
+                                                                 latitude__isnull=False, longitude__isnull=False)
+
+        return {normalized_address: (latitude, longitude) for normalized_address, latitude, longitude
+                in geocoded_addresses.values_list('normalized_address', 'latitude', 'longitude')}
+
+    @staticmethod
+    def cell(latitude, longitude):
+        """Returns the cell of the map which contains the point.
+
+        :param latitude: the latitude of the point in degrees
+        :type latitude: float
+        :param longitude: the longitude of the point in degrees
+        :type longitude: float
+
+        :return: indexes of the cell by latitude and by longitude
+        :rtype: tuple
+        """
+        cell_size = settings.DELIVERY_HISTORY['CELL_SIZE']
+
+        return math.floor(latitude / cell_size), math.floor(longitude / cell_size)
+
+    @staticmethod
+    def hour_of_week(moment):
+        """Returns the local hour of the week of the moment.
+
+        :param moment: the moment
+        :type moment: datetime.datetime
+
+        :return: the hour from 0 for Monday 00:00 to 167 for Sunday 23:00
+        :rtype: int
+        """
+        moment = timezone.localtime(moment)
+
+        return moment.weekday() * 24 + moment.hour
+
+    @staticmethod
+    def load():
+        """Returns the table of paces loading it from the database if it has not been loaded or is outdated.
+
+        :return: paces with the number of samples by groups, by cells, by hours of the week and of all deliveries
+        :rtype: dict
+        """
+        reload_interval = settings.DELIVERY_HISTORY['RELOAD_INTERVAL']
+
+        with DeliveryDurationEstimator.lock:
+            if DeliveryDurationEstimator.table is None or \
+                    time.monotonic() - DeliveryDurationEstimator.load_time > reload_interval:
+                DeliveryDurationEstimator.table = DeliveryDurationEstimator.build_table(
+                    DeliveryPaceModel.objects.values_list('cell_latitude', 'cell_longitude', 'hour_of_week',
+                                                          'pace', 'samples'))
+                DeliveryDurationEstimator.load_time = time.monotonic()
+
+            return DeliveryDurationEstimator.table
+
+    @staticmethod
+    def build_table(rows):
+        """Builds the table of paces with averages of medians of groups weighted by the number of samples.
+
+        :param rows: cell indexes, the hour of the week, the pace and the number of samples of every group
+        :type rows: collections.abc.Iterable
+
+        :return: paces with the number of samples by groups, by cells, by hours of the week and of all deliveries
+        :rtype: dict
+        """
+        sums = {'groups': defaultdict(lambda: [0.0, 0]), 'cells': defaultdict(lambda: [0.0, 0]),
+                'hours': defaultdict(lambda: [0.0, 0]), 'all': defaultdict(lambda: [0.0, 0])}
+
+        for cell_latitude, cell_longitude, hour_of_week, pace, samples in rows:
+            for level, key in (('groups', (cell_latitude, cell_longitude, hour_of_week)),
+                               ('cells', (cell_latitude, cell_longitude)), ('hours', hour_of_week), ('all', None)):
+                sums[level][key][0] += pace * samples
+                sums[level][key][1] += samples
+
+        return {level: {key: (pace_sum / samples, samples) for key, (pace_sum, samples) in level_sums.items()}
+                for level, level_sums in sums.items()}
+
+    @staticmethod
+    def pace(latitude, longitude, moment):
+        """Returns the pace of the delivery to the point at the moment.
+
+        :param latitude: the latitude of the point in degrees
+        :type latitude: float
+        :param longitude: the longitude of the point in degrees
+        :type longitude: float
+        :param moment: the moment when the delivery starts
+        :type moment: datetime.datetime
+
+        :return: the number of seconds per kilometer of the straight line, None if there is no history
+        :rtype: float
+        """
+        table = DeliveryDurationEstimator.load()
+        cell = DeliveryDurationEstimator.cell(latitude, longitude)
+        hour_of_week = DeliveryDurationEstimator.hour_of_week(moment)
+        min_samples = settings.DELIVERY_HISTORY['MIN_SAMPLES']
+
+        for level, key in (('groups', (*cell, hour_of_week)), ('cells', cell), ('hours', hour_of_week)):
+            pace, samples = table[level].get(key, (None, 0))
+
+            if samples >= min_samples:
+                return pace
+
+        return table['all'].get(None, (None, 0))[0]
+
+    @staticmethod
+    def clear():
+        """Drops the loaded table of paces, so it is loaded again at the next estimation.
+
+        :return: None
+        """
+        with DeliveryDurationEstimator.lock:
+            DeliveryDurationEstimator.table = None
+            DeliveryDurationEstimator.load_time = None
+
+
+class HistoricalRoutingBackend(LocalRoutingBackend):
+    """HistoricalRoutingBackend class estimates driving durations by paces of past deliveries.
+
+    The duration between addresses is the straight line distance multiplied by the pace of deliveries
+    to the cell of the destination at the current hour of the week. Other modes of movement and
+    the empty history are handled like by LocalRoutingBackend class.
+    """
+
+    def get_durations(self, origins, destinations, mode):
+        now = timezone.now()
+
+        if mode != 'driving' or not DeliveryDurationEstimator.load()['all']:
+            return super().get_durations(origins, destinations, mode)
+
+        coordinates = self.get_coordinates(list(origins) + list(destinations))
+
+        if np.isnan(coordinates).any():
+            raise ValueError('Coordinates of some addresses are unknown.')
+
+        paces = np.array([DeliveryDurationEstimator.pace(latitude, longitude, now)
+                          for latitude, longitude in coordinates[len(origins):]])
+        distances = self.haversine_distances(coordinates[:len(origins)], coordinates[len(origins):])
+
+        return np.round(distances * paces[np.newaxis, :])
@@ -0,0 +1,279 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.RequestException):
+    """Exception is raised when requests to the upstream are rejected by the circuit breaker."""
+
+
+class CircuitBreaker:
+    """CircuitBreaker class is used for stopping requests to the upstream which keeps failing.
+
+    After failure_threshold failures in a row the circuit opens and requests are rejected without
+    being sent. When reset_timeout seconds pass, one trial request is let through: the circuit closes
+    if it succeeds and opens again if it fails.
+
+    :param failure_threshold: the number of failures in a row after which the circuit opens
+    :type failure_threshold: int
+    :param reset_timeout: the number of seconds after which the trial request is let through
+    :type reset_timeout: float
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opening_time = None
+        self.trial_request = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Returns the state of the circuit.
+
+        :return: 'closed', 'open' or 'half_open'
+        :rtype: str
+        """
+        if self.opening_time is None:
+            return 'closed'
+        if time.monotonic() - self.opening_time >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow_request(self):
+        """Checks whether the request can be sent to the upstream.
+
+        :return: True if the circuit is closed or if the request is the trial one
+        :rtype: bool
+        """
+        with self.lock:
+            state = self.state
+
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_request:
+                self.trial_request = True
+                return True
+            return False
+
+    def record_success(self):
+        """Closes the circuit after a successful request.
+
+        :return: None
+        """
+        with self.lock:
+            self.failures = 0
+            self.opening_time = None
+            self.trial_request = False
+
+    def record_failure(self):
+        """Counts the failed request and opens the circuit if the threshold is reached.
+
+        :return: None
+        """
+        with self.lock:
+            self.failures += 1
+            self.trial_request = False
+
+            if self.opening_time is not None or self.failures >= self.failure_threshold:
+                self.opening_time = time.monotonic()
+
+
+class HttpClient:
+    """HttpClient class is used for sending requests to one upstream.
+
+    Connections are kept in the pool of the session and reused by all threads. Every attempt is
+    limited by the timeout, failed attempts caused by connection errors, timeouts, 429 and 5xx
+    responses are repeated after a random delay which grows exponentially (full jitter). All attempts
+    of one request and delays between them end before its deadline, so the request never takes much
+    longer than total_timeout seconds. Requests are counted by the circuit breaker and the latency of
+    every attempt is collected in metrics.
+
+    :param name: the name of the upstream used in metrics
+    :type name: str
+    :param timeout: the number of seconds to connect and to read the response
+    :type timeout: tuple
+    :param total_timeout: the number of seconds of all attempts of one request
+    :type total_timeout: float
+    :param retries: the number of repeated attempts
+    :type retries: int
+    :param backoff: the number of seconds of the first delay before the repeated attempt
+    :type backoff: float
+    :param max_backoff: the highest number of seconds of the delay
+    :type max_backoff: float
+    :param pool_size: the number of connections kept in the pool
+    :type pool_size: int
+    :param circuit_breaker: the circuit breaker of the upstream, defaults to None for the new one
+    :type circuit_breaker: CircuitBreaker
+    """
+    retry_status_codes = (429, 500, 502, 503, 504)
+    latency_buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, timeout=(3.05, 10.0), total_timeout=15.0, retries=2, backoff=0.2, max_backoff=2.0,
+                 pool_size=10, circuit_breaker=None):
+        self.name = name
+        self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.lock = threading.Lock()
+        self.metrics = self.create_metrics()
+
+    def create_metrics(self):
+        """Creates empty metrics of the upstream.
+
+        :return: counters of requests, attempts, retries, failures and rejections, the sum and the maximum
+        of latencies and counts of latencies which do not exceed every bucket of latency_buckets attribute
+        :rtype: dict
+        """
+        metrics = {
+            'upstream': self.name,
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'failures': 0,
+            'rejected': 0,
+            'latency_sum': 0.0,
+            'latency_max': 0.0,
+            'latency_buckets': {str(bucket): 0 for bucket in HttpClient.latency_buckets},
+        }
+
+        return metrics
+
+    def get_json(self, url, params=None, deadline=None, retries=None):
+        """Sends GET request to the upstream and returns the decoded JSON response.
+
+        :param url: the URL of the request
+        :type url: str
+        :param params: query parameters of the request
+        :type params: dict
+        :param deadline: the value of time.monotonic after which no attempts are made, defaults to None
+        for total_timeout seconds from now
+        :type deadline: float
+        :param retries: the number of repeated attempts, defaults to None for retries attribute
+        :type retries: int
+
+        :return: the decoded response
+        :rtype: dict
+        :raises CircuitOpenError: if the circuit of the upstream is open
+        :raises requests.RequestException: if all attempts have failed or the deadline has passed
+        """
+        self.count('requests')
+
+        if deadline is None:
+            deadline = time.monotonic() + self.total_timeout
+        if retries is None:
+            retries = self.retries
+
+        if not self.circuit_breaker.allow_request():
+            self.count('rejected')
+            raise CircuitOpenError(f'Requests to {self.name} are stopped by the circuit breaker.')
+
+        error = requests.Timeout(f'The deadline of the request to {self.name} has passed.')
+
+        for attempt in range(retries + 1):
+            if attempt:
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+                if time.monotonic() + delay >= deadline:
+                    break
+
+                self.count('retries')
+                time.sleep(delay)
+
+            remaining_time = deadline - time.monotonic()
+
+            if remaining_time <= 0:
+                break
+
+            start_time = time.perf_counter()
+
+            try:
+                response = self.session.get(url, params=params,
+                                            timeout=tuple(min(part, remaining_time) for part in self.timeout))
+            except (requests.ConnectionError, requests.Timeout) as err:
+                self.record_latency(time.perf_counter() - start_time)
+                error = err
+                continue
+            except requests.RequestException:
+                self.count('failures')
+                self.circuit_breaker.record_failure()
+                raise
+
+            self.record_latency(time.perf_counter() - start_time)
+
+            if response.status_code in HttpClient.retry_status_codes:
+                error = requests.HTTPError(f'{self.name} responded with status {response.status_code}.',
+                                           response=response)
+                continue
+
+            self.circuit_breaker.record_success()
+
+            if not response.ok:
+                self.count('failures')
+                response.raise_for_status()
+
+            return response.json()
+
+        self.count('failures')
+        self.circuit_breaker.record_failure()
+        raise error
+
+    def record_latency(self, latency):
+        """Adds the latency of the attempt to metrics.
+
+        :param latency: the number of seconds of the attempt
+        :type latency: float
+
+        :return: None
+        """
+        with self.lock:
+            self.metrics['attempts'] += 1
+            self.metrics['latency_sum'] += latency
+            self.metrics['latency_max'] = max(self.metrics['latency_max'], latency)
+
+            for bucket in HttpClient.latency_buckets:
+                if latency <= bucket:
+                    self.metrics['latency_buckets'][str(bucket)] += 1
+
+    def count(self, counter):
+        """Increments the counter of metrics.
+
+        :param counter: the name of the counter
+        :type counter: str
+
+        :return: None
+        """
+        with self.lock:
+            self.metrics[counter] += 1
+
+    def statistics(self):
+        """Returns metrics of the upstream with the average latency and the state of the circuit.
+
+        :return: metrics of the upstream
+        :rtype: dict
+        """
+        with self.lock:
+            metrics = {**self.metrics, 'latency_buckets': dict(self.metrics['latency_buckets'])}
+
+        metrics['latency_average'] = metrics['latency_sum'] / metrics['attempts'] if metrics['attempts'] else 0.0
+        metrics['circuit'] = self.circuit_breaker.state
+
+        return metrics
+
+    def reset_metrics(self):
+        """Clears metrics of the upstream.
+
+        :return: None
+        """
+        with self.lock:
+            self.metrics = self.create_metrics()
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...benchmarks import MatrixGenerator, RouteSolverBenchmark
+
+
+class Command(BaseCommand):
+    help = 'Runs route solvers on generated duration matrices and writes results to JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[5, 10, 15, 20, 25],
+                            help='The numbers of addresses of generated matrices.')
+        parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2],
+                            help='The seeds of generated matrices of every kind and size.')
+        parser.add_argument('--kinds', nargs='+', choices=MatrixGenerator.kinds, default=list(MatrixGenerator.kinds),
+                            help='The kinds of generated matrices.')
+        parser.add_argument('--time-limit', type=float, default=settings.ROUTE_SOLVER['EXACT_TIME_LIMIT'],
+                            help='The number of seconds after which branch and bound methods stop.')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='The number of processes of the parallel branch and bound method.')
+        parser.add_argument('--output', default='route_solvers_benchmark.json', help='The path of the result file.')
+
+    def handle(self, *args, **options):
+        benchmark = RouteSolverBenchmark(sizes=options['sizes'], seeds=options['seeds'], kinds=options['kinds'],
+                                         time_limit=options['time_limit'], workers=options['workers'])
+        benchmark.run()
+        data = benchmark.write_results(options['output'])
+
+        for result in data['results']:
+            self.stdout.write(f"{result['kind']:>9} {result['size']:>3} {result['seed']:>3} {result['solver']:>30} "
+                              f"{result['time']:>10.4f}s {result['peak_memory'] / 1024:>10.1f}KiB "
+                              f"{result['tour_duration']:>10.0f}")
+
+        for comparison in data['parallel_comparison']:
+            self.stdout.write(f"{comparison['kind']:>9} {comparison['size']:>3} {comparison['seed']:>3} "
+                              f"serial {comparison['serial_time']:.4f}s parallel {comparison['parallel_time']:.4f}s "
+                              f"speedup {comparison['speedup']}")
+
+        self.stdout.write(self.style.SUCCESS(f"Results are written to {options['output']}."))
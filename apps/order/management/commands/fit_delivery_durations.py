@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...history import DeliveryDurationEstimator
+
+
+class Command(BaseCommand):
+    help = 'Calculates paces of couriers by areas and hours of the week from the history of delivered orders.'
+
+    def handle(self, *args, **options):
+        try:
+            result = DeliveryDurationEstimator.fit()
+        except ValueError as err:
+            raise CommandError(str(err))
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered orders: {result['orders']}, used: {result['samples']}, "
+                                             f"groups: {result['groups']}."))
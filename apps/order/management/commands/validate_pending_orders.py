@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from ...models import OrderModel
+from ...workers import AddressValidationWorker
+
+
+class Command(BaseCommand):
+    help = "Validates delivery addresses of orders which have 'pending_validation' status."
+
+    def handle(self, *args, **options):
+        order_ids = OrderModel.objects.filter(status=AddressValidationWorker.pending_status) \
+            .order_by('id').values_list('id', flat=True)
+        statuses = {'created': 0, 'rejected': 0, None: 0}
+
+        for order_id in order_ids:
+            try:
+                statuses[AddressValidationWorker.validate_order(order_id)] += 1
+            except Exception as err:
+                statuses[None] += 1
+                self.stderr.write(f'Order {order_id} has not been validated: {err}')
+
+        self.stdout.write(self.style.SUCCESS(f"Created: {statuses['created']}, rejected: {statuses['rejected']}, "
+                                             f"still pending: {statuses[None]}."))
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0002_rename_delivery_time_ordermodel_delivery_duration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodedAddressModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized_address', models.CharField(max_length=200, unique=True)),
+                ('is_valid', models.BooleanField()),
+                ('latitude', models.FloatField(null=True)),
+                ('longitude', models.FloatField(null=True)),
+                ('validation_time', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'geocoded_addresses',
+            },
+        ),
+    ]
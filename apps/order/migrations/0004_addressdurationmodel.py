@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0003_geocodedaddressmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AddressDurationModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin', models.CharField(max_length=200)),
+                ('destination', models.CharField(max_length=200)),
+                ('mode', models.CharField(max_length=16)),
+                ('time_bucket', models.SmallIntegerField()),
+                ('duration', models.FloatField(null=True)),
+                ('fetch_time', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'address_durations',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='addressdurationmodel',
+            constraint=models.UniqueConstraint(fields=('origin', 'destination', 'mode', 'time_bucket'), name='unique_address_duration'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+from apps.order.addresses import AddressNormalizer
+
+
+def fill_delivery_address_keys(apps, schema_editor):
+    order_model = apps.get_model('order', 'OrderModel')
+    orders = list(order_model.objects.only('id', 'delivery_address'))
+
+    for order in orders:
+        order.delivery_address_key = AddressNormalizer.normalize(order.delivery_address)
+
+    order_model.objects.bulk_update(orders, ['delivery_address_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0004_addressdurationmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordermodel',
+            name='delivery_address_key',
+            field=models.CharField(db_index=True, default='', max_length=200),
+        ),
+        migrations.RunPython(fill_delivery_address_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0005_ordermodel_delivery_address_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryPaceModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_latitude', models.IntegerField()),
+                ('cell_longitude', models.IntegerField()),
+                ('hour_of_week', models.SmallIntegerField()),
+                ('pace', models.FloatField()),
+                ('samples', models.IntegerField()),
+                ('fit_time', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'delivery_paces',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='deliverypacemodel',
+            constraint=models.UniqueConstraint(fields=('cell_latitude', 'cell_longitude', 'hour_of_week'), name='unique_delivery_pace'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0006_deliverypacemodel'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordermodel',
+            index=models.Index(condition=models.Q(('status__in', ('confirmed', 'in_the_road'))), fields=['courier', 'status'], name='active_courier_orders_idx'),
+        ),
+    ]
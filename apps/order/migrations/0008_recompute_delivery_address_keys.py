@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:30
+
+from django.db import migrations
+
+from apps.order.addresses import AddressNormalizer
+
+
+def recompute_delivery_address_keys(apps, schema_editor):
+    order_model = apps.get_model('order', 'OrderModel')
+    orders = list(order_model.objects.only('id', 'delivery_address', 'delivery_address_key'))
+    changed_orders = list()
+
+    for order in orders:
+        delivery_address_key = AddressNormalizer.normalize(order.delivery_address)
+
+        if delivery_address_key != order.delivery_address_key:
+            order.delivery_address_key = delivery_address_key
+            changed_orders.append(order)
+
+    order_model.objects.bulk_update(changed_orders, ['delivery_address_key'], batch_size=500)
+    apps.get_model('order', 'GeocodedAddressModel').objects.all().delete()
+    apps.get_model('order', 'AddressDurationModel').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_ordermodel_active_courier_orders_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_delivery_address_keys, migrations.RunPython.noop),
+    ]
@@ -3,11 +3,19 @@ from datetime import time
 
 from ..user.models import CustomUserModel
 from ..pizza.models import PizzaSizeModel
+from .addresses import AddressNormalizer
+
+
+ACTIVE_ORDER_STATUSES = ('confirmed', 'in_the_road')
 
 
 class OrderModel(models.Model):
     class Meta:
         db_table = 'orders'
+        indexes = [
+            models.Index(fields=['courier', 'status'], name='active_courier_orders_idx',
+                         condition=models.Q(status__in=ACTIVE_ORDER_STATUSES))
+        ]
 
     status = models.CharField(max_length=24, default='created')
     creation_time = models.DateTimeField(auto_now_add=True)
@@ -15,6 +23,7 @@ class OrderModel(models.Model):
     delivery_start_time = models.DateTimeField(auto_now_add=True)
     delivery_duration = models.TimeField(default=time())
     delivery_address = models.CharField(max_length=100)
+    delivery_address_key = models.CharField(max_length=200, db_index=True, default='')
     payment_method = models.CharField(max_length=4)
     comment = models.CharField(max_length=200)
     total = models.SmallIntegerField(default=0)
@@ -22,6 +31,15 @@ class OrderModel(models.Model):
     user = models.ForeignKey(CustomUserModel, on_delete=models.CASCADE, related_name='orders')
     courier = models.ForeignKey(CustomUserModel, on_delete=models.PROTECT, related_name='delivers', null=True)
 
+    def save(self, *args, **kwargs):
+        self.delivery_address_key = AddressNormalizer.normalize(self.delivery_address)
+        update_fields = kwargs.get('update_fields')
+
+        if update_fields is not None and 'delivery_address' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'delivery_address_key'}
+
+        super().save(*args, **kwargs)
+
 
 class OrderPizzaSizeModel(models.Model):
     class Meta:
@@ -31,3 +49,46 @@ class OrderPizzaSizeModel(models.Model):
 
     order = models.ForeignKey(OrderModel, on_delete=models.CASCADE, related_name='pizzas')
     pizza_size = models.ForeignKey(PizzaSizeModel, on_delete=models.PROTECT)
+
+
+class GeocodedAddressModel(models.Model):
+    class Meta:
+        db_table = 'geocoded_addresses'
+
+    normalized_address = models.CharField(max_length=200, unique=True)
+    is_valid = models.BooleanField()
+    latitude = models.FloatField(null=True)
+    longitude = models.FloatField(null=True)
+    validation_time = models.DateTimeField()
+
+
+class AddressDurationModel(models.Model):
+    class Meta:
+        db_table = 'address_durations'
+        constraints = [
+            models.UniqueConstraint(fields=['origin', 'destination', 'mode', 'time_bucket'],
+                                    name='unique_address_duration')
+        ]
+
+    origin = models.CharField(max_length=200)
+    destination = models.CharField(max_length=200)
+    mode = models.CharField(max_length=16)
+    time_bucket = models.SmallIntegerField()
+    duration = models.FloatField(null=True)
+    fetch_time = models.DateTimeField(db_index=True)
+
+
+class DeliveryPaceModel(models.Model):
+    class Meta:
+        db_table = 'delivery_paces'
+        constraints = [
+            models.UniqueConstraint(fields=['cell_latitude', 'cell_longitude', 'hour_of_week'],
+                                    name='unique_delivery_pace')
+        ]
+
+    cell_latitude = models.IntegerField()
+    cell_longitude = models.IntegerField()
+    hour_of_week = models.SmallIntegerField()
+    pace = models.FloatField()
+    samples = models.IntegerField()
+    fit_time = models.DateTimeField()
@@ -0,0 +1,228 @@
+import logging
+
+import numpy as np
+from django.conf import settings
+
+from .addresses import AddressNormalizer
+from .caches import DurationCache, RouteCache
+from .models import OrderModel, ACTIVE_ORDER_STATUSES
+from .services import RouteSolver, IncrementalSolver
+
+logger = logging.getLogger(__name__)
+
+
+class RoutePlanner:
+    """RoutePlanner class is used for building routes of couriers.
+
+    The route starts and ends at the depot and visits every building of orders of the courier which are
+    confirmed or in the road once. The route contains at most MAX_ORDERS orders of ROUTE_PLANNER setting,
+    the earliest confirmed ones, other orders are reported as skipped. Built routes are
+    cached by RouteCache class. If the cached route is outdated only because at most INCREMENTAL_MAX_CHANGES
+    buildings of ROUTE_CACHE setting have been added to it or removed from it since it has been built in
+    the same mode within the same time bucket, the route is updated by IncrementalSolver class, so only
+    durations from the new buildings and to them are needed. Routes in exact mode and routes in debug
+    mode are always resolved from scratch.
+    """
+    depot_address = 'Шараневича 28, Львів'
+    travel_mode = 'driving'
+
+    @staticmethod
+    def get_delivery_addresses(courier_id):
+        """Returns addresses of active orders of the courier which fit into the route.
+
+        :param courier_id: the id of the courier
+        :type courier_id: int
+
+        :return: pairs of the delivery address and its canonical key and the number of skipped orders
+        :rtype: tuple
+        """
+        max_orders = settings.ROUTE_PLANNER['MAX_ORDERS']
+        active_orders = OrderModel.objects.filter(courier_id=courier_id, status__in=ACTIVE_ORDER_STATUSES)
+        delivery_addresses = list(active_orders.order_by('confirmation_time', 'id').values_list(
+            'delivery_address', 'delivery_address_key')[:max_orders + 1])
+        skipped_orders = 0
+
+        if len(delivery_addresses) > max_orders:
+            skipped_orders = active_orders.count() - max_orders
+            delivery_addresses = delivery_addresses[:max_orders]
+            logger.warning('Route of courier %s is limited to %s orders, %s orders are skipped.',
+                           courier_id, max_orders, skipped_orders)
+
+        return delivery_addresses, skipped_orders
+
+    @staticmethod
+    def plan(courier_id, delivery_addresses, mode='auto', debug=False):
+        """Returns the route of the courier.
+
+        :param courier_id: the id of the courier
+        :type courier_id: int
+        :param delivery_addresses: pairs of the delivery address and its canonical key of orders of the courier
+        :type delivery_addresses: collections.abc.Iterable
+        :param mode: the way of resolving the route, one of 'exact', 'heuristic' and 'auto'
+        :type mode: str
+        :param debug: indicates whether statistics of the algorithm are added to the result
+        :type debug: bool
+
+        :return: addresses in the order of visiting with the depot at the start and at the end of the route
+        and statistics of the algorithm in debug mode
+        :rtype: dict
+        :raises ValueError: if durations between addresses can not be found
+        """
+        addresses = [RoutePlanner.depot_address]
+        address_keys = [AddressNormalizer.normalize(RoutePlanner.depot_address)]
+        known_keys = set(address_keys)
+
+        for delivery_address, delivery_address_key in delivery_addresses:
+            if delivery_address_key not in known_keys:
+                known_keys.add(delivery_address_key)
+                addresses.append(delivery_address)
+                address_keys.append(delivery_address_key)
+
+        if len(addresses) == 1:
+            return {'route_points': [RoutePlanner.depot_address, RoutePlanner.depot_address]}
+
+        fingerprint = RouteCache.fingerprint(address_keys, mode, RoutePlanner.travel_mode)
+
+        if not debug:
+            result = RouteCache.get(courier_id, fingerprint)
+
+            if result is not None:
+                return result
+
+        state = None
+        stats = None
+
+        if not debug and mode != 'exact':
+            state = RoutePlanner.update_state(RouteCache.get_state(courier_id), addresses, address_keys, mode)
+
+        if state is None:
+            state, stats = RoutePlanner.solve(addresses, address_keys, mode, debug)
+
+        result = {'route_points': [state['addresses'][i] for i in state['route']] + [RoutePlanner.depot_address]}
+        RouteCache.set(courier_id, fingerprint, result, state)
+
+        if debug:
+            result = {**result, 'solver_stats': stats}
+
+        return result
+
+    @staticmethod
+    def solve(addresses, address_keys, mode, debug):
+        """Resolves the route from scratch.
+
+        :param addresses: addresses of the route, the first one is the depot
+        :type addresses: list
+        :param address_keys: canonical keys of addresses
+        :type address_keys: list
+        :param mode: the way of resolving the route
+        :type mode: str
+        :param debug: indicates whether statistics of the algorithm are returned
+        :type debug: bool
+
+        :return: the state of the route and statistics of the algorithm which are None if debug is False
+        :rtype: tuple
+        """
+        duration_matrix = DurationCache.get_value_matrix_between_addresses(
+            addresses=addresses, mode=RoutePlanner.travel_mode)['duration_matrix']
+        solver_result = RouteSolver.solve(duration_matrix, mode=mode, options=settings.ROUTE_SOLVER, debug=debug)
+
+        state = RoutePlanner.create_state(mode, addresses, address_keys, duration_matrix,
+                                          RoutePlanner.tour_order(solver_result['tour']))
+
+        return state, solver_result.get('stats')
+
+    @staticmethod
+    def update_state(state, addresses, address_keys, mode):
+        """Updates the state of the cached route by removing and adding buildings one by one.
+
+        :param state: the state of the cached route
+        :type state: dict
+        :param addresses: addresses of the new route, the first one is the depot
+        :type addresses: list
+        :param address_keys: canonical keys of addresses
+        :type address_keys: list
+        :param mode: the way of resolving the route
+        :type mode: str
+
+        :return: the state of the new route, None if the route must be resolved from scratch
+        :rtype: dict
+        """
+        if state is None or state['context'] != RouteCache.context(mode, RoutePlanner.travel_mode):
+            return None
+
+        new_keys = set(address_keys)
+        old_keys = set(state['address_keys'])
+        removed_keys = [key for key in state['address_keys'] if key not in new_keys]
+        added_addresses = [(address, key) for address, key in zip(addresses, address_keys) if key not in old_keys]
+
+        if len(removed_keys) + len(added_addresses) > settings.ROUTE_CACHE['INCREMENTAL_MAX_CHANGES']:
+            return None
+
+        repair_moves = settings.ROUTE_CACHE['INCREMENTAL_REPAIR_MOVES']
+        route_addresses = list(state['addresses'])
+        route_keys = list(state['address_keys'])
+        duration_matrix = np.array(state['duration_matrix'], dtype=np.float64)
+        route = state['route']
+
+        for key in removed_keys:
+            index = route_keys.index(key)
+            solver_result = IncrementalSolver(duration_matrix, route, repair_moves=repair_moves).remove_method(index)
+            duration_matrix = np.delete(np.delete(duration_matrix, index, axis=0), index, axis=1)
+            del route_addresses[index], route_keys[index]
+            route = RoutePlanner.tour_order(solver_result['tour'])
+
+        for address, key in added_addresses:
+            route_addresses.append(address)
+            route_keys.append(key)
+            duration_matrix = DurationCache.get_value_matrix_between_addresses(
+                route_addresses, RoutePlanner.travel_mode, known_matrix=duration_matrix)['duration_matrix']
+            solver_result = IncrementalSolver(duration_matrix, route, repair_moves=repair_moves).insert_method()
+            route = RoutePlanner.tour_order(solver_result['tour'])
+
+        return RoutePlanner.create_state(mode, route_addresses, route_keys, duration_matrix, route)
+
+    @staticmethod
+    def create_state(mode, addresses, address_keys, duration_matrix, route):
+        """Creates the state of the route which is cached for updating the route incrementally.
+
+        :param mode: the way of resolving the route
+        :type mode: str
+        :param addresses: addresses of the route in the order of rows of the duration matrix
+        :type addresses: list
+        :param address_keys: canonical keys of addresses
+        :type address_keys: list
+        :param duration_matrix: matrix of durations between addresses
+        :type duration_matrix: numpy.ndarray
+        :param route: indexes of addresses in the order of visiting which starts with the depot
+        :type route: list
+
+        :return: the state of the route
+        :rtype: dict
+        """
+        state = {
+            'context': RouteCache.context(mode, RoutePlanner.travel_mode),
+            'addresses': addresses,
+            'address_keys': address_keys,
+            'duration_matrix': np.asarray(duration_matrix, dtype=np.float64).tolist(),
+            'route': route,
+        }
+
+        return state
+
+    @staticmethod
+    def tour_order(tour):
+        """Turns paths of the tour into the order of visiting of addresses.
+
+        :param tour: paths of the tour with indexes of addresses at their start and at their end
+        :type tour: list
+
+        :return: indexes of addresses in the order of visiting which starts with the first address
+        :rtype: list
+        """
+        next_addresses = {path['from']: path['to'] for path in tour}
+        order = [0]
+
+        while len(order) < len(tour):
+            order.append(next_addresses[order[-1]])
+
+        return order
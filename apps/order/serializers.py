@@ -1,10 +1,34 @@
+from django.db import transaction
+from rest_framework.relations import PrimaryKeyRelatedField
 from rest_framework.serializers import ModelSerializer
 
 from .models import OrderModel, OrderPizzaSizeModel
-from ..pizza.serializers import PizzaSizeSerializer
+from ..pizza.caches import PizzaSizeCache
+from ..pizza.models import PizzaSizeModel
+
+
+class CachedPizzaSizeField(PrimaryKeyRelatedField):
+    """Field resolves ids of pizza sizes with PizzaSizeCache instead of querying the database."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        try:
+            pizza_size = PizzaSizeCache.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        if pizza_size is None:
+            self.fail('does_not_exist', pk_value=data)
+
+        return PizzaSizeModel(id=int(data), price=pizza_size['price'], pizza_id=pizza_size['pizza'],
+                              diameter=pizza_size['diameter'])
 
 
 class OrderPizzaSizeSerializer(ModelSerializer):
+    pizza_size = CachedPizzaSizeField(queryset=PizzaSizeModel.objects.all())
+
     class Meta:
         model = OrderPizzaSizeModel
         fields = ['id', 'order', 'pizza_size', 'number_of_pizza']
@@ -29,20 +53,12 @@ class FullOrderSerializer(ModelSerializer):
                   'delivery_duration', 'delivery_address', 'payment_method', 'comment', 'total', 'pizzas']
         extra_kwargs = {'courier': {'required': False}, 'total': {'read_only': True}, 'user': {'read_only': True}}
 
+    @transaction.atomic
     def create(self, validated_data):
         pizzas = list(validated_data.pop('pizzas'))
-        order = OrderModel.objects.create(**validated_data)
-        total = 0
-
-        for pizza in pizzas:
-            pizza_size_serializer = PizzaSizeSerializer(pizza['pizza_size'])
-            pizza['pizza_size'] = pizza_size_serializer.data.get('id')
-            serializer = OrderPizzaSizeSerializer(data=pizza)
-            serializer.is_valid(raise_exception=True)
-            serializer.save(order=order)
-            total += pizza_size_serializer.data.get('price') * pizza['number_of_pizza']
-
-        order.total = total
-        order.save()
+        total = sum(pizza['pizza_size'].price * pizza['number_of_pizza'] for pizza in pizzas)
+
+        order = OrderModel.objects.create(**validated_data, total=total)
+        OrderPizzaSizeModel.objects.bulk_create([OrderPizzaSizeModel(order=order, **pizza) for pizza in pizzas])
 
         return order
@@ -1,35 +1,103 @@
 import requests
 import numpy as np
-import copy
-import os
+import heapq
+import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .http_client import HttpClient
+
+logger = logging.getLogger(__name__)
 
 
 class GeocodingAPI:
-    api_key = os.environ.get('GOOGLE_MAPS_API_KEY')
+    """GeocodingAPI class is used for working with Google Geocoding API.
+
+    Requests are sent by the shared http_client, so connections to the API are reused and failed
+    requests are repeated up to retries times before the deadline of request_timeout seconds.
+
+    :param api_key: the key of Google Maps Platform
+    :type api_key: str
+    :param request_timeout: the number of seconds of all attempts of one request
+    :type request_timeout: float
+    :param retries: the number of repeated attempts
+    :type retries: int
+    """
     geocoding_api_url = 'https://maps.googleapis.com/maps/api/geocode/json'
+    http_client = HttpClient('google_geocoding')
 
-    @staticmethod
-    def validate_addresses(address):
+    def __init__(self, api_key=None, request_timeout=15.0, retries=2):
+        self.api_key = api_key
+        self.request_timeout = request_timeout
+        self.retries = retries
+
+    def validate_addresses(self, address):
+        """Validates the address with Google Geocoding API and returns its coordinates.
+
+        :param address: the address which is validated
+        :type address: str
+
+        :return: latitude and longitude of the address
+        :rtype: dict
+        :raises ValueError: if the address is not found or is found only partially
+        """
         params = {
             'address': address,
             'language': 'uk',
-            'key': GeocodingAPI.api_key
+            'key': self.api_key
         }
 
-        response = requests.get(url=GeocodingAPI.geocoding_api_url, params=params).json()
+        response = GeocodingAPI.http_client.get_json(GeocodingAPI.geocoding_api_url, params=params,
+                                                     deadline=time.monotonic() + self.request_timeout,
+                                                     retries=self.retries)
+
+        if not response.get('results'):
+            raise ValueError('Given delivery address is not valid.')
+
         result = response['results'][0]
 
         if 'partial_match' in result.keys() and result['types'][0] != 'street_address':
             raise ValueError('Given delivery address is not valid.')
 
+        location = result['geometry']['location']
+
+        return {'latitude': location['lat'], 'longitude': location['lng']}
+
 
 class MapsAPIUse:
-    """MapsAPIUse class is used for working with Google Directions API."""
-    api_key = os.environ.get('GOOGLE_MAPS_API_KEY')
+    """MapsAPIUse class is used for working with Google Directions API.
+
+    One request can contain at most max_elements pairs of addresses and at most max_addresses
+    origins or destinations, so bigger matrices are split into tiles which are requested in a pool
+    of max_workers threads. Requests are sent by the shared http_client, so connections to the API
+    are reused and failed requests are repeated by it. All tiles of one matrix share the deadline
+    of request_timeout seconds, so a slow API does not hold the worker longer than that.
+
+    :param api_key: the key of Google Maps Platform
+    :type api_key: str
+    :param max_elements: the highest number of pairs of addresses in one request
+    :type max_elements: int
+    :param max_workers: the number of threads which request tiles
+    :type max_workers: int
+    :param request_timeout: the number of seconds of all requests of one matrix
+    :type request_timeout: float
+    :param retries: the number of repeated attempts of every request
+    :type retries: int
+    """
     direction_api_url = 'https://maps.googleapis.com/maps/api/distancematrix/json'
+    max_addresses = 25
+    http_client = HttpClient('google_distance_matrix')
 
-    @staticmethod
-    def get_value_matrix_between_addresses(addresses, mode):
+    def __init__(self, api_key=None, max_elements=100, max_workers=4, request_timeout=20.0, retries=2):
+        self.api_key = api_key
+        self.max_elements = max_elements
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+        self.retries = retries
+
+    def get_value_matrix_between_addresses(self, addresses, mode):
         """Method execute request to Directions API and return value matrix between given addresses.
 
         :param addresses: list of addresses for calculating value matrix between them
@@ -39,54 +107,305 @@ class MapsAPIUse:
         :return: matrix of durations which describe time to from one address to another`s
         :rtype: numpy.ndarray
         """
+        addresses = addresses.split('|') if isinstance(addresses, str) else list(addresses)
+        duration_matrix = self.get_durations(addresses, addresses, mode)
+        np.fill_diagonal(duration_matrix, np.Infinity)
+
+        result = {'duration_matrix': duration_matrix}
+
+        return result
+
+    def get_durations(self, origins, destinations, mode):
+        """Method returns durations from every origin to every destination requesting them by tiles.
+
+        :param origins: list of addresses where paths start
+        :type origins: list
+        :param destinations: list of addresses where paths end
+        :type destinations: list
+        :param mode: argument value for API request for which describe method of movement
+        :type mode: str
+        :return: matrix of durations with a row for every origin and a column for every destination,
+        durations of paths which are not found are infinite
+        :rtype: numpy.ndarray
+        :raises requests.RequestException: if a tile has not been received before the deadline
+        """
+        duration_matrix = np.full((len(origins), len(destinations)), np.Infinity)
+        tiles = self.split_into_tiles(len(origins), len(destinations))
+        deadline = time.monotonic() + self.request_timeout
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tiles))) as executor:
+            futures = [(tile, executor.submit(self.request_durations, origins[tile[0]], destinations[tile[1]],
+                                              mode, deadline)) for tile in tiles]
+
+            try:
+                for tile, future in futures:
+                    duration_matrix[tile] = future.result()
+            except Exception:
+                for tile, future in futures:
+                    future.cancel()
+                raise
+
+        return duration_matrix
+
+    def split_into_tiles(self, number_of_origins, number_of_destinations):
+        """Splits the matrix into the lowest number of tiles which fit limits of one request.
+
+        :param number_of_origins: the number of rows of the matrix
+        :type number_of_origins: int
+        :param number_of_destinations: the number of columns of the matrix
+        :type number_of_destinations: int
+        :return: pairs of slices of rows and columns of tiles
+        :rtype: list
+        """
+        best_shape = None
+
+        for rows in range(1, min(number_of_origins, MapsAPIUse.max_addresses) + 1):
+            columns = min(number_of_destinations, MapsAPIUse.max_addresses, self.max_elements // rows)
+            number_of_tiles = -(-number_of_origins // rows) * -(-number_of_destinations // columns)
+
+            if best_shape is None or number_of_tiles < best_shape[0]:
+                best_shape = (number_of_tiles, rows, columns)
+
+        rows, columns = best_shape[1:]
+
+        return [(slice(i, i + rows), slice(j, j + columns)) for i in range(0, number_of_origins, rows)
+                for j in range(0, number_of_destinations, columns)]
+
+    def request_durations(self, origins, destinations, mode, deadline=None):
+        """Method execute request to Directions API and return durations from every origin to every destination.
+
+        :param origins: list of addresses where paths start
+        :type origins: list
+        :param destinations: list of addresses where paths end
+        :type destinations: list
+        :param mode: argument value for API request for which describe method of movement
+        :type mode: str
+        :param deadline: the value of time.monotonic after which the request is not repeated, defaults to None
+        for the deadline of http_client
+        :type deadline: float
+        :return: matrix of durations with a row for every origin and a column for every destination,
+        durations of paths which are not found are infinite
+        :rtype: numpy.ndarray
+        :raises requests.RequestException: if the request has failed or has been rejected
+        """
         params = {
-            'origins': addresses,
-            'destinations': addresses,
+            'origins': '|'.join(origins),
+            'destinations': '|'.join(destinations),
             'mode': mode,
             'departure_time': 'now',
             'language': 'uk',
-            'key': MapsAPIUse.api_key
+            'key': self.api_key
         }
-        response = requests.get(url=MapsAPIUse.direction_api_url, params=params).json()
+        response = MapsAPIUse.http_client.get_json(MapsAPIUse.direction_api_url, params=params, deadline=deadline,
+                                                   retries=self.retries)
+
+        if response.get('status', 'OK') != 'OK':
+            raise requests.RequestException(f"Distance Matrix API returned status {response['status']}.")
 
         rows = response['rows']
-        duration_matrix = list()
+        duration_matrix = np.full((len(origins), len(destinations)), np.Infinity)
 
         for i in range(len(rows)):
             row = rows[i]
-            durations = list()
 
             for j in range(len(row['elements'])):
                 element = row['elements'][j]
-                durations.append(element['duration_in_traffic']['value'] if i != j else np.Infinity)
 
-            duration_matrix.append(durations)
+                if element.get('status', 'OK') == 'OK':
+                    duration_matrix[i][j] = element.get('duration_in_traffic', element.get('duration'))['value']
 
-        result = {'duration_matrix': np.array(duration_matrix)}
+        return duration_matrix
 
-        return result
+
+class SolverStats:
+    """SolverStats class is used for collecting statistics of the route resolving.
+
+    Times are measured in seconds. The time of reduction includes the calculation of lower bounds
+    of nodes, the time of sub tour checks includes joining of chains and checking of full tours and
+    the time of leaf search includes operations with the heap of leaves which have not been split.
+
+    :param algorithm: the name of the algorithm which resolves the route
+    :type algorithm: str
+    :param size: the number of addresses in the route
+    :type size: int
+    """
+    counters = ('nodes_created', 'nodes_expanded')
+    timers = ('reduction_time', 'subtour_time', 'leaf_search_time')
+
+    def __init__(self, algorithm='branch_and_bound', size=0):
+        self.algorithm = algorithm
+        self.size = size
+        self.nodes_created = 0
+        self.nodes_expanded = 0
+        self.max_frontier_size = 0
+        self.reduction_time = 0.0
+        self.subtour_time = 0.0
+        self.leaf_search_time = 0.0
+        self.incumbent_time = 0.0
+        self.total_time = 0.0
+        self.gap = None
+
+    def merge(self, stats):
+        """Adds statistics of a subproblem which has been resolved in another process.
+
+        :param stats: statistics returned by as_dict method
+        :type stats: dict
+
+        :return: None
+        """
+        for name in SolverStats.counters + SolverStats.timers:
+            setattr(self, name, getattr(self, name) + stats[name])
+
+        self.max_frontier_size = max(self.max_frontier_size, stats['max_frontier_size'])
+
+    def as_dict(self):
+        """Returns statistics as a dictionary which can be serialized to JSON.
+
+        :return: all collected statistics
+        :rtype: dict
+        """
+        stats = {
+            'algorithm': self.algorithm,
+            'size': self.size,
+            'nodes_created': self.nodes_created,
+            'nodes_expanded': self.nodes_expanded,
+            'max_frontier_size': self.max_frontier_size,
+            'reduction_time': round(self.reduction_time, 6),
+            'subtour_time': round(self.subtour_time, 6),
+            'leaf_search_time': round(self.leaf_search_time, 6),
+            'incumbent_time': round(self.incumbent_time, 6),
+            'total_time': round(self.total_time, 6),
+            'gap': self.gap
+        }
+
+        return stats
+
+    def log(self):
+        """Emits statistics as a structured log record.
+
+        Statistics are passed in the solver_stats attribute of the record and are also
+        added to the message as JSON.
+
+        :return: None
+        """
+        stats = self.as_dict()
+        logger.info('Route solver stats: %s', json.dumps(stats), extra={'solver_stats': stats})
 
 
 class Node:
     """Node class is used for holding data of tree node.
 
+    Node keeps only the path which it adds to the tour of the parent node, the whole tour is
+    restored by walking up to the root node. Value and constraint matrices are stored in compact
+    types and are released when the node is split, so only leaves of the tree hold matrices.
+
+    Paths which are used in the tour form chains of vertices. For every vertex which ends a chain
+    the node keeps the vertex which starts this chain and vice versa, so a path which would close
+    a chain into a sub tour is found in constant time when a new path is added to the tour.
+
     :param value_matrix: matrix of durations which describe time to from one address to another`s
     :type value_matrix: numpy.ndarray
     :param constraint_matrix: matrix which contain state of using paths between addresses (0 - the path forbidden,
     1 - the path is used, 2 - the path has not been used yet)
     :param parent_node: parent node to current node in tree, defaults to None if current node is root node of tree
     :type parent_node: Node
+
+    The stats attribute holds SolverStats instance shared by all nodes of the tree, None if
+    statistics are not collected.
     """
+    __slots__ = ('value_matrix', 'constraint_matrix', 'size', 'parent', 'lower_bound', 'next_path_to_split', 'path',
+                 'chain_start', 'chain_end', 'tour_length', 'assignment', 'stats')
+
     def __init__(self, value_matrix, constraint_matrix, parent_node=None):
-        self.value_matrix = copy.copy(value_matrix)
-        self.constraint_matrix = copy.copy(constraint_matrix)
+        self.value_matrix = np.array(value_matrix, dtype=np.float32)
+        self.constraint_matrix = np.array(constraint_matrix, dtype=np.int8)
         self.size = len(value_matrix)
         self.parent = parent_node
-        self.left_child: Node = None
-        self.right_child: Node = None
         self.lower_bound = 0
         self.next_path_to_split = dict()
-        self.tour = copy.copy(parent_node.tour) if parent_node else list()
+        self.path = None
+
+        if parent_node:
+            self.chain_start = parent_node.chain_start.copy()
+            self.chain_end = parent_node.chain_end.copy()
+            self.tour_length = parent_node.tour_length
+            self.assignment = parent_node.assignment.copy() if parent_node.assignment is not None else None
+            self.stats = parent_node.stats
+        else:
+            self.chain_start = np.arange(self.size, dtype=np.int16)
+            self.chain_end = np.arange(self.size, dtype=np.int16)
+            self.tour_length = 0
+            self.assignment = None
+            self.stats = None
+
+    @property
+    def tour(self):
+        """Returns paths of the node tour in the order in which they have been added.
+
+        :return: list of paths from the root node to the current node
+        :rtype: list
+        """
+        tour = list()
+        node = self
+
+        while node:
+            if node.path:
+                tour.append(node.path)
+            node = node.parent
+
+        tour.reverse()
+        return tour
+
+    def export_state(self):
+        """Returns data which is needed to continue the search from the node in another process.
+
+        :return: matrices, chains, lower bound and tour of the node
+        :rtype: dict
+        """
+        state = {
+            'value_matrix': self.value_matrix,
+            'constraint_matrix': self.constraint_matrix,
+            'chain_start': self.chain_start,
+            'chain_end': self.chain_end,
+            'tour_length': self.tour_length,
+            'lower_bound': self.lower_bound,
+            'assignment': self.assignment,
+            'tour': self.tour
+        }
+
+        return state
+
+    @staticmethod
+    def from_state(state):
+        """Creates a root node of a new tree from data returned by export_state method.
+
+        The tour of the node is not restored, it stays in the state.
+
+        :param state: data of the node
+        :type state: dict
+
+        :return: created node
+        :rtype: Node
+        """
+        node = Node(state['value_matrix'], state['constraint_matrix'])
+        node.chain_start = np.array(state['chain_start'])
+        node.chain_end = np.array(state['chain_end'])
+        node.tour_length = state['tour_length']
+        node.lower_bound = state['lower_bound']
+        node.assignment = np.array(state['assignment']) if state['assignment'] is not None else None
+
+        return node
+
+    def release_matrices(self):
+        """Releases value and constraint matrices of the node after it has been split.
+
+        :return: None
+        """
+        self.value_matrix = None
+        self.constraint_matrix = None
+        self.chain_start = None
+        self.chain_end = None
+        self.assignment = None
 
     def reduction_operation(self, axis):
         """Returns sum of min values from rows or from columns.
@@ -102,21 +421,15 @@ class Node:
         :return: sum of minimum values
         :type: int
         """
-        minimum_values = self.min(axis=axis)
-
-        for i in range(self.size):
-            if np.max(self.constraint_matrix, axis=axis)[i] == 1:
-                continue
+        minimum_values = np.array(self.min(axis=axis))
+        free_rows = np.max(self.constraint_matrix, axis=1) != 1
+        free_columns = np.max(self.constraint_matrix, axis=0) != 1
+        mask = (self.constraint_matrix == 2) & free_rows[:, np.newaxis] & free_columns[np.newaxis, :]
 
-            for j in range(self.size):
-                if np.max(self.constraint_matrix, axis=1 if axis == 0 else 0)[j] == 1:
-                    continue
-                if axis == 1 and self.constraint_matrix[i][j] == 2:
-                    self.value_matrix[i][j] = self.value_matrix[i][j] - minimum_values[i]
-                elif axis == 0 and self.constraint_matrix[j][i] == 2:
-                    self.value_matrix[j][i] = self.value_matrix[j][i] - minimum_values[i]
+        reduction = minimum_values[:, np.newaxis] if axis == 1 else minimum_values[np.newaxis, :]
+        self.value_matrix[mask] = (self.value_matrix - reduction)[mask]
 
-        return sum(minimum_values)
+        return float(np.sum(minimum_values))
 
     def calculate_lower_bound_of_tour(self):
         """Calculates lower bound of tour for node.
@@ -124,10 +437,13 @@ class Node:
         Method uses reduction_operation method from this class to calculate sum of minimum
         values from rows and columns of value matrix and sums this values and saves this
         value to node lower bound attribute. If node has a parent, then sums minimum values
-        from rows and columns with value of parent node lower bound.
+        from rows and columns with value of parent node lower bound. If the node has the
+        assignment attribute, the value matrix is reduced further with assignment_reduction
+        method and the result of this reduction is added to the lower bound too.
 
         :return: None
         """
+        start_time = time.perf_counter()
         sum_of_min_values_from_rows = self.reduction_operation(1)
         sum_of_min_values_from_columns = self.reduction_operation(0)
 
@@ -136,81 +452,158 @@ class Node:
         else:
             self.lower_bound = sum_of_min_values_from_rows + sum_of_min_values_from_columns
 
-    def find_next_path(self, previous_vertex, current_vertex):
-        """Checks if there is an available path from the current vertex to another vertices.
+        if self.assignment is not None:
+            self.lower_bound += self.assignment_reduction()
 
-        :param previous_vertex: the number of the vertex which has been visited before the current vertex
-        :type previous_vertex: int
-        :param current_vertex: the number of the current vertex from which the next path is searched
-        :type current_vertex: int
+        if self.stats is not None:
+            self.stats.reduction_time += time.perf_counter() - start_time
 
-        :return: dictionary with one key if there is no available path from the current vertex and with
-        two keys if there is an available path from the current vertex is the second key saves number of next
-        vertex
-        :rtype: dict
-        """
-        for next_vertex in range(self.size):
-            if (self.constraint_matrix[current_vertex][next_vertex] == 1) and (next_vertex != previous_vertex):
-                return {'has_next': True, 'next_vertex': next_vertex}
-        return {'has_next': False}
+    def assignment_reduction(self):
+        """Reduces the value matrix with the optimal solution of the assignment problem.
 
-    def check_sub_tours(self):
-        """Checks if there are sub tours to the tour of the current node.
+        Every row of the value matrix which has no used path is assigned to a column which has no
+        used path so that the sum of values of assigned paths is the lowest one. Because every tour
+        is an assignment, this sum is a lower bound of the remaining part of the tour which is not
+        weaker than the reduction of rows and columns. The problem is resolved by the Hungarian
+        method, potentials of rows and columns are subtracted from the value matrix, so assigned
+        paths have zero values and the value matrix stays reduced.
 
-        Method checks every possible path to find the paths which will be able to create sub tours for the
-        tour of the current node. Method search every element in constraint matrix with value 2 and
-        changes this value to 1 after changing of one element the method tries to find next available path
-        from end vertex of the changed path if the method finds the path and the end vertex of this
-        path is equal to the start vertex of the changed path and the number of traversed paths is not
-        higher then a number of all vertices the method will exclude this path from possible paths.
+        The assignment of the parent node is reused: its paths which are still available and have
+        zero value are kept and only the rest of rows are assigned again.
 
-        :return: None
+        :return: the sum of potentials which is added to the lower bound, infinity if rows can not
+        be assigned
+        :rtype: float
+        """
+        free_rows = np.flatnonzero(np.max(self.constraint_matrix, axis=1) != 1)
+        free_columns = np.flatnonzero(np.max(self.constraint_matrix, axis=0) != 1)
+        free_cells = np.ix_(free_rows, free_columns)
+        available = self.constraint_matrix[free_cells] == 2
+        costs = np.where(available, self.value_matrix[free_cells], np.Infinity).astype(np.float64)
+        size = len(free_rows)
+
+        column_positions = np.full(self.size, -1)
+        column_positions[free_columns] = np.arange(size)
+        assigned_columns = self.assignment[free_rows]
+        assigned_positions = np.where(assigned_columns >= 0, column_positions[assigned_columns], -1)
+        is_kept = assigned_positions >= 0
+        is_kept[is_kept] = costs[np.flatnonzero(is_kept), assigned_positions[is_kept]] == 0
+
+        if is_kept.all():
+            return 0.0
+
+        # column_rows[j] is the row assigned to the column j - 1, the index 0 is reserved for a virtual column
+        column_rows = np.full(size + 1, -1)
+        column_rows[assigned_positions[is_kept] + 1] = np.flatnonzero(is_kept)
+        row_potentials = np.zeros(size)
+        column_potentials = np.zeros(size + 1)
+
+        for row_position in np.flatnonzero(~is_kept):
+            if not self.augment_assignment(costs, row_position, column_rows, row_potentials, column_potentials):
+                self.assignment[:] = -1
+                return np.Infinity
+
+        reduction = np.where(available, row_potentials[:, np.newaxis] + column_potentials[np.newaxis, 1:], 0)
+        self.value_matrix[free_cells] -= reduction.astype(np.float32)
+
+        self.assignment[:] = -1
+        self.assignment[free_rows[column_rows[1:]]] = free_columns
+
+        return float(np.sum(row_potentials) + np.sum(column_potentials[1:]))
+
+    @staticmethod
+    def augment_assignment(costs, row_position, column_rows, row_potentials, column_potentials):
+        """Assigns one more row by the shortest augmenting path of the Hungarian method.
+
+        :param costs: values of available paths between rows and columns which are assigned
+        :type costs: numpy.ndarray
+        :param row_position: the row which is assigned
+        :type row_position: int
+        :param column_rows: rows assigned to columns, the first element belongs to a virtual column
+        :type column_rows: numpy.ndarray
+        :param row_potentials: potentials of rows
+        :type row_potentials: numpy.ndarray
+        :param column_potentials: potentials of columns, the first element belongs to a virtual column
+        :type column_potentials: numpy.ndarray
+
+        :return: False if there is no augmenting path for the row
+        :rtype: bool
         """
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.constraint_matrix[i][j] == 2:
-                    previous_vertex = i
-                    from_vertex = j
-                    traversed_paths = 1
-                    next_path = self.find_next_path(previous_vertex, from_vertex)
-                    while next_path['has_next']:
-                        traversed_paths += 1
-                        previous_vertex = from_vertex
-                        from_vertex = next_path['next_vertex']
-                        if from_vertex == i and traversed_paths < self.size:
-                            self.constraint_matrix[i][j] = 0
-                            self.value_matrix[i][j] = np.Infinity
-                            break
-                        next_path = self.find_next_path(previous_vertex, from_vertex)
-                        if traversed_paths == self.size:
-                            break
+        size = len(costs)
+        column_rows[0] = row_position
+        minimum_values = np.full(size + 1, np.Infinity)
+        previous_columns = np.zeros(size + 1, dtype=np.int64)
+        used_columns = np.zeros(size + 1, dtype=bool)
+        column = 0
+
+        while column_rows[column] != -1:
+            used_columns[column] = True
+            row = column_rows[column]
+            reduced_costs = costs[row] - row_potentials[row] - column_potentials[1:]
+
+            is_lower = ~used_columns[1:] & (reduced_costs < minimum_values[1:])
+            minimum_values[1:][is_lower] = reduced_costs[is_lower]
+            previous_columns[1:][is_lower] = column
+
+            candidates = np.where(used_columns[1:], np.Infinity, minimum_values[1:])
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+
+            if delta == np.Infinity:
+                column_rows[0] = -1
+                return False
+
+            used_rows = column_rows[used_columns]
+            row_potentials[used_rows] += delta
+            column_potentials[used_columns] -= delta
+            minimum_values[~used_columns] -= delta
+            column = next_column
+
+        while column:
+            previous_column = previous_columns[column]
+            column_rows[column] = column_rows[previous_column]
+            column = previous_column
+
+        column_rows[0] = -1
+        return True
 
     def select_next_path_to_split(self):
         """Selects the next path for creating child nodes of the current node.
 
         After executing reduction operations for rows and columns the method searches
-        the possible path of which value in value matrix is the highest.
+        the possible path of which value in value matrix is the highest. The penalty of
+        every zero path is calculated at once for the whole value matrix with the help of
+        the two smallest available values of every row and column.
 
         :return: None
         """
-        self.next_path_to_split['value'] = -1
-
-        for i in range(self.size):
-            if np.max(self.constraint_matrix, axis=1)[i] == 1:
-                continue
-            for j in range(self.size):
-                if np.max(self.constraint_matrix, axis=0)[j] == 1:
-                    continue
-                if self.value_matrix[i][j] == 0:
-                    self.value_matrix[i][j] = np.Infinity
-                    minimum_value_from_row_and_column = self.min(axis=1)[i] + self.min(axis=0)[j]
-                    self.value_matrix[i][j] = 0
-                    if minimum_value_from_row_and_column > self.next_path_to_split['value']:
-                        self.next_path_to_split['from'] = i
-                        self.next_path_to_split['to'] = j
-                        self.next_path_to_split['value'] = minimum_value_from_row_and_column
-
-        del self.next_path_to_split['value']
+        available_values = np.where(self.constraint_matrix == 2, self.value_matrix, np.Infinity)
+        free_rows = np.max(self.constraint_matrix, axis=1) != 1
+        free_columns = np.max(self.constraint_matrix, axis=0) != 1
+        candidates = (self.value_matrix == 0) & free_rows[:, np.newaxis] & free_columns[np.newaxis, :]
+
+        if not candidates.any():
+            self.next_path_to_split = dict()
+            return
+
+        rows = np.arange(self.size)
+        row_order = np.argsort(available_values, axis=1, kind='stable')[:, :2]
+        row_minimums = available_values[rows[:, np.newaxis], row_order]
+        column_order = np.argsort(available_values, axis=0, kind='stable')[:2, :]
+        column_minimums = available_values[column_order, rows[np.newaxis, :]]
+
+        # The minimum of a row without the cell itself is the second smallest value when the cell is the
+        # smallest available one, otherwise it is the smallest value of the row. Columns are handled the same way.
+        is_row_minimum = (rows[np.newaxis, :] == row_order[:, :1]) & (self.constraint_matrix == 2)
+        is_column_minimum = (rows[:, np.newaxis] == column_order[:1, :]) & (self.constraint_matrix == 2)
+        row_values = np.where(is_row_minimum, row_minimums[:, 1:2], row_minimums[:, :1])
+        column_values = np.where(is_column_minimum, column_minimums[1:2, :], column_minimums[:1, :])
+        row_values[row_values == np.Infinity] = 0
+        column_values[column_values == np.Infinity] = 0
+
+        scores = np.where(candidates, row_values + column_values, -1)
+        i, j = np.unravel_index(np.argmax(scores), scores.shape)
+        self.next_path_to_split = {'from': int(i), 'to': int(j)}
 
     def add_path_to_tour(self, path):
         """Adds new path to node tour attribute.
@@ -222,20 +615,35 @@ class Node:
         to the number of the start vertex of the path and column number is equal to the number
         of the end vertex of the path.
 
+        The added path joins the chain which ends in the start vertex of the path with the chain
+        which starts in the end vertex of the path. Unless the joined chain already contains all
+        vertices, the path from its end to its start would create a sub tour, so this path is
+        excluded from available paths.
+
         :param path: Contain the start vertex and end vertex of the path is needed to
         add to the node tour
         :type path: dict
 
         :return: None
         """
-        for i in range(self.size):
-            self.constraint_matrix[path['from']][i] = 0
-            self.constraint_matrix[i][path['to']] = 0
+        self.constraint_matrix[path['from'], :] = 0
+        self.constraint_matrix[:, path['to']] = 0
         self.constraint_matrix[path['from']][path['to']] = 1
-        self.constraint_matrix[path['to']][path['from']] = 0
+        self.path = path
+        self.tour_length += 1
+
+        start_time = time.perf_counter()
+        chain_start = self.chain_start[path['from']]
+        chain_end = self.chain_end[path['to']]
+        self.chain_end[chain_start] = chain_end
+        self.chain_start[chain_end] = chain_start
 
-        self.value_matrix[path['to']][path['from']] = np.Infinity
-        self.tour.append(path)
+        if self.tour_length < self.size - 1:
+            self.constraint_matrix[chain_end][chain_start] = 0
+            self.value_matrix[chain_end][chain_start] = np.Infinity
+
+        if self.stats is not None:
+            self.stats.subtour_time += time.perf_counter() - start_time
 
     def exclude_path_from_tour(self, path):
         """Excludes path from available paths.
@@ -267,22 +675,11 @@ class Node:
         :return: the list of minimum values from rows or columns depends on axis argument
         :rtype: list
         """
-        minimum_values = list()
-
-        for i in range(self.size):
-            minimum_values.append(np.Infinity)
+        available_values = np.where(self.constraint_matrix == 2, self.value_matrix, np.Infinity)
+        minimum_values = np.min(available_values, axis=axis)
+        minimum_values[minimum_values == np.Infinity] = 0
 
-            for j in range(self.size):
-                if axis == 1:
-                    if self.constraint_matrix[i][j] == 2 and self.value_matrix[i][j] < minimum_values[-1]:
-                        minimum_values[-1] = self.value_matrix[i][j]
-                else:
-                    if self.constraint_matrix[j][i] == 2 and self.value_matrix[j][i] < minimum_values[-1]:
-                        minimum_values[-1] = self.value_matrix[j][i]
-
-            minimum_values[-1] = 0 if minimum_values[-1] == np.Infinity else minimum_values[-1]
-
-        return minimum_values
+        return minimum_values.tolist()
 
     def is_tour(self):
         """Checks if the current node`s tour is a full tour.
@@ -296,22 +693,61 @@ class Node:
         then the value is True
         :rtype: bool
         """
-        for matrix_row in self.constraint_matrix:
-            if np.max(matrix_row) in (0, 2) or list(matrix_row).count(1) > 1:
-                return False
-        return True
+        start_time = time.perf_counter()
+        used_paths = np.count_nonzero(self.constraint_matrix == 1, axis=1)
+        result = bool(np.all(used_paths == 1) and not np.any(self.constraint_matrix == 2))
+
+        if self.stats is not None:
+            self.stats.subtour_time += time.perf_counter() - start_time
+
+        return result
 
 
 class Solver:
     """Class is used to combine methods for resolving Branch and Bound algorithm.
 
+    The best known tour (incumbent) is found by local search before the algorithm starts and
+    leaves which lower bound exceeds the duration of the incumbent are not split. The algorithm
+    can be stopped by a time limit or by a limit of created nodes, in this case the incumbent is
+    returned together with the gap between its duration and the lowest lower bound of leaves.
+    The duration of the shortest known tour can be shared between processes through shared_bound
+    attribute which holds multiprocessing.Value. Statistics of the search are collected to stats
+    attribute which holds SolverStats instance.
+
     :param value_matrix: matrix of durations which describe time to from one address to another`s
     :type value_matrix: numpy.ndarray
+    :param time_limit: the number of seconds after which the algorithm stops, defaults to None
+    if the algorithm is not limited in time
+    :type time_limit: float
+    :param node_limit: the number of created nodes after which the algorithm stops, defaults to None
+    if the number of nodes is not limited
+    :type node_limit: int
+    :param incumbent_time_budget: the number of seconds which local search can spend on finding
+    the incumbent, defaults to None if the incumbent is not searched
+    :type incumbent_time_budget: float
+    :param bound: the way of calculating lower bounds of nodes, 'reduction' - reduction of rows and
+    columns, 'assignment' - the solution of the assignment problem
+    :type bound: str
     """
-    def __init__(self, value_matrix):
+    relative_tolerance = 1e-6
+    bounds = ('reduction', 'assignment')
+
+    def __init__(self, value_matrix, time_limit=None, node_limit=None, incumbent_time_budget=0.05, bound='reduction'):
+        if bound not in Solver.bounds:
+            raise ValueError(f"Bound must be one of: {', '.join(Solver.bounds)}.")
+
         self.value_matrix = value_matrix
         self.size = len(value_matrix)
         self.root_node: Node = None
+        self.generation = 0
+        self.number_of_nodes = 0
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.incumbent_time_budget = incumbent_time_budget
+        self.incumbent = None
+        self.shared_bound = None
+        self.bound = bound
+        self.stats = SolverStats(size=self.size)
 
     def create_constraints_matrix(self):
         """Creates a constraint matrix.
@@ -323,49 +759,219 @@ class Solver:
         :return: created constraint matrix
         :rtype: numpy.ndarray
         """
-        constraints_matrix = list()
+        constraints_matrix = np.full((self.size, self.size), 2, dtype=np.int8)
+        np.fill_diagonal(constraints_matrix, 0)
 
-        for i in range(self.size):
-            matrix_row = [2] * self.size
-            matrix_row[i] = 0
-            constraints_matrix.append(matrix_row)
+        return constraints_matrix
 
-        return np.array(constraints_matrix)
+    def create_root_node(self):
+        """Creates the root node of the tree and calculates its lower bound.
+
+        :return: created node
+        :rtype: Node
+        """
+        root_node = Node(self.value_matrix, self.create_constraints_matrix())
+        root_node.stats = self.stats
+
+        if self.bound == 'assignment':
+            root_node.assignment = np.full(self.size, -1, dtype=np.int16)
+
+        root_node.calculate_lower_bound_of_tour()
+
+        return root_node
 
     def branch_and_bound_method(self):
         """Executes a sequence of steps for resolving the algorithm.
 
         At the start, method creates a root node of the tree after that starts a cycle
-        until it finds the final result
+        until it finds the final result. Leaves which have not been split yet are kept in
+        a heap ordered by the lower bound, so the leaf with the lowest lower bound is taken
+        from the heap on every iteration instead of searching it in the whole tree. Split
+        leaves are not referenced by the heap anymore and are released.
 
-        :return: the end result of solving the algorithm according to given value matrix
+        The cycle ends when the taken leaf contains a full tour, when the lower bound of the
+        taken leaf exceeds the duration of the incumbent or when a limit is reached.
+
+        :return: the end result of solving the algorithm according to given value matrix,
+        the gap is equal to 0 if the tour is proven to be the shortest one
         :rtype: dict
         """
-        self.root_node = Node(self.value_matrix, self.create_constraints_matrix())
-        self.root_node.calculate_lower_bound_of_tour()
-        self.root_node.select_next_path_to_split()
+        start_time = time.perf_counter()
+        deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+
+        if self.incumbent_time_budget is not None:
+            self.incumbent = HeuristicSolver(self.value_matrix, self.incumbent_time_budget).local_search_method()
+            self.stats.incumbent_time = time.perf_counter() - start_time
+
+        self.root_node = self.create_root_node()
+        self.number_of_nodes = 1
+        self.stats.nodes_created = 1
+
+        lower_bound = self.search_tree(self.root_node, deadline)
+        final_result = self.incumbent_result(lower_bound)
+        self.stats.total_time = time.perf_counter() - start_time
 
-        left_child = Solver.create_child_node(self.root_node, add_path=True)
-        self.root_node.left_child = left_child
-        right_child = Solver.create_child_node(self.root_node)
-        self.root_node.right_child = right_child
+        return final_result
+
+    def search_tree(self, root_node: Node, deadline):
+        """Splits leaves of the tree which starts at the given node in the order of their lower bounds.
+
+        The found tour is saved to the incumbent attribute.
+
+        :param root_node: the node from which the search starts
+        :type root_node: Node
+        :param deadline: the moment of time.monotonic clock when the search stops, None if the
+        search is not limited in time
+        :type deadline: float
+
+        :return: the lowest lower bound of leaves which have not been split if the search is stopped
+        by a limit, None if the incumbent is proven to be the shortest tour of the tree
+        :rtype: float
+        """
+        frontier = list()
+        parent = root_node
 
         while True:
-            parent = left_child if left_child.lower_bound <= right_child.lower_bound else right_child
-            parent = self.check_lower_bound_of_another_leaves(self.root_node, parent)
+            if self.upper_bound() is not None and self.is_limit_reached(deadline):
+                return min(parent.lower_bound, frontier[0][0]) if frontier else parent.lower_bound
 
-            if parent.is_tour():
-                break
             parent.select_next_path_to_split()
-            left_child = Solver.create_child_node(parent, add_path=True)
-            parent.left_child = left_child
-            right_child = Solver.create_child_node(parent)
-            parent.right_child = right_child
 
-        final_result = {'tour': parent.tour, 'tour_duration': parent.lower_bound}
+            if parent.next_path_to_split:
+                self.generation += 1
+                self.push_leaf(frontier, Solver.create_child_node(parent, add_path=True), order=0)
+                self.push_leaf(frontier, Solver.create_child_node(parent), order=1)
+                self.number_of_nodes += 2
+                self.stats.nodes_created += 2
+                self.stats.nodes_expanded += 1
+                self.stats.max_frontier_size = max(self.stats.max_frontier_size, len(frontier))
+
+            parent.release_matrices()
+
+            if not frontier:
+                return None
+
+            start_time = time.perf_counter()
+            parent = heapq.heappop(frontier)[-1]
+            self.stats.leaf_search_time += time.perf_counter() - start_time
+
+            if self.is_pruned(parent):
+                return None
+
+            if parent.is_tour():
+                if not self.incumbent or parent.lower_bound <= self.incumbent['tour_duration']:
+                    self.update_incumbent(parent)
+                return None
+
+    def update_incumbent(self, node: Node):
+        """Makes the tour of the given node the incumbent and shares its duration with other processes.
+
+        :param node: the node which contains a full tour
+        :type node: Node
+
+        :return: None
+        """
+        self.incumbent = {'tour': node.tour, 'tour_duration': node.lower_bound}
+
+        if self.shared_bound is not None:
+            with self.shared_bound.get_lock():
+                if node.lower_bound < self.shared_bound.value:
+                    self.shared_bound.value = node.lower_bound
+
+    def upper_bound(self):
+        """Returns the duration of the shortest known tour.
+
+        :return: the lowest duration of the incumbent and of tours found by other processes, None
+        if no tour is known
+        :rtype: float
+        """
+        bounds = list()
+
+        if self.incumbent:
+            bounds.append(self.incumbent['tour_duration'])
+        if self.shared_bound is not None:
+            bounds.append(self.shared_bound.value)
+
+        return min(bounds) if bounds else None
+
+    def is_limit_reached(self, deadline):
+        """Checks whether the time limit or the limit of created nodes is reached.
+
+        :param deadline: the moment of time.monotonic clock when the algorithm stops, None if the
+        algorithm is not limited in time
+        :type deadline: float
+
+        :return: True if one of limits is reached
+        :rtype: bool
+        """
+        if deadline is not None and time.monotonic() >= deadline:
+            return True
+        return self.node_limit is not None and self.number_of_nodes >= self.node_limit
+
+    def is_pruned(self, node: Node):
+        """Checks whether the lower bound of the node exceeds the duration of the incumbent.
+
+        :param node: the node which is checked
+        :type node: Node
+
+        :return: True if the node can not lead to a tour which is shorter than the incumbent
+        :rtype: bool
+        """
+        upper_bound = self.upper_bound()
+
+        if upper_bound is None:
+            return False
+        return node.lower_bound > upper_bound + abs(upper_bound) * self.relative_tolerance
+
+    def incumbent_result(self, lower_bound):
+        """Returns the incumbent with the gap between its duration and the given lower bound.
+
+        :param lower_bound: the lowest lower bound of leaves which have not been split yet, None if
+        the incumbent is proven to be the shortest tour
+        :type lower_bound: float
+
+        :return: the incumbent tour, its duration and the relative gap
+        :rtype: dict
+        """
+        tour_duration = self.incumbent['tour_duration']
+
+        if lower_bound is None or not tour_duration:
+            gap = 0.0
+        else:
+            gap = max(tour_duration - lower_bound, 0) / tour_duration
+
+        final_result = {'tour': self.incumbent['tour'], 'tour_duration': tour_duration, 'gap': gap}
+        self.stats.gap = gap
 
         return final_result
 
+    def push_leaf(self, frontier, node: Node, order):
+        """Adds a leaf of the tree to the heap of leaves which have not been split yet.
+
+        Leaves are ordered by the lower bound. Ties are broken deterministically: the leaves
+        created later are taken first and the left child is taken before the right one. Leaves
+        which can not improve the incumbent are not added, a leaf with a full tour which is shorter
+        than the incumbent becomes the new incumbent.
+
+        :param frontier: heap of leaves which have not been split yet
+        :type frontier: list
+        :param node: leaf which is added to the heap
+        :type node: Node
+        :param order: position of the leaf among its siblings, 0 - left child, 1 - right child
+        :type order: int
+
+        :return: None
+        """
+        if self.is_pruned(node):
+            return
+
+        if node.is_tour() and (not self.incumbent or node.lower_bound < self.incumbent['tour_duration']):
+            self.update_incumbent(node)
+
+        start_time = time.perf_counter()
+        heapq.heappush(frontier, (node.lower_bound, -self.generation, order, node))
+        self.stats.leaf_search_time += time.perf_counter() - start_time
+
     @staticmethod
     def create_child_node(parent_node: Node, add_path=False):
         """Creates new a new instance of Node class.
@@ -385,58 +991,590 @@ class Solver:
         else:
             new_node.exclude_path_from_tour(parent_node.next_path_to_split)
 
-        new_node.check_sub_tours()
         new_node.calculate_lower_bound_of_tour()
 
         return new_node
 
+
+class ParallelSolver:
+    """Class is used to resolve Branch and Bound algorithm in a pool of processes.
+
+    The tree is split level by level to the given depth and every leaf of this level becomes an
+    independent subproblem which is resolved by Solver in a separate process. Processes share the
+    duration of the shortest known tour through shared memory, so a tour found in one subproblem
+    prunes leaves of all other subproblems. Statistics of all processes are collected to stats
+    attribute.
+
+    :param value_matrix: matrix of durations which describe time to from one address to another`s
+    :type value_matrix: numpy.ndarray
+    :param workers: the number of processes, defaults to None for the number of processors
+    :type workers: int
+    :param split_depth: the depth of the tree at which subproblems are created
+    :type split_depth: int
+    :param time_limit: the number of seconds after which the algorithm stops, defaults to None
+    if the algorithm is not limited in time
+    :type time_limit: float
+    :param node_limit: the number of created nodes after which every subproblem stops, defaults to
+    None if the number of nodes is not limited
+    :type node_limit: int
+    :param incumbent_time_budget: the number of seconds which local search can spend on finding
+    the incumbent
+    :type incumbent_time_budget: float
+    :param bound: the way of calculating lower bounds of nodes, one of Solver.bounds
+    :type bound: str
+    """
+    shared_bound = None
+
+    def __init__(self, value_matrix, workers=None, split_depth=3, time_limit=None, node_limit=None,
+                 incumbent_time_budget=0.05, bound='reduction'):
+        self.value_matrix = value_matrix
+        self.size = len(value_matrix)
+        self.workers = workers
+        self.split_depth = split_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.incumbent_time_budget = incumbent_time_budget
+        self.bound = bound
+        self.stats = SolverStats('parallel_branch_and_bound', self.size)
+
+    def parallel_branch_and_bound_method(self):
+        """Executes the algorithm in a pool of processes.
+
+        :return: the end result of solving the algorithm according to given value matrix,
+        the gap is equal to 0 if the tour is proven to be the shortest one
+        :rtype: dict
+        """
+        start_time = time.monotonic()
+        # The clock of time.time function is shared by all processes, so subproblems which wait for
+        # a free process do not get the whole time limit again.
+        deadline = time.time() + self.time_limit if self.time_limit is not None else None
+        solver = Solver(self.value_matrix, incumbent_time_budget=None, bound=self.bound)
+        solver.stats = self.stats
+        solver.incumbent = HeuristicSolver(self.value_matrix, self.incumbent_time_budget).local_search_method()
+        self.stats.incumbent_time = time.monotonic() - start_time
+        solver.root_node = solver.create_root_node()
+        self.stats.nodes_created = 1
+
+        subproblems = [node.export_state() for node in self.split_tree(solver)]
+
+        if not subproblems:
+            final_result = solver.incumbent_result(None)
+            self.stats.total_time = time.monotonic() - start_time
+            return final_result
+
+        shared_bound = multiprocessing.Value('d', solver.incumbent['tour_duration'])
+        lower_bounds = list()
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=ParallelSolver.initialize_worker,
+                                 initargs=(shared_bound,)) as executor:
+            futures = [executor.submit(ParallelSolver.solve_subproblem, subproblem, deadline, self.node_limit)
+                       for subproblem in subproblems]
+
+            for future in futures:
+                result = future.result()
+                self.stats.merge(result['stats'])
+
+                if result['lower_bound'] is not None:
+                    lower_bounds.append(result['lower_bound'])
+                if result['tour'] and result['tour_duration'] < solver.incumbent['tour_duration']:
+                    solver.incumbent = {'tour': result['tour'], 'tour_duration': result['tour_duration']}
+
+        final_result = solver.incumbent_result(min(lower_bounds) if lower_bounds else None)
+        self.stats.total_time = time.monotonic() - start_time
+
+        return final_result
+
+    def split_tree(self, solver: Solver):
+        """Splits the tree level by level and returns leaves of the last level.
+
+        Leaves which can not improve the incumbent are skipped, leaves with a full tour update
+        the incumbent of the solver.
+
+        :param solver: the solver which holds the root node and the incumbent
+        :type solver: Solver
+
+        :return: leaves of the tree at the split depth
+        :rtype: list
+        """
+        level = [solver.root_node]
+
+        for depth in range(self.split_depth):
+            next_level = list()
+
+            for node in level:
+                node.select_next_path_to_split()
+
+                if node.next_path_to_split:
+                    solver.stats.nodes_expanded += 1
+
+                    for add_path in (True, False):
+                        child_node = Solver.create_child_node(node, add_path=add_path)
+                        solver.stats.nodes_created += 1
+
+                        if solver.is_pruned(child_node):
+                            continue
+                        if child_node.is_tour():
+                            if child_node.lower_bound < solver.incumbent['tour_duration']:
+                                solver.update_incumbent(child_node)
+                            continue
+                        next_level.append(child_node)
+
+                node.release_matrices()
+
+            level = next_level
+
+        return [node for node in level if not solver.is_pruned(node)]
+
     @staticmethod
-    def check_lower_bound_of_another_leaves(parent_node: Node, current_node: Node):
-        """Checks whether there is a leaf of this tree with less value of the lower bound
-         attribute then current leaf.
-
-         If the parent node passed in the argument has child nodes and these child nodes
-         have a lower bound attribute value less than the current node, the method calls
-         itself by passing its child node as the parent node. This recursion continues
-         until the method finds the leaves of the tree. If the value of the lower limit
-         of the tree leaf is less than the current one, the current leaf will change to
-         the found one. At the end of this method, the continuation of the solution is
-         continued from the returned leaf of the tree.
-
-        :param parent_node: the node of the built tree for which checks are performed
-        :type: Node
-        :param current_node: the node on which the previous iteration of the algorithm was performed
-        :type: Node
-
-        :return: tree leaf with the lowest value of lower bound attribute
-        :rtype: Node
+    def initialize_worker(shared_bound):
+        """Saves the shared duration of the shortest known tour in the process of the pool.
+
+        :param shared_bound: the duration of the shortest known tour in shared memory
+        :type shared_bound: multiprocessing.Value
+
+        :return: None
+        """
+        ParallelSolver.shared_bound = shared_bound
+
+    @staticmethod
+    def solve_subproblem(state, deadline, node_limit):
+        """Resolves the subproblem which starts at the node with the given state.
+
+        :param state: data of the node returned by Node.export_state method
+        :type state: dict
+        :param deadline: the moment of time.time clock when the search stops, None if the search
+        is not limited in time
+        :type deadline: float
+        :param node_limit: the number of created nodes after which the search stops
+        :type node_limit: int
+
+        :return: the shortest tour of the subproblem if it is shorter than tours of other subproblems
+        known at the end of the search, its duration, the lowest lower bound of leaves which
+        have not been split and statistics of the search
+        :rtype: dict
         """
-        node_from_left_branch: Node = None
-        node_from_right_branch: Node = None
+        if deadline is not None:
+            deadline = time.monotonic() + max(deadline - time.time(), 0)
 
-        if not parent_node.left_child and not parent_node.right_child and parent_node.lower_bound < current_node.lower_bound:
-            return parent_node
+        solver = Solver(state['value_matrix'], node_limit=node_limit, incumbent_time_budget=None)
+        solver.shared_bound = ParallelSolver.shared_bound
+        root_node = Node.from_state(state)
+        root_node.stats = solver.stats
 
-        if parent_node.left_child and (parent_node.left_child.lower_bound <= current_node.lower_bound):
-            node_from_left_branch = Solver.check_lower_bound_of_another_leaves(parent_node.left_child, current_node)
-        if parent_node.right_child and (parent_node.right_child.lower_bound <= current_node.lower_bound):
-            node_from_right_branch = Solver.check_lower_bound_of_another_leaves(parent_node.right_child,
-                                                                                current_node)
+        lower_bound = solver.search_tree(root_node, deadline)
 
-        if node_from_left_branch and node_from_right_branch:
-            if node_from_left_branch.lower_bound <= node_from_right_branch.lower_bound:
-                if node_from_left_branch != current_node:
-                    return node_from_left_branch
-            elif node_from_left_branch.lower_bound > node_from_right_branch.lower_bound:
-                if node_from_right_branch != current_node:
-                    return node_from_right_branch
+        result = {'tour': None, 'tour_duration': None, 'lower_bound': lower_bound, 'stats': solver.stats.as_dict()}
 
-        elif node_from_left_branch:
-            if node_from_left_branch != current_node and node_from_left_branch.lower_bound < current_node.lower_bound:
-                return node_from_left_branch
+        if solver.incumbent:
+            result['tour'] = state['tour'] + solver.incumbent['tour']
+            result['tour_duration'] = solver.incumbent['tour_duration']
+
+        return result
+
+
+class HeldKarpSolver:
+    """Class is used to resolve the route with Held-Karp dynamic programming algorithm.
+
+    Runtime of the algorithm depends only on the number of addresses, so it is predictable
+    for small value matrices where the branch and bound method may expand a lot of nodes.
+
+    :param value_matrix: matrix of durations which describe time to from one address to another`s
+    :type value_matrix: numpy.ndarray
+    """
+    def __init__(self, value_matrix):
+        self.value_matrix = np.array(value_matrix, dtype=np.float64)
+        self.size = len(value_matrix)
+
+    def dynamic_programming_method(self):
+        """Executes Held-Karp algorithm for the value matrix.
+
+        The tour starts and ends at the first address. For every subset of other addresses
+        and for every address of this subset the method calculates the shortest duration of
+        the path which starts at the first address, visits every address of the subset and ends
+        at the selected address. Subsets are stored as bit masks and are processed in groups of
+        the same size, so every group is calculated with whole-array operations.
+
+        :return: the end result of solving the algorithm according to given value matrix
+        :rtype: dict
+        :raises ValueError: if there is no route which visits all addresses
+        """
+        number_of_stops = self.size - 1
+        number_of_subsets = 1 << number_of_stops
+        stops = np.arange(number_of_stops)
+        stop_bits = 1 << stops
+        subsets = np.arange(number_of_subsets)
+        subset_sizes = np.zeros(number_of_subsets, dtype=np.int8)
+
+        for bit in stop_bits:
+            subset_sizes += (subsets & bit) != 0
+
+        durations = np.full((number_of_subsets, number_of_stops), np.Infinity)
+        previous_stops = np.zeros((number_of_subsets, number_of_stops), dtype=np.int8)
+        durations[stop_bits, stops] = self.value_matrix[0, 1:]
+        stops_value_matrix = self.value_matrix[1:, 1:]
+
+        for subset_size in range(2, number_of_stops + 1):
+            subsets_of_size = subsets[subset_sizes == subset_size]
+
+            for stop in stops:
+                targets = subsets_of_size[(subsets_of_size & stop_bits[stop]) != 0]
+                candidates = durations[targets ^ stop_bits[stop]] + stops_value_matrix[:, stop]
+                best_previous_stops = np.argmin(candidates, axis=1)
+                durations[targets, stop] = candidates[np.arange(len(targets)), best_previous_stops]
+                previous_stops[targets, stop] = best_previous_stops
+
+        tour_durations = durations[number_of_subsets - 1] + self.value_matrix[1:, 0]
+
+        if not np.isfinite(tour_durations.min()):
+            raise ValueError('There is no route which visits all given addresses.')
+
+        stop = int(np.argmin(tour_durations))
+        subset = number_of_subsets - 1
+        order = list()
+
+        while subset:
+            order.append(stop + 1)
+            previous_stop = int(previous_stops[subset, stop])
+            subset ^= int(stop_bits[stop])
+            stop = previous_stop
+
+        order = [0] + order[::-1] + [0]
+        tour = [{'from': order[i], 'to': order[i + 1]} for i in range(self.size)]
+
+        final_result = {'tour': tour, 'tour_duration': float(tour_durations.min())}
+
+        return final_result
+
+
+class HeuristicSolver:
+    """Class is used to find a good route quickly when the exact algorithms are too slow.
+
+    The route is built with the nearest neighbour method and is improved with 2-opt and Or-opt
+    moves until no move shortens the route or the time budget is over. Changes of the route duration
+    for all moves of one kind are calculated at once with whole-array operations.
+
+    :param value_matrix: matrix of durations which describe time to from one address to another`s
+    :type value_matrix: numpy.ndarray
+    :param time_budget: the number of seconds which can be spent on improving of the route
+    :type time_budget: float
+    """
+    or_opt_segment_lengths = (1, 2, 3)
+
+    def __init__(self, value_matrix, time_budget=0.5):
+        self.value_matrix = np.array(value_matrix, dtype=np.float64)
+        self.size = len(value_matrix)
+        self.time_budget = time_budget
+
+        # Forbidden paths get a finite penalty which is higher than any route, so differences
+        # of route durations never turn into nan.
+        finite_values = self.value_matrix[np.isfinite(self.value_matrix)]
+        penalty = (np.abs(finite_values).max() + 1) * self.size * 2 if finite_values.size else 1
+        self.working_matrix = np.where(np.isfinite(self.value_matrix), self.value_matrix, penalty)
+
+    def local_search_method(self):
+        """Builds the route and improves it while the time budget allows.
+
+        :return: the end result of solving the algorithm according to given value matrix
+        :rtype: dict
+        """
+        deadline = time.monotonic() + self.time_budget
+        route = self.improve_route(self.nearest_neighbour_route(), deadline)
 
-        elif node_from_right_branch:
-            if node_from_right_branch != current_node and node_from_right_branch.lower_bound < current_node.lower_bound:
-                return node_from_right_branch
+        return self.route_result(route)
 
-        return current_node
+    def improve_route(self, route, deadline, max_moves=None):
+        """Applies the best 2-opt or Or-opt move to the route while some move shortens it.
+
+        :param route: the order of addresses in the route
+        :type route: numpy.ndarray
+        :param deadline: the value of time.monotonic after which the route is not improved
+        :type deadline: float
+        :param max_moves: the highest number of applied moves, defaults to None for no limit
+        :type max_moves: int
+
+        :return: the improved order of addresses in the route
+        :rtype: numpy.ndarray
+        """
+        moves = 0
+
+        while time.monotonic() < deadline and (max_moves is None or moves < max_moves):
+            two_opt_delta, two_opt_move = self.best_two_opt_move(route)
+            or_opt_delta, or_opt_move = self.best_or_opt_move(route)
+
+            if min(two_opt_delta, or_opt_delta) >= -1e-9:
+                break
+
+            if two_opt_delta <= or_opt_delta:
+                i, j = two_opt_move
+                route[i + 1:j + 1] = route[i + 1:j + 1][::-1]
+            else:
+                start, length, position = or_opt_move
+                segment = route[start:start + length]
+                rest = np.concatenate((route[:start], route[start + length:]))
+                position = position if position < start else position - length
+                route = np.concatenate((rest[:position + 1], segment, rest[position + 1:]))
+
+            moves += 1
+
+        return route
+
+    def route_result(self, route):
+        """Turns the order of addresses into the result of solving.
+
+        :param route: the order of addresses in the route which starts with the first address
+        :type route: numpy.ndarray
+
+        :return: the end result of solving the algorithm according to given value matrix
+        :rtype: dict
+        """
+        order = list(route) + [0]
+        tour = [{'from': int(order[i]), 'to': int(order[i + 1])} for i in range(self.size)]
+        tour_duration = float(sum(self.value_matrix[path['from'], path['to']] for path in tour))
+
+        final_result = {'tour': tour, 'tour_duration': tour_duration}
+
+        return final_result
+
+    def nearest_neighbour_route(self):
+        """Builds the route which starts at the first address and always goes to the closest unvisited address.
+
+        :return: the order of addresses in the route
+        :rtype: numpy.ndarray
+        """
+        route = np.zeros(self.size, dtype=np.int64)
+        visited = np.zeros(self.size, dtype=bool)
+        visited[0] = True
+
+        for position in range(1, self.size):
+            durations = np.where(visited, np.Infinity, self.working_matrix[route[position - 1]])
+            route[position] = np.argmin(durations)
+            visited[route[position]] = True
+
+        return route
+
+    def best_two_opt_move(self, route):
+        """Finds the 2-opt move which shortens the route the most.
+
+        The move reverses the part of the route between positions i + 1 and j. Because durations
+        are not symmetric, the change of duration of the reversed part is taken into account with
+        the help of prefix sums of forward and backward durations along the route.
+
+        :param route: the order of addresses in the route
+        :type route: numpy.ndarray
+
+        :return: the change of the route duration and positions i and j of the best move
+        :rtype: tuple
+        """
+        next_route = np.roll(route, -1)
+        forward = self.working_matrix[route, next_route]
+        backward = self.working_matrix[next_route, route]
+        forward_sums = np.concatenate(([0], np.cumsum(forward)))
+        backward_sums = np.concatenate(([0], np.cumsum(backward)))
+
+        i = np.arange(self.size)[:, np.newaxis]
+        j = np.arange(self.size)[np.newaxis, :]
+        valid = (j > i + 1) & (i < self.size - 1)
+        i_next = np.minimum(i + 1, self.size - 1)
+
+        before, first = route[i], route[i_next]
+        last, after = route[j], next_route[j]
+
+        delta = (self.working_matrix[before, last] + self.working_matrix[first, after]
+                 - self.working_matrix[before, first] - self.working_matrix[last, after]
+                 + (backward_sums[j] - backward_sums[i_next]) - (forward_sums[j] - forward_sums[i_next]))
+        delta = np.where(valid, delta, np.Infinity)
+
+        i_best, j_best = np.unravel_index(np.argmin(delta), delta.shape)
+
+        return delta[i_best, j_best], (int(i_best), int(j_best))
+
+    def best_or_opt_move(self, route):
+        """Finds the Or-opt move which shortens the route the most.
+
+        The move takes a part of the route of one, two or three addresses and puts it without
+        reversing between two other neighbouring addresses of the route.
+
+        :param route: the order of addresses in the route
+        :type route: numpy.ndarray
+
+        :return: the change of the route duration and the start position, the length and the
+        new position of the moved part of the best move
+        :rtype: tuple
+        """
+        best_delta, best_move = np.Infinity, None
+        next_route = np.roll(route, -1)
+        positions = np.arange(self.size)
+
+        for length in self.or_opt_segment_lengths:
+            starts = np.arange(1, self.size - length + 1)[:, np.newaxis]
+
+            if not starts.size:
+                continue
+
+            ends = starts + length - 1
+            before, first = route[starts - 1], route[starts]
+            last, after = route[ends], route[(ends + 1) % self.size]
+
+            removal_gain = (self.working_matrix[before, first] + self.working_matrix[last, after]
+                            - self.working_matrix[before, after])
+            insertion_cost = (self.working_matrix[route[positions], first] + self.working_matrix[last, next_route]
+                              - self.working_matrix[route[positions], next_route])
+
+            delta = insertion_cost - removal_gain
+            valid = (positions < starts - 1) | (positions > ends)
+            delta = np.where(valid, delta, np.Infinity)
+
+            start_index, position = np.unravel_index(np.argmin(delta), delta.shape)
+
+            if delta[start_index, position] < best_delta:
+                best_delta = delta[start_index, position]
+                best_move = (int(starts[start_index, 0]), length, int(position))
+
+        return best_delta, best_move
+
+
+class IncrementalSolver(HeuristicSolver):
+    """Class is used to update the route when one address is added to it or removed from it.
+
+    Instead of resolving the whole route, the new address is put between the neighbouring addresses
+    where it increases the duration of the route the least (cheapest insertion) and neighbours of
+    the removed address are linked to each other. After that the route is repaired with at most
+    repair_moves best 2-opt and Or-opt moves, every move costs O(n²) operations.
+
+    :param value_matrix: matrix of durations which describe time to from one address to another`s
+    :type value_matrix: numpy.ndarray
+    :param route: the order of addresses in the current route which starts with the first address
+    :type route: list
+    :param repair_moves: the highest number of moves which repair the route
+    :type repair_moves: int
+    :param time_budget: the number of seconds which can be spent on repairing of the route
+    :type time_budget: float
+    """
+
+    def __init__(self, value_matrix, route, repair_moves=3, time_budget=0.1):
+        super().__init__(value_matrix, time_budget=time_budget)
+        self.route = np.array(route, dtype=np.int64)
+        self.repair_moves = repair_moves
+
+    def insert_method(self):
+        """Adds the last address of value matrix which is absent from the route to the route.
+
+        :return: the end result of solving the algorithm according to given value matrix
+        :rtype: dict
+        """
+        deadline = time.monotonic() + self.time_budget
+        address = self.size - 1
+        next_route = np.roll(self.route, -1)
+
+        insertion_cost = (self.working_matrix[self.route, address] + self.working_matrix[address, next_route]
+                          - self.working_matrix[self.route, next_route])
+        position = int(np.argmin(insertion_cost))
+        route = np.insert(self.route, position + 1, address)
+
+        return self.route_result(self.improve_route(route, deadline, self.repair_moves))
+
+    def remove_method(self, address):
+        """Removes the address from the route and from value matrix.
+
+        Addresses which follow the removed one in value matrix get indexes lower by one.
+
+        :param address: the index of the removed address, it can not be the first address
+        :type address: int
+
+        :return: the end result of solving the algorithm according to value matrix without the removed address
+        :rtype: dict
+        """
+        if address == 0:
+            raise ValueError('The first address of the route can not be removed.')
+
+        deadline = time.monotonic() + self.time_budget
+        self.value_matrix = np.delete(np.delete(self.value_matrix, address, axis=0), address, axis=1)
+        self.working_matrix = np.delete(np.delete(self.working_matrix, address, axis=0), address, axis=1)
+        self.size -= 1
+
+        route = self.route[self.route != address]
+        route = route - (route > address)
+
+        return self.route_result(self.improve_route(route, deadline, self.repair_moves))
+
+
+class RouteSolver:
+    """RouteSolver class is used for choosing an algorithm which resolves the route."""
+    modes = ('exact', 'heuristic', 'auto')
+    default_options = {
+        'HELD_KARP_MAX_SIZE': 13,
+        'EXACT_MAX_SIZE': 18,
+        'EXACT_TIME_LIMIT': 2.0,
+        'EXACT_NODE_LIMIT': None,
+        'EXACT_WORKERS': 1,
+        'EXACT_BOUND': 'reduction',
+        'HEURISTIC_TIME_BUDGET': 0.5,
+    }
+
+    @staticmethod
+    def solve(value_matrix, mode='auto', options=None, debug=False):
+        """Resolves the route with the algorithm which suits the mode and the size of value matrix.
+
+        In exact mode Held-Karp algorithm is used for value matrices which size is not higher than
+        HELD_KARP_MAX_SIZE option and branch and bound method limited by EXACT_TIME_LIMIT and
+        EXACT_NODE_LIMIT options is used for bigger value matrices. Branch and bound method is
+        executed in EXACT_WORKERS processes if this option is higher than 1 and calculates lower
+        bounds in the way set by EXACT_BOUND option. In heuristic mode the route is
+        found by local search within HEURISTIC_TIME_BUDGET option. In auto mode exact algorithms are
+        used for value matrices which size is not higher than EXACT_MAX_SIZE option and local search
+        is used for bigger ones.
+
+        Statistics of the used algorithm are always emitted as a structured log record and are
+        added to the result only in debug mode.
+
+        :param value_matrix: matrix of durations which describe time to from one address to another`s
+        :type value_matrix: numpy.ndarray
+        :param mode: the way of resolving the route, one of 'exact', 'heuristic' and 'auto'
+        :type mode: str
+        :param options: thresholds and limits of algorithms which override default_options attribute
+        of the class, usually ROUTE_SOLVER setting
+        :type options: dict
+        :param debug: indicates whether statistics of the algorithm are added to the result with
+        the stats key
+        :type debug: bool
+
+        :return: the end result of solving the algorithm according to given value matrix
+        :rtype: dict
+        """
+        if mode not in RouteSolver.modes:
+            raise ValueError(f"Route mode must be one of: {', '.join(RouteSolver.modes)}.")
+
+        options = {**RouteSolver.default_options, **(options or dict())}
+
+        if mode == 'auto':
+            mode = 'exact' if len(value_matrix) <= options['EXACT_MAX_SIZE'] else 'heuristic'
+
+        start_time = time.perf_counter()
+
+        if mode == 'heuristic':
+            stats = SolverStats('local_search', len(value_matrix))
+            final_result = HeuristicSolver(value_matrix,
+                                           time_budget=options['HEURISTIC_TIME_BUDGET']).local_search_method()
+        elif len(value_matrix) <= options['HELD_KARP_MAX_SIZE']:
+            stats = SolverStats('held_karp', len(value_matrix))
+            final_result = HeldKarpSolver(value_matrix).dynamic_programming_method()
+            stats.gap = 0.0
+        elif options['EXACT_WORKERS'] > 1:
+            solver = ParallelSolver(value_matrix, workers=options['EXACT_WORKERS'],
+                                    time_limit=options['EXACT_TIME_LIMIT'], node_limit=options['EXACT_NODE_LIMIT'],
+                                    bound=options['EXACT_BOUND'])
+            final_result = solver.parallel_branch_and_bound_method()
+            stats = solver.stats
+        else:
+            solver = Solver(value_matrix, time_limit=options['EXACT_TIME_LIMIT'],
+                            node_limit=options['EXACT_NODE_LIMIT'], bound=options['EXACT_BOUND'])
+            final_result = solver.branch_and_bound_method()
+            stats = solver.stats
+
+        stats.total_time = time.perf_counter() - start_time
+        stats.log()
+
+        if debug:
+            final_result['stats'] = stats.as_dict()
+
+        return final_result
@@ -0,0 +1,23 @@
+from django.db.models.signals import pre_save, post_delete
+from django.dispatch import receiver
+
+from .caches import RouteCache
+from .models import OrderModel
+
+
+@receiver(pre_save, sender=OrderModel)
+def invalidate_routes_on_order_change(sender, instance, **kwargs):
+    """Drops cached routes of the previous and the new courier if the order changes the courier or the status."""
+    previous = OrderModel.objects.filter(id=instance.id).values('courier_id', 'status').first() \
+        if instance.id is not None else None
+
+    if previous is None:
+        RouteCache.invalidate(instance.courier_id)
+    elif previous['courier_id'] != instance.courier_id or previous['status'] != instance.status:
+        RouteCache.invalidate(previous['courier_id'], instance.courier_id)
+
+
+@receiver(post_delete, sender=OrderModel)
+def invalidate_route_on_order_delete(sender, instance, **kwargs):
+    """Drops the cached route of the courier of the deleted order."""
+    RouteCache.invalidate(instance.courier_id)
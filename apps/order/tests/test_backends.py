@@ -0,0 +1,101 @@
+from unittest import mock
+import numpy as np
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..addresses import AddressNormalizer
+from ..backends import LocalRoutingBackend, GoogleRoutingBackend, get_routing_backend
+from ..caches import GeocodingCache, DurationCache
+from ..models import GeocodedAddressModel
+
+LOCAL_ROUTING_BACKEND = {
+    'BACKEND': 'apps.order.backends.LocalRoutingBackend',
+    'OPTIONS': {'DETOUR_FACTOR': 1, 'SPEED_PROFILES': {'driving': {'DEFAULT': 36, 'HOURS': dict()}}},
+}
+
+
+class TestAddressNormalizerClass(TestCase):
+    def test_normalize_method(self):
+        self.assertEqual(AddressNormalizer.normalize('  ШАРАНЕВИЧА   28 ,Львів, '), 'шараневича 28, львів')
+
+        for address in ('вул. Шараневича, 28 Львів', 'м. Львів, вулиця Шараневича, буд. 28', 'Шараневича 28',
+                        'Шараневича 28, кв. 15, Львів'):
+            self.assertEqual(AddressNormalizer.normalize(address), 'шараневича 28, львів')
+
+        self.assertEqual(AddressNormalizer.normalize('просп. Свободи 5-А, Львів'), 'проспект свободи 5а, львів')
+        self.assertEqual(AddressNormalizer.normalize('Проспект Свободи, 5 а'), 'проспект свободи 5а, львів')
+        self.assertEqual(AddressNormalizer.normalize('Винники, вул. Галицька 12 / 3'), 'галицька 12/3, винники')
+        self.assertEqual(AddressNormalizer.normalize('пл. Ринок'), 'площа ринок, львів')
+        self.assertEqual(AddressNormalizer.normalize('вул. 1 Листопада 7'), '1 листопада 7, львів')
+
+        for address in ('вул. Шараневича 28 м. Львів', 'вул. Шараневича 28 г. Львов', 'Шараневича 28 д. 5',
+                        'Шараневича 28 м Львів', 'Шараневича 28 д', "Шараневича 28, під'їзд 2"):
+            self.assertEqual(AddressNormalizer.normalize(address), 'шараневича 28, львів')
+
+        self.assertEqual(AddressNormalizer.normalize('Шараневича 28 б Львів'), 'шараневича 28б, львів')
+        self.assertEqual(AddressNormalizer.normalize('Шараневича 28г. Львів'), 'шараневича 28г, львів')
+        self.assertEqual(AddressNormalizer.normalize('Городоцька 100г'), 'городоцька 100г, львів')
+        self.assertEqual(AddressNormalizer.normalize('Стрийська 45д, Львів'), 'стрийська 45д, львів')
+        self.assertEqual(AddressNormalizer.normalize('Наукова 7-м'), 'наукова 7м, львів')
+        self.assertEqual(AddressNormalizer.normalize('Шевченка 10, Київ'), 'шевченка 10, київ')
+        self.assertEqual(AddressNormalizer.normalize('Шевченка 10, м. Біла Церква'), 'шевченка 10, біла церква')
+
+
+@override_settings(ROUTING_BACKEND=LOCAL_ROUTING_BACKEND)
+class TestLocalRoutingBackendClass(TestCase):
+    def setUp(self):
+        self.addresses = ['Шараневича 28, Львів', 'Площа Ринок 1, Львів', 'Невідома 1, Львів']
+        coordinates = [(49.8183, 23.9806), (49.8419, 24.0315)]
+
+        for address, (latitude, longitude) in zip(self.addresses, coordinates):
+            GeocodedAddressModel.objects.create(normalized_address=AddressNormalizer.normalize(address),
+                                                is_valid=True, latitude=latitude, longitude=longitude,
+                                                validation_time=timezone.now())
+
+    def test_get_routing_backend_function(self):
+        backend = get_routing_backend()
+
+        self.assertIsInstance(backend, LocalRoutingBackend)
+        self.assertEqual(backend.options['DETOUR_FACTOR'], 1)
+
+        with override_settings(ROUTING_BACKEND={'BACKEND': 'apps.order.backends.GoogleRoutingBackend'}):
+            self.assertIsInstance(get_routing_backend(), GoogleRoutingBackend)
+
+        with override_settings(ROUTING_BACKEND={'BACKEND': 'apps.order.backends.GoogleRoutingBackend',
+                                                'OPTIONS': {'API_KEY': 'key', 'MAX_ELEMENTS': 25, 'RETRIES': 0}}):
+            backend = get_routing_backend()
+
+        self.assertEqual((backend.geocoding_api.api_key, backend.geocoding_api.retries), ('key', 0))
+        self.assertEqual((backend.maps_api.api_key, backend.maps_api.max_elements, backend.maps_api.max_workers),
+                         ('key', 25, 4))
+
+    def test_haversine_distances_method(self):
+        distances = LocalRoutingBackend.haversine_distances(np.array([[0, 0], [0, 90]]), np.array([[0, 1], [90, 0]]))
+
+        self.assertAlmostEqual(distances[0][0], 111.195, places=3)
+        self.assertAlmostEqual(distances[0][1], distances[1][1], places=6)
+        self.assertAlmostEqual(distances[1][1], np.pi / 2 * LocalRoutingBackend.earth_radius, places=6)
+
+    @mock.patch('apps.order.services.GeocodingAPI.validate_addresses')
+    def test_validate_address(self, validate_addresses):
+        self.assertEqual(GeocodingCache.validate_address(' площа ринок 1,Львів'),
+                         {'latitude': 49.8419, 'longitude': 24.0315})
+
+        with self.assertRaises(ValueError):
+            GeocodingCache.validate_address(self.addresses[2])
+
+        validate_addresses.assert_not_called()
+
+    @mock.patch('apps.order.services.MapsAPIUse.get_durations')
+    def test_get_value_matrix_between_addresses(self, get_durations):
+        duration_matrix = DurationCache.get_value_matrix_between_addresses(self.addresses[:2],
+                                                                           'driving')['duration_matrix']
+
+        self.assertTrue(np.all(np.isinf(np.diag(duration_matrix))))
+        self.assertEqual(duration_matrix[0][1], duration_matrix[1][0])
+        self.assertAlmostEqual(duration_matrix[0][1], 449, delta=1)
+        get_durations.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            DurationCache.get_value_matrix_between_addresses(self.addresses, 'driving')
@@ -0,0 +1,62 @@
+from unittest import TestCase
+import json
+import os
+import tempfile
+import numpy as np
+
+from ..benchmarks import MatrixGenerator, RouteSolverBenchmark
+
+
+class TestMatrixGeneratorClass(TestCase):
+    def test_generate_method(self):
+        for kind in MatrixGenerator.kinds:
+            value_matrix = MatrixGenerator.generate(kind, 7, 1)
+
+            self.assertEqual(value_matrix.shape, (7, 7))
+            self.assertTrue(np.all(np.isinf(np.diag(value_matrix))))
+            self.assertTrue(np.all(value_matrix[~np.eye(7, dtype=bool)] > 0))
+            self.assertTrue(np.array_equal(value_matrix, MatrixGenerator.generate(kind, 7, 1)))
+            self.assertFalse(np.array_equal(value_matrix, MatrixGenerator.generate(kind, 7, 2)))
+
+        clustered_matrix = MatrixGenerator.generate('clustered', 7, 1)
+        traffic_matrix = MatrixGenerator.generate('traffic', 7, 1)
+        self.assertTrue(np.array_equal(clustered_matrix, clustered_matrix.T))
+        self.assertFalse(np.array_equal(traffic_matrix, traffic_matrix.T))
+
+        with self.assertRaises(ValueError):
+            MatrixGenerator.generate('grid', 7, 1)
+
+
+class TestRouteSolverBenchmarkClass(TestCase):
+    def test_solvers_method(self):
+        benchmark = RouteSolverBenchmark()
+
+        self.assertIn('held_karp', benchmark.solvers(5))
+        self.assertNotIn('parallel_branch_and_bound', benchmark.solvers(5))
+        self.assertIn('parallel_branch_and_bound', benchmark.solvers(15))
+        self.assertNotIn('held_karp', benchmark.solvers(25))
+
+    def test_run_method(self):
+        benchmark = RouteSolverBenchmark(sizes=[6], seeds=[0], time_limit=1)
+        results = benchmark.run()
+
+        self.assertEqual(len(results), len(MatrixGenerator.kinds) * len(benchmark.solvers(6)))
+        for result in results:
+            self.assertGreater(result['time'], 0)
+            self.assertGreater(result['peak_memory'], 0)
+
+        for kind in MatrixGenerator.kinds:
+            exact_durations = {result['tour_duration'] for result in results
+                               if result['kind'] == kind and result['solver'] != 'local_search'}
+            self.assertEqual(len(exact_durations), 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.json')
+            benchmark.write_results(path)
+
+            with open(path) as file:
+                data = json.load(file)
+
+        self.assertEqual(data['results'], results)
+        self.assertEqual(data['parameters']['sizes'], [6])
+        self.assertEqual(data['parallel_comparison'], [])
@@ -0,0 +1,181 @@
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..caches import GeocodingCache, DurationCache, RouteCache
+from ..models import GeocodedAddressModel, AddressDurationModel
+
+
+@mock.patch('apps.order.services.GeocodingAPI.validate_addresses')
+class TestGeocodingCacheClass(TestCase):
+    def setUp(self):
+        GeocodingCache.clear()
+        self.address = 'Шараневича 28, Львів'
+        self.coordinates = {'latitude': 49.8, 'longitude': 24.0}
+
+    def tearDown(self):
+        GeocodingCache.clear()
+
+    def test_memory_and_database_hits(self, validate_addresses):
+        validate_addresses.return_value = self.coordinates
+
+        self.assertEqual(GeocodingCache.validate_address(self.address), self.coordinates)
+        self.assertEqual(GeocodingCache.validate_address('шараневича 28,  Львів'), self.coordinates)
+        GeocodingCache.entries.clear()
+        self.assertEqual(GeocodingCache.validate_address(self.address), self.coordinates)
+        self.assertEqual(GeocodingCache.validate_address(self.address), self.coordinates)
+
+        validate_addresses.assert_called_once_with(self.address)
+        self.assertEqual(GeocodingCache.statistics(),
+                         {'memory_hits': 2, 'database_hits': 1, 'misses': 1, 'memory_size': 1})
+        self.assertTrue(GeocodedAddressModel.objects.get(normalized_address='шараневича 28, львів').is_valid)
+
+    def test_negative_results(self, validate_addresses):
+        validate_addresses.side_effect = ValueError('Given delivery address is not valid.')
+
+        for i in range(2):
+            with self.assertRaises(ValueError):
+                GeocodingCache.validate_address('Невідома 1')
+
+        self.assertEqual(validate_addresses.call_count, 1)
+        self.assertEqual(GeocodingCache.statistics()['misses'], 1)
+
+    def test_negative_results_do_not_invalidate_building(self, validate_addresses):
+        validate_addresses.side_effect = [ValueError('Given delivery address is not valid.'), self.coordinates]
+
+        with self.assertRaises(ValueError):
+            GeocodingCache.validate_address('Шараневича 28, кв. 9999, Львів')
+
+        self.assertEqual(GeocodingCache.validate_address(self.address), self.coordinates)
+        self.assertFalse(GeocodedAddressModel.objects.get(
+            normalized_address='шараневича 28, кв. 9999, львів').is_valid)
+        self.assertTrue(GeocodedAddressModel.objects.get(normalized_address='шараневича 28, львів').is_valid)
+
+    def test_expired_results(self, validate_addresses):
+        validate_addresses.return_value = self.coordinates
+        GeocodedAddressModel.objects.create(normalized_address='невідома 1, львів', is_valid=False,
+                                            validation_time=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(GeocodingCache.validate_address('Невідома 1'), self.coordinates)
+        self.assertTrue(GeocodedAddressModel.objects.get(normalized_address='невідома 1, львів').is_valid)
+        self.assertEqual(GeocodingCache.statistics()['misses'], 1)
+
+    def test_request_errors_are_not_cached(self, validate_addresses):
+        validate_addresses.side_effect = ConnectionError()
+
+        with self.assertRaises(ConnectionError):
+            GeocodingCache.validate_address(self.address)
+
+        self.assertFalse(GeocodedAddressModel.objects.exists())
+        self.assertEqual(GeocodingCache.statistics()['memory_size'], 0)
+
+    @override_settings(GEOCODING_CACHE={'MEMORY_SIZE': 2, 'POSITIVE_TTL': 60, 'NEGATIVE_TTL': 60})
+    def test_memory_size(self, validate_addresses):
+        validate_addresses.return_value = self.coordinates
+
+        for address in ('Городоцька 1', 'Городоцька 2', 'Городоцька 1', 'Городоцька 3'):
+            GeocodingCache.validate_address(address)
+
+        self.assertEqual(list(GeocodingCache.entries), ['городоцька 1, львів', 'городоцька 3, львів'])
+
+
+def fake_durations(origins, destinations, mode):
+    return np.array([[100 * len(origin) + len(destination) for destination in destinations] for origin in origins],
+                    dtype=float)
+
+
+@mock.patch('apps.order.services.MapsAPIUse.get_durations', side_effect=fake_durations)
+class TestDurationCacheClass(TestCase):
+    def setUp(self):
+        DurationCache.clear()
+        self.addresses = ['Шараневича 28, Львів', 'Городоцька 1, Львів', 'Зелена 100, Львів']
+
+    def test_get_value_matrix_between_addresses_method(self, get_durations):
+        duration_matrix = DurationCache.get_value_matrix_between_addresses(self.addresses, 'driving')['duration_matrix']
+
+        self.assertEqual(get_durations.call_count, 1)
+        self.assertTrue(np.array_equal(np.diag(duration_matrix), np.full(3, np.Infinity)))
+        self.assertEqual(duration_matrix[0][1], 100 * len(self.addresses[0]) + len(self.addresses[1]))
+        self.assertEqual(AddressDurationModel.objects.count(), 6)
+
+        cached_matrix = DurationCache.get_value_matrix_between_addresses(self.addresses, 'driving')['duration_matrix']
+
+        self.assertEqual(get_durations.call_count, 1)
+        self.assertTrue(np.array_equal(cached_matrix, duration_matrix))
+        self.assertEqual(DurationCache.statistics(), {'hits': 6, 'misses': 6})
+
+    def test_only_missing_durations_are_requested(self, get_durations):
+        DurationCache.get_value_matrix_between_addresses(self.addresses[:2], 'driving')
+        get_durations.reset_mock()
+
+        duration_matrix = DurationCache.get_value_matrix_between_addresses(self.addresses, 'driving')['duration_matrix']
+
+        requested_cells = sum(len(call.args[0]) * len(call.args[1]) for call in get_durations.call_args_list)
+        self.assertEqual(get_durations.call_count, 2)
+        self.assertEqual(requested_cells, 4)
+        self.assertTrue(np.array_equal(duration_matrix[:2, :2],
+                                       DurationCache.get_value_matrix_between_addresses(
+                                           self.addresses[:2], 'driving')['duration_matrix']))
+
+    def test_known_matrix(self, get_durations):
+        known_matrix = np.array([[np.Infinity, 1], [2, np.Infinity]])
+        duration_matrix = DurationCache.get_value_matrix_between_addresses(
+            self.addresses, 'driving', known_matrix=known_matrix)['duration_matrix']
+
+        requested_cells = sum(len(call.args[0]) * len(call.args[1]) for call in get_durations.call_args_list)
+        self.assertEqual(requested_cells, 4)
+        self.assertTrue(np.array_equal(duration_matrix[:2, :2], known_matrix))
+        self.assertEqual(duration_matrix[2][0], 100 * len(self.addresses[2]) + len(self.addresses[0]))
+        self.assertEqual(duration_matrix[1][2], 100 * len(self.addresses[1]) + len(self.addresses[2]))
+        self.assertEqual(AddressDurationModel.objects.count(), 4)
+
+        get_durations.reset_mock()
+        DurationCache.get_value_matrix_between_addresses(self.addresses, 'driving', known_matrix=known_matrix)
+        get_durations.assert_not_called()
+
+    def test_same_addresses(self, get_durations):
+        duration_matrix = DurationCache.get_value_matrix_between_addresses(
+            [self.addresses[0], self.addresses[0].upper()], 'driving')['duration_matrix']
+
+        self.assertEqual(duration_matrix[0][1], 0)
+        get_durations.assert_not_called()
+
+    def test_evict_method(self, get_durations):
+        DurationCache.get_value_matrix_between_addresses(self.addresses, 'driving')
+        AddressDurationModel.objects.update(fetch_time=timezone.now() - timedelta(days=2))
+
+        DurationCache.get_value_matrix_between_addresses(self.addresses[:2], 'driving')
+
+        self.assertEqual(get_durations.call_count, 2)
+        self.assertEqual(AddressDurationModel.objects.count(), 2)
+
+
+class TestRouteCacheClass(TestCase):
+    def setUp(self):
+        RouteCache.clear()
+        caches['default'].clear()
+        self.route = {'route_points': ['Шараневича 28, Львів', 'Наукова 7, Львів', 'Шараневича 28, Львів']}
+
+    def test_fingerprint_method(self):
+        fingerprint = RouteCache.fingerprint(['шараневича 28, львів', 'наукова 7, львів'], 'auto', 'driving')
+
+        self.assertEqual(RouteCache.fingerprint(['наукова 7, львів', 'шараневича 28, львів'], 'auto', 'driving'),
+                         fingerprint)
+        self.assertNotEqual(RouteCache.fingerprint(['шараневича 28, львів'], 'auto', 'driving'), fingerprint)
+        self.assertNotEqual(RouteCache.fingerprint(['шараневича 28, львів', 'наукова 7, львів'], 'exact', 'driving'),
+                            fingerprint)
+
+    def test_get_and_invalidate_methods(self):
+        RouteCache.set(1, 'fingerprint', self.route)
+
+        self.assertEqual(RouteCache.get(1, 'fingerprint'), self.route)
+        self.assertIsNone(RouteCache.get(1, 'other fingerprint'))
+        self.assertIsNone(RouteCache.get(2, 'fingerprint'))
+
+        RouteCache.invalidate(None, 1)
+        self.assertIsNone(RouteCache.get(1, 'fingerprint'))
+        self.assertEqual(RouteCache.statistics(), {'hits': 1, 'misses': 3})
@@ -0,0 +1,100 @@
+from datetime import datetime, time
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..addresses import AddressNormalizer
+from ..backends import LocalRoutingBackend, get_routing_backend
+from ..history import DeliveryDurationEstimator, HistoricalRoutingBackend
+from ..models import GeocodedAddressModel, OrderModel, DeliveryPaceModel
+
+UserModel = get_user_model()
+
+DELIVERY_HISTORY = {
+    'DEPOT_ADDRESS': 'Шараневича 28, Львів',
+    'CELL_SIZE': 0.01,
+    'MIN_SAMPLES': 2,
+    'MIN_DISTANCE': 0.3,
+    'RELOAD_INTERVAL': 60,
+}
+
+
+@override_settings(DELIVERY_HISTORY=DELIVERY_HISTORY)
+class TestDeliveryDurationEstimatorClass(TestCase):
+    def setUp(self):
+        DeliveryDurationEstimator.clear()
+        self.coordinates = {'Шараневича 28, Львів': (49.8183, 23.9806), 'Площа Ринок 1, Львів': (49.8419, 24.0315),
+                            'Городоцька 120, Львів': (49.8310, 23.9880)}
+
+        for address, (latitude, longitude) in self.coordinates.items():
+            GeocodedAddressModel.objects.create(normalized_address=AddressNormalizer.normalize(address),
+                                                is_valid=True, latitude=latitude, longitude=longitude,
+                                                validation_time=timezone.now())
+
+        user = UserModel.objects.create_user(email='user@gmail.com', password='user', first_name='Petro',
+                                             last_name='Petrov', phone_number='38077878344730', is_active=True)
+        monday_noon = timezone.make_aware(datetime(2026, 10, 12, 12, 15))
+        deliveries = [('Площа Ринок 1, Львів', monday_noon, time(minute=10)),
+                      ('Площа Ринок 1, Львів', monday_noon, time(minute=12)),
+                      ('Площа Ринок 1, Львів', monday_noon.replace(hour=18), time(minute=20)),
+                      ('Городоцька 120, Львів', monday_noon, time(minute=6)),
+                      ('Шараневича 28, Львів', monday_noon, time(minute=5)),
+                      ('Невідома 1, Львів', monday_noon, time(minute=5))]
+
+        for delivery_address, delivery_start_time, delivery_duration in deliveries:
+            order = OrderModel.objects.create(delivery_address=delivery_address, payment_method='cash', comment='-',
+                                              status='delivered', delivery_duration=delivery_duration, user=user)
+            OrderModel.objects.filter(id=order.id).update(delivery_start_time=delivery_start_time)
+
+        OrderModel.objects.create(delivery_address='Площа Ринок 1, Львів', payment_method='cash', comment='-',
+                                  user=user)
+        self.monday_noon = monday_noon
+        self.distance = LocalRoutingBackend.haversine_distances(
+            np.array([self.coordinates['Шараневича 28, Львів']]),
+            np.array([self.coordinates['Площа Ринок 1, Львів']]))[0][0]
+
+    def test_fit_method(self):
+        self.assertEqual(DeliveryDurationEstimator.fit(), {'orders': 6, 'samples': 4, 'groups': 3})
+
+        delivery_pace = DeliveryPaceModel.objects.get(hour_of_week=12, samples=2)
+        self.assertAlmostEqual(delivery_pace.pace, 660 / self.distance)
+
+        DeliveryDurationEstimator.fit()
+        self.assertEqual(DeliveryPaceModel.objects.count(), 3)
+
+    def test_fit_method_without_depot(self):
+        GeocodedAddressModel.objects.filter(normalized_address='шараневича 28, львів').delete()
+
+        with self.assertRaises(ValueError):
+            DeliveryDurationEstimator.fit()
+
+    def test_pace_method(self):
+        self.assertIsNone(DeliveryDurationEstimator.pace(49.8419, 24.0315, self.monday_noon))
+
+        DeliveryDurationEstimator.fit()
+        evening = self.monday_noon.replace(hour=18)
+
+        self.assertAlmostEqual(DeliveryDurationEstimator.pace(49.8419, 24.0315, self.monday_noon), 660 / self.distance)
+        self.assertAlmostEqual(DeliveryDurationEstimator.pace(49.8419, 24.0315, evening),
+                               (2 * 660 + 1200) / 3 / self.distance)
+        self.assertAlmostEqual(DeliveryDurationEstimator.pace(49.5, 24.5, self.monday_noon),
+                               DeliveryDurationEstimator.load()['hours'][12][0])
+        self.assertAlmostEqual(DeliveryDurationEstimator.pace(49.5, 24.5, evening),
+                               DeliveryDurationEstimator.load()['all'][None][0])
+
+    @override_settings(ROUTING_BACKEND={'BACKEND': 'apps.order.history.HistoricalRoutingBackend', 'OPTIONS': {}})
+    def test_historical_routing_backend(self):
+        backend = get_routing_backend()
+        addresses = ['Шараневича 28, Львів', 'Площа Ринок 1, Львів']
+
+        self.assertIsInstance(backend, HistoricalRoutingBackend)
+        np.testing.assert_array_equal(backend.get_durations(addresses, addresses, 'driving'),
+                                      LocalRoutingBackend().get_durations(addresses, addresses, 'driving'))
+
+        DeliveryDurationEstimator.fit()
+        durations = backend.get_durations(addresses[:1], addresses[1:], 'driving')
+        pace = DeliveryDurationEstimator.pace(*self.coordinates['Площа Ринок 1, Львів'], timezone.now())
+
+        self.assertEqual(durations[0][0], np.round(self.distance * pace))
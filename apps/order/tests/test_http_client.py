@@ -0,0 +1,84 @@
+from unittest import TestCase, mock
+import time
+import requests
+
+from ..http_client import HttpClient, CircuitBreaker, CircuitOpenError
+
+
+def create_response(status_code, data=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{"status": "OK"}' if data is None else data
+
+    return response
+
+
+class TestHttpClientClass(TestCase):
+    def setUp(self):
+        self.client = HttpClient('upstream', timeout=(1, 2), retries=2, backoff=0,
+                                 circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    def test_get_json_method(self):
+        with mock.patch.object(self.client.session, 'get', return_value=create_response(200)) as get:
+            self.assertEqual(self.client.get_json('https://upstream/api', params={'a': 1}), {'status': 'OK'})
+
+        get.assert_called_once_with('https://upstream/api', params={'a': 1}, timeout=(1, 2))
+        statistics = self.client.statistics()
+        self.assertEqual((statistics['requests'], statistics['attempts'], statistics['failures']), (1, 1, 0))
+        self.assertEqual(statistics['latency_buckets']['10.0'], 1)
+        self.assertEqual(statistics['circuit'], 'closed')
+
+    def test_retries(self):
+        responses = [requests.Timeout(), create_response(503), create_response(200)]
+
+        with mock.patch.object(self.client.session, 'get', side_effect=responses) as get:
+            self.assertEqual(self.client.get_json('https://upstream/api'), {'status': 'OK'})
+
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(self.client.statistics()['retries'], 2)
+
+        with mock.patch.object(self.client.session, 'get', return_value=create_response(404)) as get:
+            with self.assertRaises(requests.HTTPError):
+                self.client.get_json('https://upstream/api')
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(self.client.circuit_breaker.state, 'closed')
+
+    def test_deadline(self):
+        with mock.patch.object(self.client.session, 'get', return_value=create_response(200)) as get:
+            with self.assertRaises(requests.Timeout):
+                self.client.get_json('https://upstream/api', deadline=time.monotonic() - 1)
+
+            self.client.get_json('https://upstream/api', deadline=time.monotonic() + 0.5)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertTrue(all(part <= 0.5 for part in get.call_args.kwargs['timeout']))
+
+        self.client.backoff = self.client.max_backoff = 10
+
+        with mock.patch.object(self.client.session, 'get', side_effect=requests.ConnectionError()) as get:
+            with self.assertRaises(requests.ConnectionError):
+                self.client.get_json('https://upstream/api', deadline=time.monotonic() + 1)
+
+        self.assertLessEqual(get.call_count, 2)
+
+    def test_circuit_breaker(self):
+        with mock.patch.object(self.client.session, 'get', side_effect=requests.ConnectionError()) as get:
+            for i in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    self.client.get_json('https://upstream/api')
+
+            with self.assertRaises(CircuitOpenError):
+                self.client.get_json('https://upstream/api')
+
+        self.assertEqual(get.call_count, 6)
+        self.assertEqual(self.client.statistics()['rejected'], 1)
+        self.assertEqual(self.client.statistics()['circuit'], 'open')
+
+        self.client.circuit_breaker.reset_timeout = 0
+
+        with mock.patch.object(self.client.session, 'get', return_value=create_response(200)):
+            self.assertEqual(self.client.statistics()['circuit'], 'half_open')
+            self.client.get_json('https://upstream/api')
+
+        self.assertEqual(self.client.statistics()['circuit'], 'closed')
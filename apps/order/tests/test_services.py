@@ -1,7 +1,11 @@
-from unittest import TestCase
+from unittest import TestCase, mock
+import os
+import threading
 import numpy as np
+import requests
 
-from ..services import Solver, Node, MapsAPIUse
+from ..services import Solver, Node, MapsAPIUse, HeldKarpSolver, HeuristicSolver, ParallelSolver, RouteSolver, \
+    SolverStats, IncrementalSolver
 
 
 class TestNode(TestCase):
@@ -70,39 +74,24 @@ class TestNode(TestCase):
 
         self.assertEqual(self.node.lower_bound, 9)
 
-    def test_find_next_path_method(self):
-        self.node.constraint_matrix[0][2] = 1
-        self.node.constraint_matrix[2][0] = 1
+    def test_add_path_to_tour_excludes_sub_tours(self):
+        self.node.add_path_to_tour({'from': 0, 'to': 2})
+        self.node.add_path_to_tour({'from': 2, 'to': 1})
 
-        result = self.node.find_next_path(0, 2)
-        self.assertEqual(result, {'has_next': False})
+        self.assertEqual(self.node.constraint_matrix[1][0], 0)
+        self.assertEqual(self.node.value_matrix[1][0], np.Infinity)
 
-        self.node.constraint_matrix[0][2] = 0
-        self.node.constraint_matrix[4][2] = 1
+        self.node.add_path_to_tour({'from': 3, 'to': 4})
 
-        result = self.node.find_next_path(2, 4)
-        self.assertEqual(result, {'has_next': False})
+        self.assertEqual(self.node.constraint_matrix[4][3], 0)
+        self.assertEqual(self.node.chain_end[0], 1)
+        self.assertEqual(self.node.chain_start[4], 3)
 
-        result = self.node.find_next_path(1, 4)
-        self.assertEqual(result, {'has_next': True, 'next_vertex': 2})
+        self.node.add_path_to_tour({'from': 1, 'to': 3})
 
-    def test_check_sub_tours_method(self):
-        self.node.constraint_matrix = np.array([
-            [0, 2, 2, 0, 0],
-            [0, 0, 0, 1, 0],
-            [2, 2, 0, 2, 2],
-            [0, 0, 0, 0, 1],
-            [2, 2, 2, 0, 0]
-        ])
-
-        self.node.check_sub_tours()
-
-        self.assertEqual(self.node.constraint_matrix[4][1], 0)
-
-        self.node.constraint_matrix[2][1] = 1
-        self.node.check_sub_tours()
-
-        self.assertEqual(self.node.constraint_matrix[4][2], 0)
+        self.assertEqual(self.node.constraint_matrix[4][0], 2)
+        self.assertEqual(self.node.chain_end[0], 4)
+        self.assertEqual(self.node.chain_start[4], 0)
 
     def test_add_path_to_tour_method(self):
         self.node.add_path_to_tour({'from': 2, 'to': 4})
@@ -158,6 +147,30 @@ class TestNode(TestCase):
         self.assertEqual(self.node.is_tour(), False)
 
 
+class FakeDistanceMatrixProvider:
+    def __init__(self, max_elements, failures=0):
+        self.max_elements = max_elements
+        self.failures = failures
+        self.requests = list()
+        self.deadlines = set()
+        self.lock = threading.Lock()
+
+    def request_durations(self, origins, destinations, mode, deadline=None):
+        self.deadlines.add(deadline)
+
+        if len(origins) * len(destinations) > self.max_elements:
+            raise requests.RequestException('Distance Matrix API returned status MAX_ELEMENTS_EXCEEDED.')
+
+        with self.lock:
+            self.requests.append((tuple(origins), tuple(destinations)))
+
+            if self.failures:
+                self.failures -= 1
+                raise requests.RequestException('Distance Matrix API returned status UNKNOWN_ERROR.')
+
+        return np.array([[float(origin * 1000 + destination) for destination in destinations] for origin in origins])
+
+
 class TestMapsAPIUseClass(TestCase):
     def test_get_value_matrix_between_addresses_method(self):
         addresses = ['Оперний театр, Львів', 'Forum, Львів', 'Цирк, Львів']
@@ -166,13 +179,50 @@ class TestMapsAPIUseClass(TestCase):
             'mode': 'driving'
         }
 
-        result = MapsAPIUse.get_value_matrix_between_addresses(**params)
+        result = MapsAPIUse(os.environ.get('GOOGLE_MAPS_API_KEY')).get_value_matrix_between_addresses(**params)
 
         self.assertIsInstance(result['duration_matrix'], np.ndarray)
         self.assertEqual(len(result['duration_matrix']), len(addresses))
         for i in range(len(addresses)):
             self.assertEqual(result['duration_matrix'][i][i], np.Infinity)
 
+    def test_split_into_tiles_method(self):
+        maps_api = MapsAPIUse()
+        self.assertEqual(maps_api.split_into_tiles(3, 3), [(slice(0, 3), slice(0, 3))])
+
+        for number_of_origins, number_of_destinations in ((11, 11), (30, 30), (1, 60), (4, 26)):
+            tiles = maps_api.split_into_tiles(number_of_origins, number_of_destinations)
+            covered_matrix = np.zeros((number_of_origins, number_of_destinations), dtype=int)
+
+            for rows, columns in tiles:
+                covered_matrix[rows, columns] += 1
+                self.assertLessEqual(len(range(number_of_origins)[rows]) * len(range(number_of_destinations)[columns]),
+                                     maps_api.max_elements)
+
+            self.assertTrue(np.all(covered_matrix == 1))
+
+    def test_get_durations_method(self):
+        addresses = list(range(23))
+        maps_api = MapsAPIUse(max_elements=50)
+        provider = FakeDistanceMatrixProvider(maps_api.max_elements)
+
+        with mock.patch.object(maps_api, 'request_durations', side_effect=provider.request_durations):
+            duration_matrix = maps_api.get_durations(addresses, addresses, 'driving')
+
+        number_of_tiles = len(maps_api.split_into_tiles(23, 23))
+        self.assertGreater(number_of_tiles, 1)
+        self.assertEqual(len(provider.requests), number_of_tiles)
+        self.assertEqual(len(provider.deadlines), 1)
+        self.assertTrue(np.array_equal(duration_matrix, np.add.outer(np.arange(23) * 1000, np.arange(23))))
+
+        provider = FakeDistanceMatrixProvider(maps_api.max_elements, failures=1)
+
+        with mock.patch.object(maps_api, 'request_durations', side_effect=provider.request_durations):
+            with self.assertRaises(requests.RequestException):
+                maps_api.get_durations(addresses, addresses, 'driving')
+
+        self.assertLessEqual(len(provider.requests), number_of_tiles)
+
 
 class TestSolverClass(TestCase):
     def setUp(self):
@@ -212,6 +262,22 @@ class TestSolverClass(TestCase):
         self.assertEqual(len(right_child_node.tour), 0)
         self.assertNotIn(root_node.next_path_to_split, right_child_node.tour)
 
+    def test_child_node_keeps_only_added_path(self):
+        root_node = Node(self.solver.value_matrix, self.solver.create_constraints_matrix())
+        root_node.calculate_lower_bound_of_tour()
+        root_node.select_next_path_to_split()
+
+        child_node = self.solver.create_child_node(root_node, add_path=True)
+        child_node.select_next_path_to_split()
+        grandchild_node = self.solver.create_child_node(child_node, add_path=True)
+        root_node.release_matrices()
+
+        self.assertEqual(child_node.constraint_matrix.dtype, np.int8)
+        self.assertEqual(grandchild_node.path, child_node.next_path_to_split)
+        self.assertEqual(grandchild_node.tour, [root_node.next_path_to_split, child_node.next_path_to_split])
+        self.assertIsNone(root_node.value_matrix)
+        self.assertRaises(AttributeError, setattr, child_node, 'left_child', None)
+
     def test_branch_and_bound_method(self):
         final_result = self.solver.branch_and_bound_method()
         correct_result = [{'from': 4, 'to': 3}, {'from': 3, 'to': 1}, {'from': 0, 'to': 2}, {'from': 1, 'to': 0},
@@ -220,7 +286,262 @@ class TestSolverClass(TestCase):
         self.assertIsInstance(final_result, dict)
         self.assertEqual(final_result['tour_duration'], 199)
         self.assertEqual(final_result['tour'], correct_result)
+        self.assertEqual(final_result['gap'], 0)
+
+    def test_solver_stats(self):
+        self.solver.branch_and_bound_method()
+        stats = self.solver.stats.as_dict()
+
+        self.assertEqual(stats['nodes_created'], self.solver.number_of_nodes)
+        self.assertEqual(stats['nodes_created'], 2 * stats['nodes_expanded'] + 1)
+        self.assertGreater(stats['max_frontier_size'], 0)
+        self.assertGreater(stats['reduction_time'], 0)
+        self.assertGreater(stats['subtour_time'], 0)
+        self.assertGreaterEqual(stats['total_time'], stats['reduction_time'])
+        self.assertEqual(stats['gap'], 0)
+
+    def test_assignment_bound(self):
+        reduction_root_node = Solver(self.duration_matrix).create_root_node()
+        assignment_root_node = Solver(self.duration_matrix, bound='assignment').create_root_node()
+        assignment = assignment_root_node.assignment
+
+        self.assertGreaterEqual(assignment_root_node.lower_bound, reduction_root_node.lower_bound)
+        self.assertEqual(sorted(assignment), list(range(self.solver.size)))
+        for i in range(self.solver.size):
+            self.assertEqual(assignment_root_node.value_matrix[i][assignment[i]], 0)
+        self.assertEqual(np.min(assignment_root_node.value_matrix), 0)
+
+        random_generator = np.random.default_rng(9)
+        for size in range(3, 12):
+            duration_matrix = random_generator.integers(60, 1800, (size, size)).astype(float)
+            np.fill_diagonal(duration_matrix, np.Infinity)
+
+            reduction_solver = Solver(duration_matrix, incumbent_time_budget=None)
+            reduction_result = reduction_solver.branch_and_bound_method()
+            assignment_solver = Solver(duration_matrix, incumbent_time_budget=None, bound='assignment')
+            assignment_result = assignment_solver.branch_and_bound_method()
+
+            self.assertEqual(assignment_result['tour_duration'], reduction_result['tour_duration'])
+            self.assertLessEqual(assignment_solver.number_of_nodes, reduction_solver.number_of_nodes)
 
+    def test_branch_and_bound_method_with_limits(self):
+        random_generator = np.random.default_rng(20)
+        duration_matrix = random_generator.integers(60, 1800, (20, 20)).astype(float)
+        np.fill_diagonal(duration_matrix, np.Infinity)
 
+        solver = Solver(duration_matrix, node_limit=10)
+        final_result = solver.branch_and_bound_method()
+        exact_result = Solver(duration_matrix).branch_and_bound_method()
 
+        self.assertLessEqual(solver.number_of_nodes, 11)
+        self.assertEqual(len(final_result['tour']), 20)
+        self.assertGreaterEqual(final_result['tour_duration'], exact_result['tour_duration'])
+        self.assertLessEqual(final_result['tour_duration'] * (1 - final_result['gap']),
+                             exact_result['tour_duration'] + 1e-6)
+        self.assertEqual(exact_result['gap'], 0)
 
+        final_result = Solver(duration_matrix, time_limit=0).branch_and_bound_method()
+        heuristic_result = HeuristicSolver(duration_matrix, time_budget=1).local_search_method()
+        self.assertEqual(final_result['tour_duration'], heuristic_result['tour_duration'])
+
+
+class TestParallelSolverClass(TestCase):
+    def setUp(self):
+        random_generator = np.random.default_rng(15)
+        self.duration_matrix = random_generator.integers(60, 1800, (15, 15)).astype(float)
+        np.fill_diagonal(self.duration_matrix, np.Infinity)
+
+    def test_split_tree_method(self):
+        parallel_solver = ParallelSolver(self.duration_matrix, split_depth=2)
+        solver = Solver(self.duration_matrix)
+        solver.incumbent = HeuristicSolver(self.duration_matrix).local_search_method()
+        solver.root_node = Node(self.duration_matrix, solver.create_constraints_matrix())
+        solver.root_node.calculate_lower_bound_of_tour()
+
+        subproblems = parallel_solver.split_tree(solver)
+
+        self.assertLessEqual(len(subproblems), 4)
+        for node in subproblems:
+            self.assertEqual(len(node.tour), node.tour_length)
+            self.assertLessEqual(node.lower_bound, solver.incumbent['tour_duration'])
+
+    def test_parallel_branch_and_bound_method(self):
+        serial_result = Solver(self.duration_matrix).branch_and_bound_method()
+        parallel_result = ParallelSolver(self.duration_matrix, workers=2).parallel_branch_and_bound_method()
+        tour = parallel_result['tour']
+
+        self.assertEqual(parallel_result['tour_duration'], serial_result['tour_duration'])
+        self.assertEqual(parallel_result['gap'], 0)
+        self.assertEqual(sorted(path['from'] for path in tour), list(range(15)))
+        self.assertEqual(sum(self.duration_matrix[path['from'], path['to']] for path in tour),
+                         parallel_result['tour_duration'])
+
+    def test_parallel_solver_stats(self):
+        parallel_solver = ParallelSolver(self.duration_matrix, workers=2, split_depth=2)
+        parallel_solver.parallel_branch_and_bound_method()
+        stats = parallel_solver.stats
+
+        self.assertEqual(stats.algorithm, 'parallel_branch_and_bound')
+        self.assertGreater(stats.nodes_expanded, 3)
+        self.assertEqual(stats.nodes_created, 2 * stats.nodes_expanded + 1)
+        self.assertEqual(stats.gap, 0)
+
+
+class TestHeldKarpSolverClass(TestCase):
+    def setUp(self):
+        self.duration_matrix = np.array([
+            [np.Infinity, 40, 8, 80, 48],
+            [24, np.Infinity, 27, 68, 66],
+            [9, 37, np.Infinity, 82, 49],
+            [64, 76, 62, np.Infinity, 48],
+            [43, 64, 41, 42, np.Infinity]
+        ])
+
+        self.solver = HeldKarpSolver(self.duration_matrix)
+
+    def test_dynamic_programming_method(self):
+        final_result = self.solver.dynamic_programming_method()
+        correct_result = [{'from': 0, 'to': 2}, {'from': 2, 'to': 4}, {'from': 4, 'to': 3}, {'from': 3, 'to': 1},
+                          {'from': 1, 'to': 0}]
+
+        self.assertIsInstance(final_result, dict)
+        self.assertEqual(final_result['tour_duration'], 199)
+        self.assertEqual(final_result['tour'], correct_result)
+
+    def test_dynamic_programming_method_without_route(self):
+        self.duration_matrix[:, 0] = np.Infinity
+
+        with self.assertRaises(ValueError):
+            HeldKarpSolver(self.duration_matrix).dynamic_programming_method()
+
+    def test_same_tour_duration_as_branch_and_bound_method(self):
+        random_generator = np.random.default_rng(13)
+
+        for size in range(2, 10):
+            duration_matrix = random_generator.integers(60, 1800, (size, size)).astype(float)
+            np.fill_diagonal(duration_matrix, np.Infinity)
+
+            held_karp_result = HeldKarpSolver(duration_matrix).dynamic_programming_method()
+            branch_and_bound_result = Solver(duration_matrix).branch_and_bound_method()
+
+            self.assertEqual(held_karp_result['tour_duration'], branch_and_bound_result['tour_duration'])
+            self.assertEqual(len(held_karp_result['tour']), size)
+
+    def test_route_solver_threshold(self):
+        result = RouteSolver.solve(self.duration_matrix, options={'HELD_KARP_MAX_SIZE': 5})
+        self.assertEqual(result['tour'][0], {'from': 0, 'to': 2})
+
+        result = RouteSolver.solve(self.duration_matrix, options={'HELD_KARP_MAX_SIZE': 4})
+        self.assertEqual(result['tour'][0], {'from': 4, 'to': 3})
+
+    def test_route_solver_modes(self):
+        result = RouteSolver.solve(self.duration_matrix, mode='heuristic')
+        self.assertEqual(result['tour_duration'], 199)
+
+        result = RouteSolver.solve(self.duration_matrix, mode='exact', options={'HELD_KARP_MAX_SIZE': 4})
+        self.assertEqual(result['tour'][0], {'from': 4, 'to': 3})
+
+        with self.assertRaises(ValueError):
+            RouteSolver.solve(self.duration_matrix, mode='fastest')
+
+    def test_route_solver_debug(self):
+        result = RouteSolver.solve(self.duration_matrix)
+        self.assertNotIn('stats', result)
+
+        with self.assertLogs('apps.order.services', level='INFO') as logs:
+            result = RouteSolver.solve(self.duration_matrix, mode='exact', options={'HELD_KARP_MAX_SIZE': 4},
+                                       debug=True)
+
+        self.assertEqual(result['stats']['algorithm'], 'branch_and_bound')
+        self.assertEqual(result['stats']['gap'], 0)
+        self.assertEqual(logs.records[0].solver_stats, result['stats'])
+
+        stats = SolverStats('held_karp', 5)
+        stats.merge(result['stats'])
+        self.assertEqual(stats.nodes_created, result['stats']['nodes_created'])
+
+
+class TestHeuristicSolverClass(TestCase):
+    def setUp(self):
+        random_generator = np.random.default_rng(25)
+        self.size = 25
+        self.duration_matrix = random_generator.integers(60, 1800, (self.size, self.size)).astype(float)
+        np.fill_diagonal(self.duration_matrix, np.Infinity)
+
+        self.solver = HeuristicSolver(self.duration_matrix, time_budget=1)
+
+    def test_nearest_neighbour_route_method(self):
+        route = self.solver.nearest_neighbour_route()
+
+        self.assertEqual(route[0], 0)
+        self.assertEqual(sorted(route), list(range(self.size)))
+
+    def test_local_search_method(self):
+        route = self.solver.nearest_neighbour_route()
+        nearest_neighbour_duration = sum(self.duration_matrix[route[i], route[(i + 1) % self.size]]
+                                         for i in range(self.size))
+
+        final_result = self.solver.local_search_method()
+        tour = final_result['tour']
+
+        self.assertEqual(tour[0]['from'], 0)
+        self.assertEqual(tour[-1]['to'], 0)
+        self.assertEqual([path['to'] for path in tour[:-1]], [path['from'] for path in tour[1:]])
+        self.assertEqual(sorted(path['from'] for path in tour), list(range(self.size)))
+        self.assertEqual(final_result['tour_duration'], sum(self.duration_matrix[path['from'], path['to']]
+                                                            for path in tour))
+        self.assertLessEqual(final_result['tour_duration'], nearest_neighbour_duration)
+
+    def test_time_budget(self):
+        solver = HeuristicSolver(self.duration_matrix, time_budget=0)
+        final_result = solver.local_search_method()
+        route = solver.nearest_neighbour_route()
+
+        self.assertEqual([path['from'] for path in final_result['tour']], list(route))
+
+
+class TestIncrementalSolverClass(TestCase):
+    def setUp(self):
+        random_generator = np.random.default_rng(21)
+        self.size = 12
+        self.duration_matrix = random_generator.integers(60, 1800, (self.size, self.size)).astype(float)
+        np.fill_diagonal(self.duration_matrix, np.Infinity)
+
+    def test_insert_method(self):
+        route = [0, 3, 1, 4, 2]
+        duration_matrix = self.duration_matrix[:6, :6]
+        final_result = IncrementalSolver(duration_matrix, route, repair_moves=0).insert_method()
+        order = [path['from'] for path in final_result['tour']]
+
+        self.assertEqual(order[0], 0)
+        self.assertEqual(sorted(order), list(range(6)))
+        self.assertEqual([address for address in order if address != 5], route)
+
+        best_duration = min(sum(duration_matrix[path] for path in zip(order, order[1:] + [0]))
+                            for order in (route[:position] + [5] + route[position:] for position in range(1, 6)))
+        self.assertEqual(final_result['tour_duration'], best_duration)
+
+        repaired_result = IncrementalSolver(duration_matrix, route, repair_moves=5).insert_method()
+        self.assertLessEqual(repaired_result['tour_duration'], final_result['tour_duration'])
+
+    def test_remove_method(self):
+        route = list(HeuristicSolver(self.duration_matrix).local_search_method()['tour'][i]['from']
+                     for i in range(self.size))
+        final_result = IncrementalSolver(self.duration_matrix, route, repair_moves=0).remove_method(5)
+        order = [path['from'] for path in final_result['tour']]
+        duration_matrix = np.delete(np.delete(self.duration_matrix, 5, axis=0), 5, axis=1)
+
+        self.assertEqual(order, [address - (address > 5) for address in route if address != 5])
+        self.assertEqual(final_result['tour_duration'], sum(duration_matrix[path['from'], path['to']]
+                                                            for path in final_result['tour']))
+
+        with self.assertRaises(ValueError):
+            IncrementalSolver(self.duration_matrix, route).remove_method(0)
+
+    def test_updates_are_close_to_resolving(self):
+        route = [path['from'] for path in HeldKarpSolver(self.duration_matrix[:-1, :-1])
+                 .dynamic_programming_method()['tour']]
+        incremental_result = IncrementalSolver(self.duration_matrix, route).insert_method()
+        exact_result = HeldKarpSolver(self.duration_matrix).dynamic_programming_method()
+
+        self.assertLessEqual(incremental_result['tour_duration'], exact_result['tour_duration'] * 1.5)
@@ -0,0 +1,304 @@
+from unittest import mock
+import numpy as np
+import requests
+
+from rest_framework.test import APITestCase
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from ..addresses import AddressNormalizer
+from ..caches import DurationCache
+from ..http_client import CircuitOpenError
+from ..models import OrderModel, GeocodedAddressModel
+from ..serializers import FullOrderSerializer
+from ..workers import AddressValidationWorker
+from ...pizza.caches import PizzaSizeCache
+from ...pizza.models import PizzaModel, PizzaSizeModel
+
+UserModel = get_user_model()
+
+
+class TestOrderCreateView(APITestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='user@gmail.com', password='user', first_name='Petro',
+                                                  last_name='Petrov', phone_number='38077878344730', is_active=True)
+        pizza = PizzaModel.objects.create(title='Margherita', ingredients='tomatoes, mozzarella', category='classic',
+                                          image='margherita.jpg')
+        self.pizza_size = PizzaSizeModel.objects.create(diameter='30', weight=500, price=150, pizza=pizza)
+        self.order_data = {'delivery_address': 'Шараневича 28, Львів', 'payment_method': 'card', 'comment': '-',
+                           'pizzas': [{'pizza_size': self.pizza_size.id, 'number_of_pizza': 2}]}
+        self.create_url = reverse('create_new_order')
+        PizzaSizeCache.clear()
+        self.client.force_authenticate(self.user)
+
+    @mock.patch('apps.order.views.GeocodingCache.validate_address')
+    def test_order_creation_with_sync_validation(self, validate_address):
+        validate_address.side_effect = ValueError('Given delivery address is not valid.')
+        response = self.client.post(self.create_url, self.order_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrderModel.objects.exists())
+
+        validate_address.side_effect = None
+        response = self.client.post(self.create_url, self.order_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'created')
+        self.assertEqual(response.data['total'], 300)
+
+    @mock.patch('apps.order.views.GeocodingCache.validate_address')
+    def test_order_creation_with_unavailable_validation(self, validate_address):
+        for error in (CircuitOpenError(), requests.Timeout()):
+            validate_address.side_effect = error
+            response = self.client.post(self.create_url, self.order_data, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertIn('error', response.data)
+
+        self.assertFalse(OrderModel.objects.exists())
+
+    @override_settings(PIZZA_SIZE_CACHE={'VERSION_CHECK_INTERVAL': 60})
+    def test_order_lines_are_created_in_bulk(self):
+        pizza = PizzaModel.objects.create(title='Pepperoni', ingredients='pepperoni, mozzarella', category='meat',
+                                          image='pepperoni.jpg')
+        pizza_sizes = [self.pizza_size] + [PizzaSizeModel.objects.create(diameter=str(diameter), weight=diameter * 20,
+                                                                         price=diameter * 5, pizza=pizza)
+                                           for diameter in range(25, 34)]
+        number_of_queries = list()
+
+        for sizes in (pizza_sizes[:1], pizza_sizes):
+            order_data = {**self.order_data, 'pizzas': [{'pizza_size': pizza_size.id, 'number_of_pizza': 2}
+                                                        for pizza_size in sizes]}
+            FullOrderSerializer(data=order_data).is_valid(raise_exception=True)
+
+            with CaptureQueriesContext(connection) as queries:
+                serializer = FullOrderSerializer(data=order_data)
+                serializer.is_valid(raise_exception=True)
+                order = serializer.save(user=self.user)
+
+            number_of_queries.append(len(queries))
+
+        self.assertEqual(number_of_queries[0], number_of_queries[1])
+        self.assertEqual(order.total, 2 * sum(pizza_size.price for pizza_size in pizza_sizes))
+        self.assertEqual(OrderModel.objects.get(id=order.id).total, order.total)
+        self.assertEqual(order.pizzas.count(), 10)
+
+    @override_settings(PIZZA_SIZE_CACHE={'VERSION_CHECK_INTERVAL': 60})
+    def test_pizza_sizes_are_validated_with_cache(self):
+        FullOrderSerializer(data=self.order_data).is_valid(raise_exception=True)
+
+        with self.assertNumQueries(0):
+            serializer = FullOrderSerializer(data=self.order_data)
+            self.assertTrue(serializer.is_valid())
+
+        self.assertEqual(serializer.validated_data['pizzas'][0]['pizza_size'].price, 150)
+
+        order_data = {**self.order_data, 'pizzas': [{'pizza_size': self.pizza_size.id + 1, 'number_of_pizza': 1}]}
+        serializer = FullOrderSerializer(data=order_data)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('pizza_size', serializer.errors['pizzas'][0])
+
+    @mock.patch('apps.order.views.GeocodingCache.validate_address')
+    @mock.patch('django.contrib.auth.base_user.make_password', wraps=make_password)
+    def test_guest_order_creation(self, hash_password, validate_address):
+        self.client.force_authenticate(None)
+        guest_data = {'email': 'guest@gmail.com', 'first_name': 'Olena', 'last_name': 'Ivanenko',
+                      'phone_number': '380671234567'}
+
+        for email in ('guest@gmail.com', 'other@gmail.com'):
+            response = self.client.post(self.create_url, {**self.order_data, 'user': {**guest_data, 'email': email}},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        guest = UserModel.objects.get(phone_number='380671234567')
+
+        self.assertEqual(UserModel.objects.filter(first_name='Olena').count(), 1)
+        self.assertEqual(OrderModel.objects.filter(user=guest).count(), 2)
+        self.assertFalse(guest.has_usable_password())
+        hash_password.assert_called_once_with(None)
+
+        response = self.client.post(self.create_url, {**self.order_data, 'user': {
+            **guest_data, 'email': self.user.email, 'phone_number': '380670000000'}}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], self.user.id)
+
+        courier = UserModel.objects.create_user(email='courier@gmail.com', password='courier', first_name='Ivan',
+                                                last_name='Ivanov', phone_number='380501112233', role='courier')
+
+        for user_data in ({'email': courier.email, 'phone_number': '380670000001'},
+                          {'email': 'new@gmail.com', 'phone_number': courier.phone_number},
+                          {'email': self.user.email, 'phone_number': '380671234567'}):
+            response = self.client.post(self.create_url, {**self.order_data, 'user': {**guest_data, **user_data}},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(OrderModel.objects.filter(user=courier).exists())
+        self.assertEqual(OrderModel.objects.filter(user__in=[guest, self.user]).count(), 3)
+
+    @mock.patch('apps.order.views.GeocodingCache.validate_address')
+    def test_invalid_guest_order_creates_no_user(self, validate_address):
+        self.client.force_authenticate(None)
+        guest_data = {'email': 'guest@gmail.com', 'first_name': 'Olena', 'last_name': 'Ivanenko',
+                      'phone_number': '380671234567'}
+        order_data = {**self.order_data, 'pizzas': [{'pizza_size': self.pizza_size.id + 1, 'number_of_pizza': 1}],
+                      'user': guest_data}
+        response = self.client.post(self.create_url, order_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserModel.objects.filter(email='guest@gmail.com').exists())
+        self.assertFalse(OrderModel.objects.exists())
+        validate_address.assert_not_called()
+
+    @override_settings(ADDRESS_VALIDATION={'MODE': 'async', 'WORKERS': 1})
+    @mock.patch('apps.order.workers.GeocodingCache.validate_address')
+    def test_order_creation_with_async_validation(self, validate_address):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.create_url, self.order_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], AddressValidationWorker.pending_status)
+        self.assertEqual(len(callbacks), 1)
+        validate_address.assert_not_called()
+
+        order_id = response.data['id']
+        self.assertEqual(AddressValidationWorker.validate_order(order_id), 'created')
+        self.assertEqual(OrderModel.objects.get(id=order_id).status, 'created')
+        self.assertIsNone(AddressValidationWorker.validate_order(order_id))
+
+        OrderModel.objects.filter(id=order_id).update(status=AddressValidationWorker.pending_status)
+        validate_address.side_effect = ValueError('Given delivery address is not valid.')
+        self.assertEqual(AddressValidationWorker.validate_order(order_id), 'rejected')
+
+        OrderModel.objects.filter(id=order_id).update(status=AddressValidationWorker.pending_status)
+        validate_address.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            AddressValidationWorker.validate_order(order_id)
+        self.assertEqual(OrderModel.objects.get(id=order_id).status, AddressValidationWorker.pending_status)
+
+
+class TestCourierDeliveriesSortView(APITestCase):
+    def setUp(self):
+        self.courier = UserModel.objects.create_user(email='courier@gmail.com', password='courier', first_name='Ivan',
+                                                     last_name='Ivanov', phone_number='38077878344731', role='manager',
+                                                     is_active=True)
+        for delivery_address in ('Наукова 7, Львів', 'вул. Наукова, 7 кв. 3', 'Городоцька 120, Львів'):
+            OrderModel.objects.create(delivery_address=delivery_address, payment_method='cash', comment='-',
+                                      status='confirmed', user=self.courier, courier=self.courier)
+        self.sort_url = reverse('get_sorted_courier_deliveries')
+        self.client.force_authenticate(self.courier)
+        caches['default'].clear()
+
+    @mock.patch('apps.order.routes.DurationCache.get_value_matrix_between_addresses')
+    def test_orders_to_the_same_building(self, get_value_matrix_between_addresses):
+        get_value_matrix_between_addresses.return_value = {
+            'duration_matrix': [[np.inf, 1, 2], [1, np.inf, 1], [2, 1, np.inf]]
+        }
+        response = self.client.get(self.sort_url, {'mode': 'exact'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_value_matrix_between_addresses.call_args.kwargs['addresses'],
+                         ['Шараневича 28, Львів', 'Наукова 7, Львів', 'Городоцька 120, Львів'])
+        self.assertEqual(len(response.data['route_points']), 4)
+        self.assertEqual(OrderModel.objects.filter(delivery_address_key='наукова 7, львів').count(), 2)
+
+    @mock.patch('apps.order.routes.DurationCache.get_value_matrix_between_addresses')
+    def test_unavailable_durations(self, get_value_matrix_between_addresses):
+        get_value_matrix_between_addresses.side_effect = CircuitOpenError()
+        response = self.client.get(self.sort_url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('error', response.data)
+
+    @override_settings(ROUTE_PLANNER={'MAX_ORDERS': 2})
+    @mock.patch('apps.order.routes.DurationCache.get_value_matrix_between_addresses')
+    def test_only_active_orders(self, get_value_matrix_between_addresses):
+        get_value_matrix_between_addresses.side_effect = lambda addresses, mode, known_matrix=None: {
+            'duration_matrix': np.where(np.eye(len(addresses)), np.inf, 1)
+        }
+        for order_status in ('created', 'delivered'):
+            OrderModel.objects.create(delivery_address='Зелена 100, Львів', payment_method='cash', comment='-',
+                                      status=order_status, user=self.courier, courier=self.courier)
+
+        response = self.client.get(self.sort_url)
+
+        self.assertEqual(response.data['skipped_orders'], 1)
+        self.assertEqual(get_value_matrix_between_addresses.call_args.kwargs['addresses'],
+                         ['Шараневича 28, Львів', 'Наукова 7, Львів'])
+
+        with override_settings(ROUTE_PLANNER={'MAX_ORDERS': 24}):
+            response = self.client.get(self.sort_url)
+
+        self.assertNotIn('skipped_orders', response.data)
+        self.assertNotIn('Зелена 100, Львів', response.data['route_points'])
+
+    @mock.patch('apps.order.routes.DurationCache.get_value_matrix_between_addresses')
+    def test_cached_route(self, get_value_matrix_between_addresses):
+        get_value_matrix_between_addresses.return_value = {
+            'duration_matrix': [[np.inf, 1, 2], [1, np.inf, 1], [2, 1, np.inf]]
+        }
+        route_points = self.client.get(self.sort_url).data['route_points']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.sort_url)
+
+        self.assertEqual(response.data['route_points'], route_points)
+        self.assertEqual(get_value_matrix_between_addresses.call_count, 1)
+
+        self.client.get(self.sort_url, {'mode': 'heuristic'})
+        self.assertEqual(get_value_matrix_between_addresses.call_count, 2)
+
+        order = OrderModel.objects.get(delivery_address='Городоцька 120, Львів')
+        order.status = 'in_the_road'
+        order.save()
+        self.client.get(self.sort_url)
+        self.assertEqual(get_value_matrix_between_addresses.call_count, 3)
+
+        order.comment = 'Call me'
+        order.save()
+        self.client.get(self.sort_url)
+        self.assertEqual(get_value_matrix_between_addresses.call_count, 3)
+
+        self.client.get(self.sort_url, {'debug': 'true'})
+        self.assertEqual(get_value_matrix_between_addresses.call_count, 4)
+
+    @override_settings(ROUTING_BACKEND={'BACKEND': 'apps.order.backends.LocalRoutingBackend', 'OPTIONS': {}})
+    def test_incremental_route(self):
+        coordinates = {'Шараневича 28, Львів': (49.8183, 23.9806), 'Наукова 7, Львів': (49.8130, 24.0170),
+                       'Городоцька 120, Львів': (49.8310, 23.9880), 'Площа Ринок 1, Львів': (49.8419, 24.0315)}
+
+        for address, (latitude, longitude) in coordinates.items():
+            GeocodedAddressModel.objects.create(normalized_address=AddressNormalizer.normalize(address),
+                                                is_valid=True, latitude=latitude, longitude=longitude,
+                                                validation_time=timezone.now())
+
+        with mock.patch.object(DurationCache, 'get_value_matrix_between_addresses',
+                               wraps=DurationCache.get_value_matrix_between_addresses) as get_value_matrix:
+            self.client.get(self.sort_url)
+            OrderModel.objects.create(delivery_address='Площа Ринок 1, Львів', payment_method='cash', comment='-',
+                                      status='in_the_road', user=self.courier, courier=self.courier)
+            response = self.client.get(self.sort_url)
+
+            self.assertEqual(get_value_matrix.call_count, 2)
+            self.assertEqual(get_value_matrix.call_args.kwargs['known_matrix'].shape, (3, 3))
+            self.assertEqual(len(response.data['route_points']), 5)
+            self.assertEqual(set(response.data['route_points']), set(coordinates))
+
+            OrderModel.objects.filter(delivery_address='Городоцька 120, Львів').delete()
+            response = self.client.get(self.sort_url)
+
+            self.assertEqual(get_value_matrix.call_count, 2)
+            self.assertEqual(set(response.data['route_points']),
+                             {'Шараневича 28, Львів', 'Наукова 7, Львів', 'Площа Ринок 1, Львів'})
+            self.assertEqual(response.data['route_points'][0], response.data['route_points'][-1])
+
+            self.client.get(self.sort_url, {'mode': 'exact'})
+            self.assertEqual(get_value_matrix.call_count, 3)
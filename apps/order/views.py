@@ -3,17 +3,22 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from ..user.serializers import UserSerializer
+from ..user.serializers import GuestSerializer
 import pytz
+import requests
+from django.db import transaction
 from django.db.models import Count, Sum, Avg
 from datetime import datetime
+from django.conf import settings
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter, OpenApiExample
 
 from .models import OrderModel, OrderPizzaSizeModel
 from .serializers import OrderSerializer, FullOrderSerializer, OrderPizzaSizeSerializer
 from ..user.permissions import IsManager, IsCourier
-from .services import GeocodingAPI
-from .services import MapsAPIUse, Solver
+from .caches import GeocodingCache
+from .routes import RoutePlanner
+from .services import RouteSolver
+from .workers import AddressValidationWorker
 
 UserModel = get_user_model()
 
@@ -22,7 +27,11 @@ UserModel = get_user_model()
     post=extend_schema(
         summary='Create new order.',
         description='Creates a new order. If the request user is unauthorized, need to add user data to the'
-                    ' request body.'
+                    ' request body, the customer with the same phone number or email is reused and a new customer '
+                    'is created without a password otherwise. Phone number and email of different users or of '
+                    'couriers and managers are rejected. If the address validation works in async mode, the '
+                    'order is saved with pending_validation status and gets created or rejected status after the '
+                    'address is validated in the background.'
     )
 )
 class OrderCreateView(GenericAPIView):
@@ -30,25 +39,38 @@ class OrderCreateView(GenericAPIView):
     serializer_class = FullOrderSerializer
 
     def post(self, request, *args, **kwargs):
-        delivery_address = self.request.data['delivery_address']
-
-        try:
-            GeocodingAPI.validate_addresses(delivery_address)
-        except ValueError as err:
-            return Response({'error': str(err)}, status.HTTP_400_BAD_REQUEST)
+        order_serializer = FullOrderSerializer(data=self.request.data)
+        order_serializer.is_valid(raise_exception=True)
+        validate_async = settings.ADDRESS_VALIDATION['MODE'] == 'async'
+
+        if not validate_async:
+            try:
+                GeocodingCache.validate_address(order_serializer.validated_data['delivery_address'])
+            except ValueError as err:
+                return Response({'error': str(err)}, status.HTTP_400_BAD_REQUEST)
+            except requests.RequestException:
+                return Response({'error': 'Address validation is unavailable, try again later.'},
+                                status.HTTP_503_SERVICE_UNAVAILABLE)
 
         user = self.request.user
+        guest_serializer = None
 
         if user.is_anonymous:
-            user_data = self.request.data.pop('user')
-            user_serializer = UserSerializer(data=user_data)
-            user_serializer.is_valid(raise_exception=True)
-            user = user_serializer.save()
+            guest_serializer = GuestSerializer(data=self.request.data.get('user'))
+            guest_serializer.is_valid(raise_exception=True)
 
-        order_serializer = FullOrderSerializer(data=self.request.data)
-        order_serializer.is_valid()
-        order_serializer.save(user=user)
+        with transaction.atomic():
+            if guest_serializer is not None:
+                user = guest_serializer.save()
+
+            if validate_async:
+                order = order_serializer.save(user=user, status=AddressValidationWorker.pending_status)
+                AddressValidationWorker.enqueue(order.id)
+            else:
+                order_serializer.save(user=user)
 
+        if validate_async:
+            return Response(order_serializer.data, status.HTTP_202_ACCEPTED)
         return Response(order_serializer.data, status.HTTP_200_OK)
 
 
@@ -307,54 +329,48 @@ class StatisticView(GenericAPIView):
 @extend_schema_view(
     get=extend_schema(
         summary='Get a consistent list of delivery addresses.',
-        description='Returns a consistent list of delivery address all orders that are related to the authorized '
-                    'courier with the address of the pizzeria at the start and at the end of this list. Only courier '
-                    'can do this.'
+        description='Returns a consistent list of delivery address all confirmed and in the road orders that are '
+                    'related to the authorized courier with the address of the pizzeria at the start and at the end '
+                    'of this list. Orders which are delivered to the same building share one point of the route. The '
+                    'route contains a limited number of the earliest confirmed orders, the number of other orders '
+                    'is returned in the skipped_orders field. Only courier can do this.',
+        parameters=[
+            OpenApiParameter(name='mode', type=str, required=False, location='query',
+                             description='The way of building the route: exact - the shortest route, heuristic - a '
+                                         'good route found within a time budget, auto - exact for small routes and '
+                                         'heuristic for big ones. Defaults to auto.',
+                             examples=[OpenApiExample(name='exact example', value='exact'),
+                                       OpenApiExample(name='heuristic example', value='heuristic')]
+                             ),
+            OpenApiParameter(name='debug', type=bool, required=False, location='query',
+                             description='If true, the route is built again even if it is cached and statistics of '
+                                         'the route building algorithm are added to the response. Defaults to false.'),
+        ]
     )
 )
 class CourierDeliveriesSortView(GenericAPIView):
     permission_classes = [IsAuthenticated, IsManager]
 
     def get(self, *args, **kwargs):
-        user = self.request.user
-        courier_orders = OrderModel.objects.filter(courier_id=user.id)
-        addresses = ['Шараневича 28, Львів']
-        for order in courier_orders:
-            addresses.append(order.delivery_address)
-
-        if len(addresses) == 1:
-            addresses = ['Шараневича 28, Львів', 'Шараневича 28, Львів']
-            result = {'route_points': addresses}
-            return Response(result, status.HTTP_200_OK)
-
-        params = {
-            'addresses': '|'.join(addresses),
-            'mode': 'driving'
-        }
-
-        maps_api_result = MapsAPIUse.get_value_matrix_between_addresses(**params)
-        duration_matrix = maps_api_result['duration_matrix']
+        mode = self.request.query_params.get('mode', 'auto')
+        debug = self.request.query_params.get('debug', 'false').lower() in ('true', '1')
 
-        solver = Solver(duration_matrix)
-        solver_result = solver.branch_and_bound_method()
+        if mode not in RouteSolver.modes:
+            return Response({'error': f"Route mode must be one of: {', '.join(RouteSolver.modes)}."},
+                            status.HTTP_400_BAD_REQUEST)
 
-        tour = solver_result['tour']
-        route = list()
-        route_points = list()
-        previous_place = 0
-        i = 0
+        user = self.request.user
+        delivery_addresses, skipped_orders = RoutePlanner.get_delivery_addresses(user.id)
 
-        while tour:
-            if tour[i]['from'] == previous_place:
-                route.append({'from': addresses[tour[i]['from']], 'to': addresses[tour[i]['to']]})
-                route_points.append(addresses[tour[i]['from']])
-                previous_place = tour[i]['to']
-                tour.pop(i)
-                i = 0
-                continue
-            i += 1
+        try:
+            result = RoutePlanner.plan(user.id, delivery_addresses, mode=mode, debug=debug)
+        except ValueError as err:
+            return Response({'error': str(err)}, status.HTTP_400_BAD_REQUEST)
+        except requests.RequestException:
+            return Response({'error': 'Durations between addresses are unavailable, try again later.'},
+                            status.HTTP_503_SERVICE_UNAVAILABLE)
 
-        route_points.append(route[-1]['to'])
+        if skipped_orders:
+            result = {**result, 'skipped_orders': skipped_orders}
 
-        result = {'route_points': route_points}
         return Response(result, status.HTTP_200_OK)
@@ -0,0 +1,98 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .caches import GeocodingCache, RouteCache
+from .models import OrderModel
+
+logger = logging.getLogger(__name__)
+
+
+class AddressValidationWorker:
+    """AddressValidationWorker class is used for validating delivery addresses of orders in the background.
+
+    Orders which are saved with 'pending_validation' status are queued to the pool of WORKERS threads
+    of ADDRESS_VALIDATION setting after the transaction is committed. The order with the valid address
+    gets 'created' status, the order with the invalid address gets 'rejected' status. If the address
+    could not be validated, for example because the routing backend is unavailable, the order keeps
+    'pending_validation' status and is validated again by validate_pending_orders command.
+    """
+    pending_status = 'pending_validation'
+    executor = None
+    lock = threading.Lock()
+
+    @staticmethod
+    def enqueue(order_id):
+        """Queues validation of the order after the current transaction is committed.
+
+        :param order_id: the id of the order with 'pending_validation' status
+        :type order_id: int
+
+        :return: None
+        """
+        transaction.on_commit(lambda: AddressValidationWorker.get_executor().submit(
+            AddressValidationWorker.run, order_id))
+
+    @staticmethod
+    def get_executor():
+        """Returns the pool of threads which is created at the first call.
+
+        :return: the pool of threads
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+        with AddressValidationWorker.lock:
+            if AddressValidationWorker.executor is None:
+                AddressValidationWorker.executor = ThreadPoolExecutor(
+                    max_workers=settings.ADDRESS_VALIDATION['WORKERS'], thread_name_prefix='address_validation')
+
+        return AddressValidationWorker.executor
+
+    @staticmethod
+    def run(order_id):
+        """Validates the order in the thread of the pool and closes the connection of the thread to the database.
+
+        :param order_id: the id of the order
+        :type order_id: int
+
+        :return: None
+        """
+        try:
+            AddressValidationWorker.validate_order(order_id)
+        except Exception:
+            logger.exception('Validation of the address of order %s has failed.', order_id)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def validate_order(order_id):
+        """Validates the delivery address of the order and changes the status of the order.
+
+        The status is changed only if the order still has 'pending_validation' status.
+
+        :param order_id: the id of the order
+        :type order_id: int
+
+        :return: the new status of the order, None if the order is not pending validation
+        :rtype: str
+        """
+        order = OrderModel.objects.filter(id=order_id, status=AddressValidationWorker.pending_status).first()
+
+        if order is None:
+            return None
+
+        try:
+            GeocodingCache.validate_address(order.delivery_address)
+            new_status = 'created'
+        except ValueError:
+            new_status = 'rejected'
+
+        updated = OrderModel.objects.filter(id=order_id, status=AddressValidationWorker.pending_status) \
+            .update(status=new_status)
+
+        if updated:
+            RouteCache.invalidate(order.courier_id)
+
+        return new_status if updated else None
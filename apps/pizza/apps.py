@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PizzaConfig(AppConfig):
     name = 'apps.pizza'
+
+    def ready(self):
+        from . import signals  # noqa: F401
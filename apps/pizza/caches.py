@@ -0,0 +1,109 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import PizzaSizeModel, MenuVersionModel
+
+
+class PizzaSizeCache:
+    """PizzaSizeCache class is used for reading prices of pizza sizes without queries to the database.
+
+    All pizza sizes are loaded to the memory of the process with one query and are kept together with
+    the version of the menu which is stored in the table of MenuVersionModel, so it is shared by all
+    processes. Saving or deleting pizzas and pizza sizes increments the version in the same transaction,
+    every process compares versions at most once in VERSION_CHECK_INTERVAL seconds of PIZZA_SIZE_CACHE
+    setting and loads sizes again if the version has changed. Pizza sizes which are absent from the loaded
+    ones are looked up in the database, so new sizes are found before the version is compared. Changes
+    made by QuerySet.update are not noticed.
+    """
+    version_id = 1
+    sizes = None
+    version = None
+    check_time = None
+    lock = threading.Lock()
+
+    @staticmethod
+    def get(pizza_size_id):
+        """Returns the cached pizza size.
+
+        :param pizza_size_id: the id of the pizza size
+        :type pizza_size_id: int
+
+        :return: the price, the id of the pizza and the diameter of the pizza size, None if it does not exist
+        :rtype: dict
+        """
+        sizes = PizzaSizeCache.get_sizes()
+
+        if pizza_size_id in sizes:
+            return sizes[pizza_size_id]
+
+        pizza_size = PizzaSizeModel.objects.filter(id=pizza_size_id).values('price', 'pizza', 'diameter').first()
+
+        if pizza_size is not None:
+            with PizzaSizeCache.lock:
+                sizes[pizza_size_id] = pizza_size
+
+        return pizza_size
+
+    @staticmethod
+    def get_sizes():
+        """Returns all pizza sizes loading them if they have not been loaded or the menu has changed.
+
+        :return: prices, ids of pizzas and diameters by the id of the pizza size
+        :rtype: dict
+        """
+        with PizzaSizeCache.lock:
+            now = time.monotonic()
+
+            if PizzaSizeCache.sizes is not None and \
+                    now - PizzaSizeCache.check_time < settings.PIZZA_SIZE_CACHE['VERSION_CHECK_INTERVAL']:
+                return PizzaSizeCache.sizes
+
+            version = MenuVersionModel.objects.filter(id=PizzaSizeCache.version_id).values_list(
+                'version', flat=True).first()
+
+            if PizzaSizeCache.sizes is None or version != PizzaSizeCache.version:
+                PizzaSizeCache.sizes = {
+                    pizza_size_id: {'price': price, 'pizza': pizza_id, 'diameter': diameter}
+                    for pizza_size_id, price, pizza_id, diameter
+                    in PizzaSizeModel.objects.values_list('id', 'price', 'pizza_id', 'diameter')
+                }
+                PizzaSizeCache.version = version
+
+            PizzaSizeCache.check_time = now
+
+            return PizzaSizeCache.sizes
+
+    @staticmethod
+    def increment_version():
+        """Increments the version of the menu, so all processes load pizza sizes again. It must be called in
+        the transaction which changes the menu.
+
+        :return: None
+        """
+        versions = MenuVersionModel.objects.filter(id=PizzaSizeCache.version_id)
+
+        if not versions.update(version=F('version') + 1):
+            MenuVersionModel.objects.get_or_create(id=PizzaSizeCache.version_id, defaults={'version': 1})
+
+    @staticmethod
+    def invalidate():
+        """Drops pizza sizes loaded by this process.
+
+        :return: None
+        """
+        with PizzaSizeCache.lock:
+            PizzaSizeCache.sizes = None
+
+    @staticmethod
+    def clear():
+        """Drops pizza sizes loaded by this process. The version of the menu is not changed.
+
+        :return: None
+        """
+        with PizzaSizeCache.lock:
+            PizzaSizeCache.sizes = None
+            PizzaSizeCache.version = None
+            PizzaSizeCache.check_time = None
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+def create_menu_version(apps, schema_editor):
+    apps.get_model('pizza', 'MenuVersionModel').objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pizza', '0002_alter_pizzamodel_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuVersionModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'menu_version',
+            },
+        ),
+        migrations.RunPython(create_menu_version, migrations.RunPython.noop),
+    ]
@@ -22,3 +22,10 @@ class PizzaSizeModel(models.Model):
     price = models.SmallIntegerField()
 
     pizza = models.ForeignKey(PizzaModel, on_delete=models.CASCADE, related_name='sizes')
+
+
+class MenuVersionModel(models.Model):
+    class Meta:
+        db_table = 'menu_version'
+
+    version = models.PositiveBigIntegerField(default=0)
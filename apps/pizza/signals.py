@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .caches import PizzaSizeCache
+from .models import PizzaModel, PizzaSizeModel
+
+
+@receiver([post_save, post_delete], sender=PizzaModel)
+@receiver([post_save, post_delete], sender=PizzaSizeModel)
+def invalidate_pizza_sizes(sender, **kwargs):
+    """Increments the version of the menu and drops cached pizza sizes when the transaction is committed."""
+    PizzaSizeCache.increment_version()
+    transaction.on_commit(PizzaSizeCache.invalidate)
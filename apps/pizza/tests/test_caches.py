@@ -0,0 +1,62 @@
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from ..caches import PizzaSizeCache
+from ..models import PizzaModel, PizzaSizeModel, MenuVersionModel
+
+
+@override_settings(PIZZA_SIZE_CACHE={'VERSION_CHECK_INTERVAL': 60})
+class TestPizzaSizeCacheClass(TestCase):
+    def setUp(self):
+        PizzaSizeCache.clear()
+        self.pizza = PizzaModel.objects.create(title='Margherita', ingredients='tomatoes, mozzarella',
+                                               category='classic', image='margherita.jpg')
+        self.pizza_size = PizzaSizeModel.objects.create(diameter='30', weight=500, price=150, pizza=self.pizza)
+
+    def test_get_method(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(PizzaSizeCache.get(self.pizza_size.id),
+                             {'price': 150, 'pizza': self.pizza.id, 'diameter': '30'})
+            PizzaSizeCache.get(self.pizza_size.id)
+
+        new_pizza_size = PizzaSizeModel.objects.create(diameter='40', weight=800, price=210, pizza=self.pizza)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(PizzaSizeCache.get(new_pizza_size.id)['price'], 210)
+            PizzaSizeCache.get(new_pizza_size.id)
+            self.assertIsNone(PizzaSizeCache.get(new_pizza_size.id + 1))
+
+    def test_invalidation_by_signals(self):
+        PizzaSizeCache.get(self.pizza_size.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza_size.price = 170
+            self.pizza_size.save()
+
+        self.assertEqual(PizzaSizeCache.get(self.pizza_size.id)['price'], 170)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza.delete()
+
+        self.assertIsNone(PizzaSizeCache.get(self.pizza_size.id))
+
+    def test_invalidation_by_signals_increments_version(self):
+        version = MenuVersionModel.objects.get(id=PizzaSizeCache.version_id).version
+        self.pizza_size.price = 170
+        self.pizza_size.save()
+
+        self.assertEqual(MenuVersionModel.objects.get(id=PizzaSizeCache.version_id).version, version + 1)
+
+    def test_version_of_other_process(self):
+        PizzaSizeCache.get(self.pizza_size.id)
+        PizzaSizeModel.objects.filter(id=self.pizza_size.id).update(price=170)
+        MenuVersionModel.objects.filter(id=PizzaSizeCache.version_id).update(version=F('version') + 1)
+
+        self.assertEqual(PizzaSizeCache.get(self.pizza_size.id)['price'], 150)
+
+        PizzaSizeCache.check_time -= 60
+        self.assertEqual(PizzaSizeCache.get(self.pizza_size.id)['price'], 170)
+
+        PizzaSizeCache.check_time -= 60
+        with self.assertNumQueries(1):
+            PizzaSizeCache.get(self.pizza_size.id)
@@ -1,4 +1,6 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
 
 class CustomUserManager(BaseUserManager):
@@ -19,3 +21,32 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('User has to be active.')
         return self.create_user(email, password, **extra_kwargs)
 
+    def get_or_create_guest(self, email, phone_number, **extra_kwargs):
+        email = self.normalize_email(email)
+        guest = self.find_guest(email, phone_number)
+
+        if guest is not None:
+            return guest
+
+        guest = self.model(email=email, phone_number=phone_number, **extra_kwargs)
+        guest.set_unusable_password()
+
+        try:
+            with transaction.atomic():
+                guest.save()
+        except IntegrityError:
+            guest = self.find_guest(email, phone_number)
+
+            if guest is None:
+                raise
+
+        return guest
+
+    def find_guest(self, email, phone_number):
+        users = list(self.filter(Q(phone_number=phone_number) | Q(email=email))[:2])
+
+        if len(users) > 1:
+            raise ValueError('Given phone number and email belong to different users.')
+        if users and users[0].role != 'user':
+            raise ValueError('Given phone number or email can not be used for ordering without authorization.')
+        return users[0] if users else None
@@ -1,4 +1,4 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, ValidationError
 from django.contrib.auth import get_user_model
 
 from .models import UserFavoritesModel
@@ -15,6 +15,19 @@ class UserSerializer(ModelSerializer):
         return UserModel.objects.create_user(**validated_data)
 
 
+class GuestSerializer(ModelSerializer):
+    class Meta:
+        model = UserModel
+        fields = ['id', 'email', 'first_name', 'last_name', 'phone_number']
+        extra_kwargs = {'email': {'validators': []}, 'phone_number': {'validators': []}}
+
+    def create(self, validated_data):
+        try:
+            return UserModel.objects.get_or_create_guest(**validated_data)
+        except ValueError as err:
+            raise ValidationError({'error': str(err)})
+
+
 class UserFavoritesSerializer(ModelSerializer):
     class Meta:
         model = UserFavoritesModel
@@ -2,3 +2,8 @@ from .jwt_config import *
 from .rest_config import *
 from .email_config import *
 from .spactacular_config import *
+from .route_config import *
+from .geocoding_config import *
+from .maps_config import *
+from .pizza_config import *
+from .logging_config import *
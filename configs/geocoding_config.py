@@ -0,0 +1,16 @@
+GEOCODING_CACHE = {
+    'MEMORY_SIZE': 1024,
+    'POSITIVE_TTL': 30 * 24 * 60 * 60,
+    'NEGATIVE_TTL': 24 * 60 * 60,
+}
+
+ADDRESS_VALIDATION = {
+    'MODE': 'sync',
+    'WORKERS': 2,
+}
+
+ADDRESS_NORMALIZATION = {
+    'DEFAULT_CITY': 'львів',
+    'CITIES': ['львів', 'винники', 'брюховичі', 'рудно', 'сокільники', 'солонка'],
+    'CITY_ALIASES': {'львов': 'львів', 'lviv': 'львів'},
+}
@@ -0,0 +1,15 @@
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'apps.order.services': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
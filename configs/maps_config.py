@@ -0,0 +1,25 @@
+import os
+
+DURATION_CACHE = {
+    'BUCKET_MINUTES': 30,
+    'MAX_AGE': 24 * 60 * 60,
+}
+
+ROUTING_BACKEND = {
+    'BACKEND': 'apps.order.backends.GoogleRoutingBackend',
+    'OPTIONS': {
+        'API_KEY': os.environ.get('GOOGLE_MAPS_API_KEY'),
+        'MAX_ELEMENTS': 100,
+        'MAX_WORKERS': 4,
+        'REQUEST_TIMEOUT': 20.0,
+        'RETRIES': 2,
+    },
+}
+
+DELIVERY_HISTORY = {
+    'DEPOT_ADDRESS': 'Шараневича 28, Львів',
+    'CELL_SIZE': 0.01,
+    'MIN_SAMPLES': 3,
+    'MIN_DISTANCE': 0.3,
+    'RELOAD_INTERVAL': 60 * 60,
+}
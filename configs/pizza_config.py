@@ -0,0 +1,3 @@
+PIZZA_SIZE_CACHE = {
+    'VERSION_CHECK_INTERVAL': 5,
+}
@@ -0,0 +1,20 @@
+ROUTE_SOLVER = {
+    'HELD_KARP_MAX_SIZE': 13,
+    'EXACT_MAX_SIZE': 18,
+    'EXACT_TIME_LIMIT': 2.0,
+    'EXACT_NODE_LIMIT': None,
+    'EXACT_WORKERS': 1,
+    'EXACT_BOUND': 'reduction',
+    'HEURISTIC_TIME_BUDGET': 0.5,
+}
+
+ROUTE_PLANNER = {
+    'MAX_ORDERS': 24,
+}
+
+ROUTE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 30 * 60,
+    'INCREMENTAL_MAX_CHANGES': 3,
+    'INCREMENTAL_REPAIR_MOVES': 3,
+}